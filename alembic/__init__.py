@@ -1 +0,0 @@
-"""Alembic package for database migrations."""
@@ -0,0 +1,83 @@
+"""Add soft delete to users and clinics, and their archive tables
+
+Revision ID: 5c7e9a2b4d61
+Revises: 8b2d4e6f1a39
+Create Date: 2026-10-19 15:20:54.248761
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = '5c7e9a2b4d61'
+down_revision = '8b2d4e6f1a39'
+branch_labels = None
+depends_on = None
+
+LIVE = sa.text('deleted_at IS NULL')
+DELETED = sa.text('deleted_at IS NOT NULL')
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    # Emails are unique among live users only (autogenerate misses predicates)
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.create_index(
+        'ix_users_email', 'users', ['email'], unique=True,
+        sqlite_where=LIVE, postgresql_where=LIVE,
+    )
+    op.create_index(
+        'ix_users_deleted_at', 'users', ['deleted_at'], unique=False,
+        sqlite_where=DELETED, postgresql_where=DELETED,
+    )
+    op.add_column('clinics', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index(
+        'ix_clinics_is_active', 'clinics', ['is_active'], unique=False,
+        sqlite_where=LIVE, postgresql_where=LIVE,
+    )
+    op.create_index(
+        'ix_clinics_deleted_at', 'clinics', ['deleted_at'], unique=False,
+        sqlite_where=DELETED, postgresql_where=DELETED,
+    )
+    op.create_table(
+        'users_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('role', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_users_archive_email'), 'users_archive', ['email'], unique=False)
+    op.create_table(
+        'clinics_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('address', sa.String(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    # Soft-deleted rows are removed: the schema below cannot tell them apart,
+    # and a reused email would break the unique index
+    op.drop_table('clinics_archive')
+    op.drop_index(op.f('ix_users_archive_email'), table_name='users_archive')
+    op.drop_table('users_archive')
+    op.execute('DELETE FROM clinics WHERE deleted_at IS NOT NULL')
+    op.drop_index('ix_clinics_deleted_at', table_name='clinics')
+    op.drop_index('ix_clinics_is_active', table_name='clinics')
+    op.drop_column('clinics', 'deleted_at')
+    op.execute('DELETE FROM users WHERE deleted_at IS NOT NULL')
+    op.drop_index('ix_users_deleted_at', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.drop_column('users', 'deleted_at')
@@ -0,0 +1,50 @@
+"""Never reuse user and clinic ids on SQLite
+
+Revision ID: 9d3f6b8e2c17
+Revises: 5c7e9a2b4d61
+Create Date: 2026-10-19 21:04:37.512903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3f6b8e2c17'
+down_revision = '5c7e9a2b4d61'
+branch_labels = None
+depends_on = None
+
+# Live table -> its archive table
+TABLES = {'users': 'users_archive', 'clinics': 'clinics_archive'}
+
+
+def upgrade() -> None:
+    # A plain INTEGER PRIMARY KEY hands out the ids archiving freed again;
+    # other databases use sequences, which never go back
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table, archive in TABLES.items():
+        with op.batch_alter_table(
+            table, recreate='always', table_kwargs={'sqlite_autoincrement': True}
+        ):
+            pass
+        # Continue after the highest id ever given out, archived ones included
+        op.execute(sa.text('DELETE FROM sqlite_sequence WHERE name = :name').bindparams(name=table))
+        op.execute(
+            sa.text(
+                f'INSERT INTO sqlite_sequence (name, seq) SELECT :name, COALESCE(MAX(id), 0) '
+                f'FROM (SELECT id FROM {table} UNION ALL SELECT id FROM {archive})'
+            ).bindparams(name=table)
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in TABLES:
+        with op.batch_alter_table(
+            table, recreate='always', table_kwargs={'sqlite_autoincrement': False}
+        ):
+            pass
@@ -0,0 +1,101 @@
+"""Command line.
+
+    python -m app serve --workers 4 --threads 8
+    python -m app jobs --workers 4
+    python -m app archive
+"""
+import argparse
+import sys
+
+
+def serve_command(args) -> int:
+    from app.core.server import serve
+
+    serve(host=args.host, port=args.port, workers=args.workers, threads=args.threads)
+    return 0
+
+
+def jobs_command(args) -> int:
+    import signal
+    import threading
+
+    from app.core.config import get_config
+    from app.core.jobs import JobRunner
+    from app.db import SessionLocal
+    from app.main import create_app
+
+    # Importing the features registers their job handlers
+    create_app()
+    config = get_config()
+    runner = JobRunner(
+        SessionLocal,
+        workers=args.workers or max(config.JOBS_WORKERS, 1),
+        poll_interval=config.JOBS_POLL_SECONDS,
+        lease_seconds=config.JOBS_LEASE_SECONDS,
+        backoff_seconds=config.JOBS_BACKOFF_SECONDS,
+        backoff_max_seconds=config.JOBS_BACKOFF_MAX_SECONDS,
+    )
+    if args.once:
+        print(f"ran {runner.run_pending()} jobs")
+        return 0
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+    runner.notify()
+    stopping.wait()
+    runner.stop()
+    return 0
+
+
+def archive_command(args) -> int:
+    from app.core.archive import Archiver
+    from app.core.config import get_config
+    from app.db import SessionLocal
+
+    config = get_config()
+    archiver = Archiver(
+        SessionLocal,
+        retention_days=config.ARCHIVE_RETENTION_DAYS if args.days is None else args.days,
+        batch_size=config.ARCHIVE_BATCH_SIZE,
+    )
+    for table, count in archiver.run_once().items():
+        print(f"archived {count} rows from {table}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app", description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser(
+        "serve", help="serve the application from pre-forked workers"
+    )
+    serve_parser.add_argument("--host", help="address to bind (default: SERVER_HOST)")
+    serve_parser.add_argument("--port", type=int, help="port to bind (default: SERVER_PORT)")
+    serve_parser.add_argument("--workers", type=int,
+                              help="worker processes (default: SERVER_WORKERS)")
+    serve_parser.add_argument("--threads", type=int,
+                              help="threads per worker (default: SERVER_THREADS)")
+    serve_parser.set_defaults(handler=serve_command)
+
+    jobs_parser = commands.add_parser("jobs", help="run background jobs until SIGTERM or SIGINT")
+    jobs_parser.add_argument("--workers", type=int,
+                             help="job threads (default: JOBS_WORKERS, at least 1)")
+    jobs_parser.add_argument("--once", action="store_true", help="run the jobs due now and exit")
+    jobs_parser.set_defaults(handler=jobs_command)
+
+    archive_parser = commands.add_parser(
+        "archive", help="move long soft-deleted rows to the archive tables and exit"
+    )
+    archive_parser.add_argument("--days", type=float,
+                                help="archive rows deleted this many days ago "
+                                     "(default: ARCHIVE_RETENTION_DAYS)")
+    archive_parser.set_defaults(handler=archive_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
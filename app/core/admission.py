@@ -0,0 +1,238 @@
+"""Adaptive admission control: shed excess load before it queues in the app."""
+import json
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import get_config
+
+config = get_config()
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AdaptiveLimiter:
+    """Concurrency limit adjusted from observed latency (AIMD with a gradient).
+
+    Latencies are sampled in windows of ``window`` completed requests. At the
+    end of each window their mean, with each sample capped at twice the
+    tolerated latency, is compared against a long-term baseline: an
+    exponential average of past window means (``smoothing`` is the weight of
+    the newest). While the window stays within ``tolerance`` times the
+    baseline the limit grows by one per limit's worth of samples (additive
+    increase); when it rises beyond, the limit shrinks once, in proportion to
+    the gradient but at most to ``backoff`` times itself (multiplicative
+    decrease), never below ``min_limit``. A healthy mix of fast and slow
+    endpoints, or a single slow request, leaves the limit alone.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        tolerance: float = 2.0,
+        backoff: float = 0.5,
+        window: int = 20,
+        smoothing: float = 0.05,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.window = max(window, 1)
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.shed = 0
+        self._baseline: Optional[float] = None
+        self._samples: List[float] = []
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Admit a request if the current limit allows it."""
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: float, sample: bool = True) -> None:
+        """Finish an admitted request; ``sample`` its latency to adapt the limit.
+
+        Responses that did little work (client errors) pass ``sample=False``
+        so their latency does not drag the baseline down.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if not sample:
+                return
+            self._samples.append(latency)
+            if len(self._samples) < self.window:
+                return
+            samples, self._samples = self._samples, []
+            if self._baseline is not None:
+                # A lone very slow request counts as "slow", not as a hundred of them
+                ceiling = self._baseline * self.tolerance * 2
+                samples = [min(sample, ceiling) for sample in samples]
+            latency = max(sum(samples) / len(samples), 1e-6)
+            if self._baseline is None:
+                self._baseline = latency
+            gradient = self._baseline * self.tolerance / latency
+            if gradient >= 1:
+                self.limit = min(self.max_limit, self.limit + len(samples) / self.limit)
+            else:
+                self.limit = max(self.min_limit, self.limit * max(gradient, self.backoff))
+            self._baseline += self.smoothing * (latency - self._baseline)
+
+    def stats(self) -> dict:
+        """Snapshot of the limiter state."""
+        return {"limit": int(self.limit), "in_flight": self.in_flight, "shed": self.shed}
+
+
+def route_class(method: str, path: str) -> str:
+    """Bucket a request into ``auth``, ``write`` or ``read``."""
+    if path.startswith("/auth/"):
+        return "auth"
+    if method in READ_METHODS:
+        return "read"
+    return "write"
+
+
+class AdmissionMiddleware:
+    """WSGI middleware applying a separate adaptive limit per route class.
+
+    Requests over the limit, or that waited in a front proxy longer than
+    ``max_queue_delay`` seconds (from ``X-Request-Start``), are rejected with
+    ``503`` and ``Retry-After`` before Flask does any work. Paths in
+    ``exempt_paths`` are never shed.
+    """
+
+    def __init__(
+        self,
+        wsgi_app,
+        limiters: Dict[str, AdaptiveLimiter],
+        exempt_paths: Iterable[str] = ("/health",),
+        max_queue_delay: Optional[float] = None,
+        retry_after: int = 1,
+    ):
+        self.wsgi_app = wsgi_app
+        self.limiters = limiters
+        self.exempt_paths = frozenset(exempt_paths)
+        self.max_queue_delay = max_queue_delay
+        self.retry_after = retry_after
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if path in self.exempt_paths:
+            return self.wsgi_app(environ, start_response)
+
+        if self.max_queue_delay is not None:
+            delay = queue_delay(environ)
+            if delay is not None and delay > self.max_queue_delay:
+                return self._shed(start_response)
+
+        limiter = self.limiters[route_class(environ.get("REQUEST_METHOD", "GET"), path)]
+        if not limiter.try_acquire():
+            return self._shed(start_response)
+
+        started = time.monotonic()
+        status = []
+
+        def capture_status(status_line, headers, exc_info=None):
+            status.append(status_line)
+            return start_response(status_line, headers, exc_info)
+
+        def release():
+            # Client errors (401, 404, 422, ...) are cheap and would skew the baseline
+            sampled = not status or not status[-1].startswith("4")
+            limiter.release(time.monotonic() - started, sample=sampled)
+
+        try:
+            body = self.wsgi_app(environ, capture_status)
+        except BaseException:
+            release()
+            raise
+        return _ReleasingIterable(body, release)
+
+    def _shed(self, start_response):
+        body = json.dumps({
+            "success": False,
+            "error": "SERVICE_UNAVAILABLE",
+            "message": "Server is overloaded, retry later",
+        }).encode()
+        start_response("503 SERVICE UNAVAILABLE", [
+            ("Content-Type", "application/json"),
+            ("Content-Length", str(len(body))),
+            ("Retry-After", str(self.retry_after)),
+        ])
+        return [body]
+
+
+class _ReleasingIterable:
+    """Response body wrapper that runs ``on_done`` once the body is sent or closed."""
+
+    def __init__(self, body, on_done):
+        self._body = body
+        self._on_done = on_done
+        self._done = False
+
+    def __iter__(self):
+        try:
+            yield from self._body
+        finally:
+            self._finish()
+
+    def close(self):
+        try:
+            if hasattr(self._body, "close"):
+                self._body.close()
+        finally:
+            self._finish()
+
+    def _finish(self):
+        if not self._done:
+            self._done = True
+            self._on_done()
+
+
+def queue_delay(environ) -> Optional[float]:
+    """Seconds since a front proxy stamped ``X-Request-Start`` (``t=<epoch>`` or ``<epoch>``)."""
+    value = environ.get("HTTP_X_REQUEST_START")
+    if not value:
+        return None
+    try:
+        stamp = float(value[2:] if value.startswith("t=") else value)
+    except ValueError:
+        return None
+    # Proxies send seconds, milliseconds or microseconds since the epoch
+    while stamp > 1e11:
+        stamp /= 1000
+    return max(0.0, time.time() - stamp)
+
+
+def install_admission_control(app) -> AdmissionMiddleware:
+    """Wrap ``app.wsgi_app`` with admission control configured from ``Config``."""
+    limiters = {
+        name: AdaptiveLimiter(
+            initial_limit=initial,
+            min_limit=config.ADMISSION_MIN_LIMIT,
+            max_limit=config.ADMISSION_MAX_LIMIT,
+            tolerance=config.ADMISSION_LATENCY_TOLERANCE,
+        )
+        for name, initial in (
+            ("read", config.ADMISSION_READ_LIMIT),
+            ("write", config.ADMISSION_WRITE_LIMIT),
+            ("auth", config.ADMISSION_AUTH_LIMIT),
+        )
+    }
+    middleware = AdmissionMiddleware(
+        app.wsgi_app,
+        limiters,
+        exempt_paths=config.ADMISSION_EXEMPT_PATHS,
+        max_queue_delay=config.ADMISSION_MAX_QUEUE_SECONDS,
+    )
+    app.wsgi_app = middleware
+    app.extensions["admission"] = middleware
+    return middleware
@@ -0,0 +1,154 @@
+"""Archiver: moves long soft-deleted rows out of the live tables.
+
+Every ``ARCHIVE_INTERVAL_SECONDS`` each worker process's ``Archiver`` copies
+rows soft-deleted more than ``ARCHIVE_RETENTION_DAYS`` ago into their archive
+table and deletes them from the live one, ``ARCHIVE_BATCH_SIZE`` rows per
+transaction, until none are due. Each batch is one ``app.db.write``: a row is
+either live or archived, never both or neither. Batches claim their rows with
+``FOR UPDATE SKIP LOCKED`` where the database has it, so archivers in several
+processes share the work; on SQLite the single writer serializes them.
+
+The live tables and their indexes then hold recent rows only, while history
+stays queryable in the archive tables. ``python -m app archive`` runs one
+pass, for deployments that schedule it themselves with
+``ARCHIVE_INTERVAL_SECONDS=0``.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Type
+
+from sqlalchemy import DateTime, delete, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_config
+from app.core.logs import archive_logger
+from app.core.metrics import ROWS_ARCHIVED
+from app.core.soft_delete import INCLUDE_DELETED, archive_tables
+from app.db import SessionLocal, write
+
+config = get_config()
+
+
+class Archiver:
+    """Moves rows deleted longer than the retention period to archive tables."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        retention_days: float = 30.0,
+        batch_size: int = 500,
+        interval: float = 3600.0,
+    ):
+        self.session_factory = session_factory
+        self.retention = timedelta(days=retention_days)
+        self.batch_size = max(batch_size, 1)
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Archive now and then every ``interval`` seconds; a no-op if it is 0."""
+        if self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="archiver", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop after the batch in progress."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+
+    def run_once(self) -> Dict[str, int]:
+        """Archive every row due now; returns how many moved per live table."""
+        cutoff = datetime.utcnow() - self.retention
+        moved = {}
+        for model, archive in archive_tables().items():
+            total = 0
+            while not self._stopping.is_set():
+                count = self.archive_batch(model, archive, cutoff)
+                total += count
+                if count < self.batch_size:
+                    break
+            moved[model.__tablename__] = total
+        return moved
+
+    def archive_batch(self, model: Type, archive: Type, cutoff: datetime) -> int:
+        """Move up to ``batch_size`` rows of ``model`` deleted before ``cutoff``."""
+        live, cold = model.__table__, archive.__table__
+        columns = [column.name for column in cold.columns if column.name in live.columns]
+
+        def move(session: Session) -> int:
+            ids = session.scalars(
+                select(live.c.id)
+                .where(live.c.deleted_at < cutoff)
+                .order_by(live.c.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .execution_options(**{INCLUDE_DELETED: True})
+            ).all()
+            if not ids:
+                return 0
+            archived_at = literal(datetime.utcnow(), DateTime)
+            rows = select(*(live.c[name] for name in columns), archived_at).where(
+                live.c.id.in_(ids)
+            )
+            session.execute(insert(cold).from_select(columns + ["archived_at"], rows))
+            session.execute(delete(live).where(live.c.id.in_(ids)))
+            return len(ids)
+
+        session = self.session_factory()
+        try:
+            count = write(session, move)
+        finally:
+            session.close()
+        if count:
+            ROWS_ARCHIVED.inc(count, table=live.name)
+        return count
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                moved = self.run_once()
+                if any(moved.values()):
+                    archive_logger.info("Archived soft-deleted rows", extra={"fields": moved})
+            except Exception:
+                archive_logger.exception("Archiving failed")
+            self._stopping.wait(self.interval)
+
+
+_archiver: Optional[Archiver] = None
+_archiver_lock = threading.Lock()
+
+
+def get_archiver() -> Archiver:
+    """This process's archiver."""
+    global _archiver
+    if _archiver is None:
+        with _archiver_lock:
+            if _archiver is None:
+                _archiver = Archiver(
+                    SessionLocal,
+                    retention_days=config.ARCHIVE_RETENTION_DAYS,
+                    batch_size=config.ARCHIVE_BATCH_SIZE,
+                    interval=config.ARCHIVE_INTERVAL_SECONDS,
+                )
+    return _archiver
+
+
+def _reset_after_fork():
+    # The parent's thread did not survive the fork
+    global _archiver
+    _archiver = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,26 +1,56 @@
 """Authentication utilities - JWT handling and token generation."""
+import secrets
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 
 import jwt
-from passlib.context import CryptContext
 
 from app.core.config import get_config
+from app.core.metrics import JWT_VERIFICATIONS, PASSWORD_HASH_SECONDS, PASSWORD_VERIFY_SECONDS
 
 config = get_config()
 
+
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache()
+def pwd_context():
+    """Password hashing context, built (and passlib imported) on first use."""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config.BCRYPT_ROUNDS)
 
 
 def hash_password(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    with PASSWORD_HASH_SECONDS.time():
+        return pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    with PASSWORD_VERIFY_SECONDS.time():
+        return pwd_context().verify(plain_password, hashed_password)
+
+
+@lru_cache()
+def _dummy_hash() -> str:
+    return pwd_context().hash(secrets.token_urlsafe(16))
+
+
+def warm_up_password_hashing() -> None:
+    """Build the hashing context and the dummy hash before the first login needs them."""
+    _dummy_hash()
+
+
+def verify_dummy_password(plain_password: str) -> bool:
+    """Spend the same hashing work as ``verify_password`` without a real user.
+
+    Used when the account does not exist, so response time does not reveal
+    whether an email is registered.
+    """
+    with PASSWORD_VERIFY_SECONDS.time():
+        pwd_context().verify(plain_password, _dummy_hash())
+    return False
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -50,6 +80,11 @@ def decode_access_token(token: str) -> Optional[dict]:
             config.JWT_SECRET,
             algorithms=[config.JWT_ALGORITHM]
         )
-        return payload
+    except jwt.ExpiredSignatureError:
+        JWT_VERIFICATIONS.inc(result="expired")
+        return None
     except jwt.InvalidTokenError:
+        JWT_VERIFICATIONS.inc(result="invalid")
         return None
+    JWT_VERIFICATIONS.inc(result="valid")
+    return payload
@@ -0,0 +1,189 @@
+"""Response compression negotiated from ``Accept-Encoding``.
+
+Textual responses (JSON, ``text/*``, XML, JavaScript, SVG) of at least
+``COMPRESSION_MIN_SIZE`` bytes are sent with brotli when the ``brotli``
+package is installed and the client prefers it, and with gzip otherwise.
+Compressed bodies are kept in an LRU keyed by the response's ETag, or by a
+hash of the body when it has none, so the same large listing is compressed
+once rather than on every request. Streamed responses are compressed chunk by
+chunk and flushed after each one, so the client still receives every chunk as
+soon as the app yields it.
+"""
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional, Tuple
+
+from flask import request
+
+from app.core.config import get_config
+from app.core.metrics import RESPONSES_COMPRESSED
+
+config = get_config()
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+})
+
+
+def encodings() -> Tuple[str, ...]:
+    """Supported encodings, preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compressible(mimetype: Optional[str]) -> bool:
+    """Whether responses of ``mimetype`` are worth compressing."""
+    if not mimetype:
+        return False
+    return (
+        mimetype.startswith("text/")
+        or mimetype in COMPRESSIBLE_TYPES
+        or mimetype.endswith(("+json", "+xml"))
+    )
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """``body`` compressed with ``encoding``."""
+    if encoding == "br":
+        return brotli.compress(body, quality=config.COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=config.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """Compress ``chunks`` incrementally, flushing after each one."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=config.COMPRESSION_BROTLI_QUALITY)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(
+            config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+        process, finish = compressor.compress, compressor.flush
+
+        def flush():
+            return compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if not chunk:
+            continue
+        data = process(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionCache:
+    """LRU of compressed bodies, bounded by entries and total bytes."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = body
+            self.size += len(body)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+def _eligible(response) -> bool:
+    return (
+        200 <= response.status_code < 300
+        and response.status_code not in (204, 206)
+        and not response.direct_passthrough
+        and "Content-Encoding" not in response.headers
+        and "Content-Range" not in response.headers
+        and "no-transform" not in response.headers.get("Cache-Control", "")
+        and compressible(response.mimetype)
+    )
+
+
+def install_compression(app) -> CompressionCache:
+    """Compress ``app``'s responses for clients that accept it."""
+    cache = CompressionCache(config.COMPRESSION_CACHE_ENTRIES, config.COMPRESSION_CACHE_BYTES)
+    app.extensions["compression"] = cache
+
+    @app.after_request
+    def compress_response(response):
+        if not _eligible(response):
+            return response
+        length = response.content_length
+        if length is not None and length < config.COMPRESSION_MIN_SIZE:
+            return response
+        # The body now depends on the request's Accept-Encoding
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(encodings())
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            chunks = response.response
+            response.response = compress_stream(chunks, encoding)
+            if hasattr(chunks, "close"):
+                response.call_on_close(chunks.close)
+            response.headers.pop("Content-Length", None)
+            response.headers["Content-Encoding"] = encoding
+            RESPONSES_COMPRESSED.inc(encoding=encoding, cache="stream")
+            return response
+
+        body = response.get_data()
+        if len(body) < config.COMPRESSION_MIN_SIZE:
+            return response
+        etag, weak = response.get_etag()
+        if etag:
+            key = (encoding, "etag", request.path, response.mimetype, etag, weak)
+        else:
+            key = (encoding, "sha256", hashlib.sha256(body).digest())
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compress(body, encoding)
+            cache.put(key, compressed)
+            RESPONSES_COMPRESSED.inc(encoding=encoding, cache="miss")
+        else:
+            RESPONSES_COMPRESSED.inc(encoding=encoding, cache="hit")
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        if etag and not weak:
+            # A strong validator names exact bytes; these are not the original's
+            response.set_etag(f"{etag}-{encoding}")
+        return response
+
+    return cache
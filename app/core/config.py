@@ -1,6 +1,17 @@
 """Application configuration."""
 import os
 from functools import lru_cache
+from typing import Dict, Optional
+
+
+def parse_route_timeouts(value: str) -> Dict[str, float]:
+    """Parse ``"GET /users=5,POST /auth/login=3"`` into ``{route: seconds}``."""
+    timeouts = {}
+    for item in value.split(","):
+        route, sep, seconds = item.rpartition("=")
+        if sep and route.strip():
+            timeouts[" ".join(route.split())] = float(seconds)
+    return timeouts
 
 
 class Config:
@@ -11,12 +22,198 @@ class Config:
         "DATABASE_URL", "sqlite:///./test.db"
     )
     SQL_ECHO: bool = os.getenv("SQL_ECHO", "False").lower() == "true"
+    # Startup check that the database is at the Alembic head: "error" refuses
+    # to start, "warn" only logs, "off" skips it
+    SCHEMA_CHECK: str = os.getenv("SCHEMA_CHECK", "error")
+    MIGRATIONS_DIR: str = os.getenv(
+        "MIGRATIONS_DIR",
+        os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+            "alembic",
+            "versions",
+        ),
+    )
+    # Connection pool: each worker opens DB_POOL_MIN_SIZE connections before
+    # serving; checkouts ping only connections idle longer than
+    # DB_PING_IDLE_SECONDS and a background pass every DB_POOL_MAINTAIN_SECONDS
+    # (0 disables it) keeps them fresh and closes extras idle past
+    # DB_POOL_MAX_IDLE_SECONDS
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+    DB_PING_IDLE_SECONDS: float = float(os.getenv("DB_PING_IDLE_SECONDS", "30"))
+    DB_POOL_MAINTAIN_SECONDS: float = float(os.getenv("DB_POOL_MAINTAIN_SECONDS", "10"))
+    DB_POOL_MAX_IDLE_SECONDS: float = float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300"))
+    # SQLite profile: pragmas set on every connection (empty journal mode or
+    # synchronous keeps SQLite's default; negative cache_size is in KiB) and
+    # SQLAlchemy-controlled transactions. SQLITE_PROFILE=false leaves
+    # connections as pysqlite opens them and disables the single writer
+    SQLITE_PROFILE: bool = os.getenv("SQLITE_PROFILE", "true").lower() == "true"
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    # Service writes run on one thread per process and commit in groups of up
+    # to SQLITE_WRITER_MAX_BATCH
+    SQLITE_SINGLE_WRITER: bool = os.getenv("SQLITE_SINGLE_WRITER", "true").lower() == "true"
+    SQLITE_WRITER_MAX_BATCH: int = int(os.getenv("SQLITE_WRITER_MAX_BATCH", "64"))
 
     # JWT
     JWT_SECRET: str = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 24
 
+    # Password hashing (bcrypt cost factor, 4-31; each step doubles the work)
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+    # Login throttling
+    LOGIN_THROTTLE_BACKEND: str = os.getenv("LOGIN_THROTTLE_BACKEND", "memory")
+    LOGIN_THROTTLE_SQLITE_PATH: str = os.getenv("LOGIN_THROTTLE_SQLITE_PATH", "./throttle.db")
+    LOGIN_EMAIL_BURST: int = int(os.getenv("LOGIN_EMAIL_BURST", "5"))
+    LOGIN_EMAIL_PER_MINUTE: float = float(os.getenv("LOGIN_EMAIL_PER_MINUTE", "5"))
+    LOGIN_IP_BURST: int = int(os.getenv("LOGIN_IP_BURST", "20"))
+    LOGIN_IP_PER_MINUTE: float = float(os.getenv("LOGIN_IP_PER_MINUTE", "30"))
+    LOGIN_LOCKOUT_THRESHOLD: int = int(os.getenv("LOGIN_LOCKOUT_THRESHOLD", "5"))
+    LOGIN_LOCKOUT_BASE_SECONDS: float = float(os.getenv("LOGIN_LOCKOUT_BASE_SECONDS", "30"))
+    LOGIN_LOCKOUT_MAX_SECONDS: float = float(os.getenv("LOGIN_LOCKOUT_MAX_SECONDS", "900"))
+    TRUST_PROXY_HEADERS: bool = os.getenv("TRUST_PROXY_HEADERS", "False").lower() == "true"
+
+    # Idempotency keys
+    IDEMPOTENCY_BACKEND: str = os.getenv("IDEMPOTENCY_BACKEND", "memory")
+    IDEMPOTENCY_SQLITE_PATH: str = os.getenv("IDEMPOTENCY_SQLITE_PATH", "./idempotency.db")
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_LOCK_SECONDS: float = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+    IDEMPOTENCY_WAIT_SECONDS: float = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+
+    # Request deadlines
+    REQUEST_TIMEOUT_SECONDS: float = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "30"))
+    # Per-route overrides: "METHOD /rule=seconds,..."
+    REQUEST_TIMEOUTS: dict = parse_route_timeouts(os.getenv(
+        "REQUEST_TIMEOUTS",
+        "GET /users=5,GET /users/<int:user_id>=5,GET /clinics=5,GET /clinics/<int:clinic_id>=5",
+    ))
+
+    # Read coalescing
+    SINGLEFLIGHT_TIMEOUT_SECONDS: float = float(os.getenv("SINGLEFLIGHT_TIMEOUT_SECONDS", "10"))
+
+    # Degraded mode
+    DB_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("DB_BREAKER_FAILURE_THRESHOLD", "5"))
+    DB_BREAKER_LATENCY_SECONDS: float = float(os.getenv("DB_BREAKER_LATENCY_SECONDS", "2"))
+    DB_BREAKER_RESET_SECONDS: float = float(os.getenv("DB_BREAKER_RESET_SECONDS", "10"))
+    STALE_CACHE_MAX_ENTRIES: int = int(os.getenv("STALE_CACHE_MAX_ENTRIES", "1024"))
+
+    # Admission control
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "True").lower() == "true"
+    ADMISSION_READ_LIMIT: int = int(os.getenv("ADMISSION_READ_LIMIT", "100"))
+    ADMISSION_WRITE_LIMIT: int = int(os.getenv("ADMISSION_WRITE_LIMIT", "50"))
+    ADMISSION_AUTH_LIMIT: int = int(os.getenv("ADMISSION_AUTH_LIMIT", "8"))
+    ADMISSION_MIN_LIMIT: int = int(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+    ADMISSION_MAX_LIMIT: int = int(os.getenv("ADMISSION_MAX_LIMIT", "500"))
+    ADMISSION_LATENCY_TOLERANCE: float = float(os.getenv("ADMISSION_LATENCY_TOLERANCE", "2.0"))
+    ADMISSION_MAX_QUEUE_SECONDS: Optional[float] = (
+        float(os.getenv("ADMISSION_MAX_QUEUE_SECONDS"))
+        if os.getenv("ADMISSION_MAX_QUEUE_SECONDS")
+        else None
+    )
+    ADMISSION_EXEMPT_PATHS: tuple = tuple(
+        os.getenv("ADMISSION_EXEMPT_PATHS", "/health,/metrics").split(",")
+    )
+
+    # Response compression: gzip, or brotli when the brotli package is
+    # installed; compressed bodies are cached by ETag or content hash
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    COMPRESSION_CACHE_ENTRIES: int = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+    COMPRESSION_CACHE_BYTES: int = int(os.getenv("COMPRESSION_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+    # Background jobs: JOBS_WORKERS threads per process run jobs committed to
+    # the jobs table (0 leaves them to `python -m app jobs`), polling every
+    # JOBS_POLL_SECONDS; failed runs are retried with exponential backoff until
+    # JOBS_MAX_ATTEMPTS, and a running job is handed out again once its lease
+    # of JOBS_LEASE_SECONDS expires
+    JOBS_WORKERS: int = int(os.getenv("JOBS_WORKERS", "2"))
+    JOBS_POLL_SECONDS: float = float(os.getenv("JOBS_POLL_SECONDS", "5"))
+    JOBS_MAX_ATTEMPTS: int = int(os.getenv("JOBS_MAX_ATTEMPTS", "5"))
+    JOBS_BACKOFF_SECONDS: float = float(os.getenv("JOBS_BACKOFF_SECONDS", "2"))
+    JOBS_BACKOFF_MAX_SECONDS: float = float(os.getenv("JOBS_BACKOFF_MAX_SECONDS", "300"))
+    JOBS_LEASE_SECONDS: float = float(os.getenv("JOBS_LEASE_SECONDS", "300"))
+
+    # Audit trail: entries are spilled to a file in AUDIT_SPILL_DIR and
+    # inserted in batches of up to AUDIT_BATCH_SIZE at least every
+    # AUDIT_FLUSH_SECONDS (0 flushes only on demand); AUDIT_FSYNC syncs every
+    # spilled entry to disk. After AUDIT_MAX_ATTEMPTS rejected flushes the
+    # entries the database still refuses go to AUDIT_SPILL_DIR/dead
+    AUDIT_ENABLED: bool = os.getenv("AUDIT_ENABLED", "True").lower() == "true"
+    AUDIT_SPILL_DIR: str = os.getenv("AUDIT_SPILL_DIR", "./audit-spill")
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+    AUDIT_FLUSH_SECONDS: float = float(os.getenv("AUDIT_FLUSH_SECONDS", "1"))
+    AUDIT_FSYNC: bool = os.getenv("AUDIT_FSYNC", "False").lower() == "true"
+    AUDIT_MAX_ATTEMPTS: int = int(os.getenv("AUDIT_MAX_ATTEMPTS", "5"))
+
+    # Archival: every ARCHIVE_INTERVAL_SECONDS (0 disables) rows soft-deleted
+    # more than ARCHIVE_RETENTION_DAYS ago move to their archive tables,
+    # ARCHIVE_BATCH_SIZE rows per transaction
+    ARCHIVE_RETENTION_DAYS: float = float(os.getenv("ARCHIVE_RETENTION_DAYS", "30"))
+    ARCHIVE_INTERVAL_SECONDS: float = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+    # Metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    METRICS_MULTIPROC_DIR: Optional[str] = os.getenv("METRICS_MULTIPROC_DIR") or None
+    METRICS_FLUSH_SECONDS: float = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+    # Profiling
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "./profiles")
+    PROFILE_TOP_FUNCTIONS: int = int(os.getenv("PROFILE_TOP_FUNCTIONS", "40"))
+    SAMPLING_PROFILER_ENABLED: bool = (
+        os.getenv("SAMPLING_PROFILER_ENABLED", "False").lower() == "true"
+    )
+    SAMPLING_PROFILER_DIR: str = os.getenv("SAMPLING_PROFILER_DIR", "./profiles/sampled")
+    SAMPLING_PROFILER_HZ: float = float(os.getenv("SAMPLING_PROFILER_HZ", "19"))
+    SAMPLING_PROFILER_FLUSH_SECONDS: float = float(
+        os.getenv("SAMPLING_PROFILER_FLUSH_SECONDS", "60")
+    )
+
+    # Memory diagnostics
+    MEMORY_DIAGNOSTICS_ENABLED: bool = (
+        os.getenv("MEMORY_DIAGNOSTICS_ENABLED", "False").lower() == "true"
+    )
+    MEMORY_TRACEMALLOC_FRAMES: int = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "10"))
+    MEMORY_SNAPSHOT_EVERY: int = int(os.getenv("MEMORY_SNAPSHOT_EVERY", "100"))
+    MEMORY_TOP_ALLOCATIONS: int = int(os.getenv("MEMORY_TOP_ALLOCATIONS", "25"))
+
+    # Logging
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FILE: Optional[str] = os.getenv("LOG_FILE") or None
+    LOG_QUEUE_CAPACITY: int = int(os.getenv("LOG_QUEUE_CAPACITY", "10000"))
+    LOG_BATCH_SIZE: int = int(os.getenv("LOG_BATCH_SIZE", "256"))
+    LOG_FLUSH_SECONDS: float = float(os.getenv("LOG_FLUSH_SECONDS", "0.5"))
+
+    # Tracing
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "False").lower() == "true"
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "file")  # "file", "otlp" or "memory"
+    TRACING_FILE_PATH: str = os.getenv("TRACING_FILE_PATH", "./traces/spans.jsonl")
+    TRACING_OTLP_ENDPOINT: str = os.getenv(
+        "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+    )
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "backend")
+    TRACING_SAMPLE_RATIO: float = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+    TRACING_BATCH_SIZE: int = int(os.getenv("TRACING_BATCH_SIZE", "512"))
+    TRACING_MAX_QUEUE: int = int(os.getenv("TRACING_MAX_QUEUE", "2048"))
+    TRACING_FLUSH_SECONDS: float = float(os.getenv("TRACING_FLUSH_SECONDS", "5"))
+
+    # Server (python -m app serve)
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "5000"))
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))
+    # Keep at or below the engine's pool_size + max_overflow (5 + 10 by default)
+    SERVER_THREADS: int = int(os.getenv("SERVER_THREADS", "8"))
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+    SERVER_KEEPALIVE_SECONDS: float = float(os.getenv("SERVER_KEEPALIVE_SECONDS", "5"))
+    SERVER_GRACEFUL_TIMEOUT: float = float(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+
     # App
     DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
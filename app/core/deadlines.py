@@ -0,0 +1,166 @@
+"""Per-request deadlines enforced down to individual SQL statements.
+
+Each request gets a deadline: the route's default from ``REQUEST_TIMEOUTS``
+(or ``REQUEST_TIMEOUT_SECONDS``), shortened by an ``X-Request-Timeout``
+header when the client will give up sooner. It is kept in ``g.deadline``.
+Header values that are not a positive number of seconds are ignored; only a
+configured timeout of 0 means no deadline.
+
+Every statement executed during the request first checks the deadline and
+then runs with the remaining time as its timeout: SQLite statements are
+interrupted from a progress handler, PostgreSQL gets ``statement_timeout``
+and MySQL/MariaDB their session execution limit. Those limits cost a round
+trip, so they are only sent again when the one in effect on the connection
+has fallen ``STATEMENT_TIMEOUT_SLACK`` seconds behind the time left or is
+shorter than it. A statement cut short
+raises ``GatewayTimeoutError`` (504) instead of a database error, so it
+neither trips the circuit breaker nor is served stale. Services call
+``check_deadline()`` before expensive steps that do not touch the database.
+"""
+import math
+import time
+from typing import Optional
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from app.core.config import get_config
+from app.shared.exceptions import GatewayTimeoutError
+
+config = get_config()
+
+TIMEOUT_HEADER = "X-Request-Timeout"
+
+# SQLite VM instructions between progress-handler calls
+SQLITE_PROGRESS_STEPS = 1000
+
+# Seconds a statement may outlast the deadline before its timeout is set again
+STATEMENT_TIMEOUT_SLACK = 0.1
+
+
+def _route_timeout() -> float:
+    rule = request.url_rule.rule if request.url_rule is not None else None
+    if rule is not None:
+        timeout = config.REQUEST_TIMEOUTS.get(f"{request.method} {rule}")
+        if timeout is not None:
+            return timeout
+    return config.REQUEST_TIMEOUT_SECONDS
+
+
+def request_timeout() -> Optional[float]:
+    """Seconds the current request may run, or ``None`` for no deadline."""
+    timeout = _route_timeout()
+    header = request.headers.get(TIMEOUT_HEADER)
+    if header:
+        try:
+            requested = float(header)
+        except ValueError:
+            requested = None
+        if requested is not None and requested > 0 and math.isfinite(requested):
+            timeout = min(timeout, requested) if timeout else requested
+    return timeout or None
+
+
+def start_deadline() -> None:
+    """Set ``g.deadline`` for the current request."""
+    timeout = request_timeout()
+    if timeout is not None:
+        g.deadline = time.monotonic() + timeout
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline (``None`` if it has none)."""
+    if not has_request_context():
+        return None
+    deadline = g.get("deadline")
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline() -> None:
+    """Raise ``GatewayTimeoutError`` if the current request is out of time."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise GatewayTimeoutError("Request deadline exceeded")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    left = remaining()
+    if left is None:
+        return
+    if left <= 0:
+        raise GatewayTimeoutError("Request deadline exceeded")
+
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        deadline = g.deadline
+        conn.connection.driver_connection.set_progress_handler(
+            lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS
+        )
+        conn.info["deadline_handler"] = True
+    elif dialect in ("postgresql", "mysql", "mariadb"):
+        current = conn.info.get("deadline_timeout")
+        if current is not None and current - STATEMENT_TIMEOUT_SLACK <= left <= current:
+            return
+        if dialect == "postgresql":
+            cursor.execute(f"SET statement_timeout = {max(1, int(left * 1000))}")
+            conn.info["deadline_reset"] = "SET statement_timeout = DEFAULT"
+        elif dialect == "mysql":
+            cursor.execute(f"SET SESSION max_execution_time = {max(1, int(left * 1000))}")
+            conn.info["deadline_reset"] = "SET SESSION max_execution_time = DEFAULT"
+        else:
+            cursor.execute(f"SET SESSION max_statement_time = {max(0.001, left):.3f}")
+            conn.info["deadline_reset"] = "SET SESSION max_statement_time = DEFAULT"
+        conn.info["deadline_timeout"] = left
+
+
+def _clear_progress_handler(conn) -> None:
+    if conn.info.pop("deadline_handler", None):
+        conn.connection.driver_connection.set_progress_handler(None, 0)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _clear_progress_handler(conn)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and not conn.closed:
+        _clear_progress_handler(conn)
+    left = remaining()
+    if (
+        left is not None
+        and left <= 0
+        and exception_context.sqlalchemy_exception is not None
+        and not exception_context.is_disconnect
+    ):
+        # The statement was cancelled because the request ran out of time
+        cause = exception_context.original_exception
+        raise GatewayTimeoutError("Request deadline exceeded") from cause
+
+
+def _reset_on_checkin(dbapi_connection, connection_record):
+    # Connections go back to the pool without the last request's timeout
+    connection_record.info.pop("deadline_timeout", None)
+    reset = connection_record.info.pop("deadline_reset", None)
+    if reset is not None and dbapi_connection is not None:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(reset)
+        finally:
+            cursor.close()
+
+
+def install_deadlines(app, engine) -> None:
+    """Give every request a deadline and enforce it on ``engine``'s statements."""
+    for target, name, listener in (
+        (engine, "before_cursor_execute", _before_cursor_execute),
+        (engine, "after_cursor_execute", _after_cursor_execute),
+        (engine, "handle_error", _handle_error),
+        (engine.pool, "checkin", _reset_on_checkin),
+    ):
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener)
+
+    app.before_request(start_deadline)
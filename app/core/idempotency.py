@@ -0,0 +1,132 @@
+"""Idempotency-Key support: replay stored responses for retried writes."""
+import base64
+import hashlib
+import time
+from functools import wraps
+
+from flask import Response, current_app, request
+
+from app.core.config import get_config
+from app.core.permissions import get_principal
+from app.core.ratelimit import client_ip
+from app.shared.formats import JSON_MIMETYPE, MSGPACK_MIMETYPE, wants_msgpack
+from app.shared.kvstore import MemoryStore, SQLiteStore
+from app.shared.responses import error_response
+
+config = get_config()
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+PENDING = "pending"
+DONE = "done"
+
+
+def _build_store():
+    if config.IDEMPOTENCY_BACKEND == "sqlite":
+        return SQLiteStore(config.IDEMPOTENCY_SQLITE_PATH, table="idempotency_keys")
+    return MemoryStore(max_entries=config.IDEMPOTENCY_MAX_ENTRIES)
+
+
+store = _build_store()
+
+
+def idempotent(f):
+    """Decorator making a write endpoint safe to retry with an ``Idempotency-Key``.
+
+    The first request with a key claims it and runs the view; its response
+    (anything below 500) is stored for ``IDEMPOTENCY_TTL_SECONDS`` and
+    replayed for later requests with the same key and body. A retry that
+    arrives while the first request is still running waits for its result
+    instead of executing again. Keys are scoped to the caller (its client
+    address when anonymous), the route and the negotiated response format.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return error_response(
+                error="INVALID_REQUEST",
+                message=f"{HEADER} must be at most {MAX_KEY_LENGTH} characters",
+                status_code=400
+            )
+
+        principal = get_principal()
+        # Anonymous callers share no principal; one must not replay another's response
+        scope = principal.id if principal else f"anonymous@{client_ip()}"
+        # A stored body is only replayed in the format it was encoded in
+        mimetype = MSGPACK_MIMETYPE if wants_msgpack() else JSON_MIMETYPE
+        store_key = f"{scope}:{request.method}:{request.path}:{mimetype}:{key}"
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+
+        claimed = []
+
+        def claim(entry):
+            if entry is None:
+                claimed.append(True)
+                return {"state": PENDING, "fp": fingerprint}
+            return entry
+
+        entry = store.update(store_key, claim, ttl=config.IDEMPOTENCY_LOCK_SECONDS)
+        if not claimed:
+            return _replay_or_wait(store_key, entry, fingerprint)
+
+        try:
+            response = current_app.make_response(f(*args, **kwargs))
+        except BaseException:
+            store.delete(store_key)
+            raise
+
+        if response.status_code >= 500 or response.is_streamed:
+            store.delete(store_key)
+            return response
+
+        stored = {
+            "state": DONE,
+            "fp": fingerprint,
+            "status": response.status_code,
+            "content_type": response.content_type,
+            "body": base64.b64encode(response.get_data()).decode("ascii"),
+        }
+        store.update(store_key, lambda _: stored, ttl=config.IDEMPOTENCY_TTL_SECONDS)
+        return response
+    return decorated_function
+
+
+def _replay_or_wait(store_key: str, entry: dict, fingerprint: str):
+    if entry["fp"] != fingerprint:
+        return error_response(
+            error="IDEMPOTENCY_KEY_REUSED",
+            message="Idempotency-Key was already used with a different request body",
+            status_code=422
+        )
+
+    deadline = time.monotonic() + config.IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.01
+    while entry is not None and entry["state"] == PENDING and time.monotonic() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 0.2)
+        entry = store.get(store_key)
+
+    if entry is None:
+        # The original request failed and released the key; let the client retry
+        return error_response(
+            error="CONFLICT",
+            message="A request with this Idempotency-Key failed, retry it",
+            status_code=409
+        )
+    if entry["state"] == PENDING:
+        return error_response(
+            error="CONFLICT",
+            message="A request with this Idempotency-Key is still in progress",
+            status_code=409,
+            headers={"Retry-After": "1"}
+        )
+
+    return Response(
+        base64.b64decode(entry["body"]),
+        status=entry["status"],
+        content_type=entry["content_type"],
+        headers={"Idempotent-Replayed": "true"},
+    )
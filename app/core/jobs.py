@@ -0,0 +1,370 @@
+"""Background jobs for the side effects of a committed write.
+
+Services enqueue jobs in the transaction of the write they follow::
+
+    def insert(session):
+        user = User(...)
+        session.add(user)
+        session.flush()
+        enqueue(session, "auth.welcome", user_id=user.id)
+        return user
+
+A job is a row of the ``jobs`` table committed, or rolled back, with that
+write: it survives restarts and never runs for a write that did not happen.
+The commit wakes this process's ``JobRunner``, which claims due jobs and runs
+their handlers on ``JOBS_WORKERS`` threads, outside any request. With
+``JOBS_WORKERS=0`` jobs only queue up, for ``python -m app jobs`` to run.
+
+A handler that raises is retried after a jittered backoff of
+``JOBS_BACKOFF_SECONDS`` doubling per attempt up to
+``JOBS_BACKOFF_MAX_SECONDS``; after ``JOBS_MAX_ATTEMPTS`` runs it is kept with
+status ``failed``. A job whose process died while running it is claimed again
+once its ``JOBS_LEASE_SECONDS`` lease expires, so jobs run at least once and
+handlers must tolerate running twice. Finished jobs are deleted.
+
+Handlers are registered by name with ``@job(name)``. A feature defines its
+handlers in ``jobs.py`` and its service imports that module, so every process
+that can enqueue a job can also run it.
+"""
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, String, Text, and_, delete, event, or_, select, update
+)
+from sqlalchemy.orm import Session
+
+from app.core.config import get_config
+from app.core.logs import jobs_logger
+from app.core.metrics import JOB_SECONDS, JOBS_ENQUEUED, JOBS_RUN
+from app.db import Base, SessionLocal
+
+config = get_config()
+
+QUEUED = "queued"
+RUNNING = "running"
+FAILED = "failed"
+
+# Key in ``Session.info``: the session's transaction enqueued jobs
+_ENQUEUED = "jobs_enqueued"
+
+_handlers: Dict[str, Callable[..., Any]] = {}
+
+
+class Job(Base):
+    """A queued job: a handler name and its JSON keyword arguments."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_run_at", "status", "run_at"),)
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String, default=QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<Job(id={self.id}, name={self.name}, status={self.status}, "
+            f"attempts={self.attempts})>"
+        )
+
+
+def job(name: str) -> Callable:
+    """Register the decorated function as the handler of jobs named ``name``."""
+    def register(fn: Callable) -> Callable:
+        _handlers[name] = fn
+        return fn
+    return register
+
+
+def enqueue(
+    session: Session,
+    name: str,
+    delay: float = 0,
+    max_attempts: Optional[int] = None,
+    **payload,
+) -> Job:
+    """Add a ``name`` job to ``session``'s transaction; it runs after the commit.
+
+    ``payload`` is passed to the handler as keyword arguments and must be
+    JSON-serializable.
+    """
+    queued = Job(
+        name=name,
+        payload=json.dumps(payload),
+        max_attempts=max_attempts or config.JOBS_MAX_ATTEMPTS,
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+    session.add(queued)
+    session.info[_ENQUEUED] = True
+    JOBS_ENQUEUED.inc(name=name)
+    return queued
+
+
+def _due(now: datetime):
+    return or_(
+        and_(Job.status == QUEUED, Job.run_at <= now),
+        # Claimed by a process that died before finishing it
+        and_(Job.status == RUNNING, Job.locked_until < now),
+    )
+
+
+def _owned(claimed: Job):
+    # Still leased by the process that claimed it
+    return and_(Job.id == claimed.id, Job.locked_by == claimed.locked_by)
+
+
+def backoff(attempts: int, base: float, cap: float) -> float:
+    """Seconds to wait before retrying a job that failed ``attempts`` times."""
+    delay = min(cap, base * 2 ** (attempts - 1))
+    # Jitter spreads out retries of jobs that failed together
+    return delay * random.uniform(0.5, 1.0)
+
+
+class JobRunner:
+    """Claims due jobs and runs them on a bounded thread pool.
+
+    A dispatcher thread claims as many jobs as there are idle workers each
+    time it is woken by ``notify()`` or a finishing job, and at least every
+    ``poll_interval`` seconds for retries and jobs enqueued elsewhere. Claims
+    are a single conditional UPDATE, so runners in several processes never
+    take the same job.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        workers: int = 2,
+        poll_interval: float = 5.0,
+        lease_seconds: float = 300.0,
+        backoff_seconds: float = 2.0,
+        backoff_max_seconds: float = 300.0,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._slots = threading.Semaphore(max(workers, 0))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the dispatcher and the worker threads (once per process)."""
+        if self.workers <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="job")
+            self._thread = threading.Thread(
+                target=self._dispatch, name="job-dispatcher", daemon=True
+            )
+            self._thread.start()
+
+    def notify(self) -> None:
+        """Jobs were committed: claim them now rather than at the next poll."""
+        self.start()
+        self._wake.set()
+
+    def stop(self) -> None:
+        """Stop claiming jobs and wait for the running ones to finish."""
+        with self._lock:
+            thread, executor = self._thread, self._executor
+            self._thread = self._executor = None
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        thread.join()
+        executor.shutdown(wait=True)
+
+    def claim(self, limit: int) -> List[Job]:
+        """Mark up to ``limit`` due jobs as running here and return them, detached."""
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        session = self.session_factory()
+        try:
+            due = (
+                select(Job.id).where(_due(now)).order_by(Job.run_at).limit(limit).scalar_subquery()
+            )
+            session.execute(
+                update(Job)
+                .where(Job.id.in_(due), _due(now))
+                .values(
+                    status=RUNNING,
+                    attempts=Job.attempts + 1,
+                    locked_by=token,
+                    locked_until=now + timedelta(seconds=self.lease_seconds),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            claimed = session.execute(select(Job).where(Job.locked_by == token)).scalars().all()
+            session.expunge_all()
+            return list(claimed)
+        finally:
+            session.close()
+
+    def run(self, claimed: Job) -> str:
+        """Run a claimed job's handler and record the outcome: ``ok``, ``retry`` or ``failed``."""
+        started = time.perf_counter()
+        try:
+            handler = _handlers.get(claimed.name)
+            if handler is None:
+                raise LookupError(f"No handler registered for job {claimed.name!r}")
+            handler(**json.loads(claimed.payload))
+        except Exception as e:
+            result = self._record_failure(claimed, e)
+        else:
+            result = "ok"
+            self._finish(delete(Job).where(_owned(claimed)))
+        JOB_SECONDS.observe(time.perf_counter() - started, name=claimed.name)
+        JOBS_RUN.inc(name=claimed.name, result=result)
+        return result
+
+    def run_pending(self, limit: Optional[int] = None) -> int:
+        """Run due jobs in the calling thread until none are left; returns how many ran."""
+        ran = 0
+        while limit is None or ran < limit:
+            claimed = self.claim(1)
+            if not claimed:
+                break
+            self.run(claimed[0])
+            ran += 1
+        return ran
+
+    def _record_failure(self, claimed: Job, error: Exception) -> str:
+        retry = claimed.attempts < claimed.max_attempts
+        values = {
+            "locked_by": None,
+            "locked_until": None,
+            "last_error": f"{type(error).__name__}: {error}",
+        }
+        if retry:
+            delay = backoff(claimed.attempts, self.backoff_seconds, self.backoff_max_seconds)
+            values.update(status=QUEUED, run_at=datetime.utcnow() + timedelta(seconds=delay))
+        else:
+            values.update(status=FAILED)
+        jobs_logger.warning(
+            "Job failed",
+            exc_info=error,
+            extra={"fields": {
+                "job_id": claimed.id,
+                "job": claimed.name,
+                "attempt": claimed.attempts,
+                "retry": retry,
+            }},
+        )
+        self._finish(update(Job).where(_owned(claimed)).values(**values))
+        return "retry" if retry else FAILED
+
+    def _finish(self, statement) -> None:
+        # Matches nothing if the lease ran out and another runner took the job
+        session = self.session_factory()
+        try:
+            session.execute(statement.execution_options(synchronize_session=False))
+            session.commit()
+        finally:
+            session.close()
+
+    def _dispatch(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self._claim_for_idle_workers()
+            except Exception:
+                jobs_logger.exception("Could not claim jobs")
+
+    def _claim_for_idle_workers(self) -> None:
+        while not self._stopping.is_set():
+            idle = 0
+            while idle < self.workers and self._slots.acquire(blocking=False):
+                idle += 1
+            if not idle:
+                # Every worker is busy; the next one to finish wakes us
+                return
+            claimed: List[Job] = []
+            try:
+                claimed = self.claim(idle)
+            finally:
+                for _ in range(idle - len(claimed)):
+                    self._slots.release()
+            for item in claimed:
+                self._executor.submit(self._work, item)
+            if len(claimed) < idle:
+                return
+
+    def _work(self, claimed: Job) -> None:
+        try:
+            self.run(claimed)
+        except Exception:
+            # Recording the outcome failed; the lease expiry hands the job out again
+            jobs_logger.exception(
+                "Could not record job outcome", extra={"fields": {"job_id": claimed.id}}
+            )
+        finally:
+            self._slots.release()
+            self._wake.set()
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> JobRunner:
+    """This process's job runner."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = JobRunner(
+                    SessionLocal,
+                    workers=config.JOBS_WORKERS,
+                    poll_interval=config.JOBS_POLL_SECONDS,
+                    lease_seconds=config.JOBS_LEASE_SECONDS,
+                    backoff_seconds=config.JOBS_BACKOFF_SECONDS,
+                    backoff_max_seconds=config.JOBS_BACKOFF_MAX_SECONDS,
+                )
+    return _runner
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _dispatch_after_commit(session: Session) -> None:
+    if session.info.pop(_ENQUEUED, False):
+        get_runner().notify()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_ENQUEUED, None)
+
+
+def _reset_after_fork():
+    # The runner's threads did not survive the fork; the child starts its own
+    global _runner
+    _runner = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,263 @@
+"""Structured JSON access and error logging that never blocks request threads.
+
+Records go to ``QueueLogHandler``: request threads only append them to a
+bounded in-memory buffer and a background thread formats and writes them in
+batches. When the buffer is full new records are dropped and counted (see
+``log_records_dropped_total``) instead of waiting for the writer.
+
+Every request gets an id, taken from ``X-Request-ID`` or generated, that is
+echoed in the response and attached to every record logged while it runs.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from typing import Optional
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+from sqlalchemy import event
+
+from app.core.config import get_config
+from app.core.metrics import LOG_RECORDS_DROPPED
+
+config = get_config()
+
+REQUEST_ID_HEADER = "X-Request-ID"
+MAX_REQUEST_ID_LENGTH = 128
+
+access_logger = logging.getLogger("app.access")
+jobs_logger = logging.getLogger("app.jobs")
+audit_logger = logging.getLogger("app.audit")
+archive_logger = logging.getLogger("app.archive")
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            entry["request_id"] = request_id
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records logged during a request with its request id."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if has_request_context():
+            record.request_id = g.get("request_id")
+        return True
+
+
+class QueueLogHandler(logging.Handler):
+    """Buffers records in memory and writes them in batches from a background thread.
+
+    At most ``capacity`` records are buffered; beyond that records are
+    dropped and counted in ``dropped``. The writer wakes every
+    ``flush_interval`` seconds, or as soon as ``batch_size`` records are
+    waiting, and writes each batch with a single call. Records go to
+    ``path`` when set, otherwise to the current ``sys.stdout``.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ):
+        super().__init__()
+        self.path = path
+        self.stream = None
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.failed = 0
+        self._buffer: deque = deque()
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.setFormatter(JsonFormatter())
+        self.addFilter(RequestIdFilter())
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # Skip logging.Handler's per-handler lock; the buffer has its own
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.exc_info:
+            # Render the traceback now rather than keep its frames alive until the writer runs
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        with self._buffer_lock:
+            if len(self._buffer) >= self.capacity:
+                self.dropped += 1
+                LOG_RECORDS_DROPPED.inc()
+                return
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def start(self) -> None:
+        """Start the writer thread (once per process)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def flush(self) -> None:
+        """Write every buffered record now."""
+        with self._write_lock:
+            while True:
+                with self._buffer_lock:
+                    size = min(self.batch_size, len(self._buffer))
+                    batch = [self._buffer.popleft() for _ in range(size)]
+                if not batch:
+                    return
+                self._write(batch)
+
+    def close(self) -> None:
+        self.flush()
+        super().close()
+
+    def _write(self, batch) -> None:
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.failed += 1
+        if not lines:
+            return
+        data = "\n".join(lines) + "\n"
+        try:
+            if self.path:
+                with open(self.path, "a") as f:
+                    f.write(data)
+            else:
+                stream = self.stream or sys.stdout
+                stream.write(data)
+                stream.flush()
+        except Exception:
+            self.failed += len(lines)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _reset_after_fork(self) -> None:
+        # Records buffered by the parent are the parent's to write
+        self._buffer.clear()
+        self._write_lock = threading.Lock()
+        self._buffer_lock = threading.Lock()
+        self._thread = None
+        self.start()
+
+
+handler = QueueLogHandler(
+    path=config.LOG_FILE,
+    capacity=config.LOG_QUEUE_CAPACITY,
+    batch_size=config.LOG_BATCH_SIZE,
+    flush_interval=config.LOG_FLUSH_SECONDS,
+)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=handler._reset_after_fork)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and has_request_context():
+        context._log_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_log_started", None)
+    if started is not None and has_request_context():
+        g.db_seconds = g.get("db_seconds", 0.0) + time.perf_counter() - started
+        g.db_queries = g.get("db_queries", 0) + 1
+
+
+def _request_id() -> str:
+    incoming = request.headers.get(REQUEST_ID_HEADER, "")
+    if incoming and len(incoming) <= MAX_REQUEST_ID_LENGTH and incoming.isprintable():
+        return incoming
+    return uuid.uuid4().hex
+
+
+def install_logging(app, engine) -> QueueLogHandler:
+    """Send ``app``'s error log and a JSON access log through the queue handler."""
+    level = logging.getLevelName(config.LOG_LEVEL.upper())
+    for logger in (access_logger, jobs_logger, audit_logger, archive_logger, app.logger):
+        logger.removeHandler(default_handler)
+        if handler not in logger.handlers:
+            logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
+    handler.start()
+
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+    ):
+        if not event.contains(engine, name, listener):
+            event.listen(engine, name, listener)
+
+    @app.before_request
+    def start_access_log():
+        g.request_id = _request_id()
+        g.log_started = time.perf_counter()
+
+    @app.after_request
+    def write_access_log(response):
+        started = g.get("log_started")
+        if started is None:
+            return response
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+        if not access_logger.isEnabledFor(logging.INFO):
+            return response
+
+        principal = g.get("principal")
+        trace_span = g.get("trace_span")
+        fields = {
+            "method": request.method,
+            "route": request.url_rule.rule if request.url_rule is not None else None,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "db_ms": round(g.get("db_seconds", 0.0) * 1000, 3),
+            "db_queries": g.get("db_queries", 0),
+            "principal_id": principal.id if principal else None,
+        }
+        if trace_span is not None:
+            fields["trace_id"] = trace_span.trace_id
+        access_logger.info("access", extra={"fields": fields})
+        return response
+
+    app.extensions["logging"] = handler
+    return handler
@@ -0,0 +1,292 @@
+"""Opt-in memory diagnostics: per-route allocation tracking and session-leak detection.
+
+With ``MEMORY_DIAGNOSTICS_ENABLED`` the process runs under ``tracemalloc``.
+Every request records how much traced memory it left behind, per route, and
+every ``MEMORY_SNAPSHOT_EVERY``-th request of a route is bracketed by two
+snapshots whose diff names the allocation sites that grew. Concurrent
+requests share the heap, so per-request numbers are indicative; a steadily
+growing route stands out over many requests.
+
+Sessions made by ``SessionLocal`` are tracked from their first transaction.
+A session that still holds a transaction when the request that opened it
+ends, or that is garbage collected without being closed, is a leak: it is
+counted in ``db_sessions_leaked_total`` and logged with its route.
+"""
+import itertools
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from typing import Dict, List, Optional
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app.core.config import get_config
+from app.core.metrics import Counter, Gauge
+
+config = get_config()
+
+DB_SESSIONS_LIVE = Gauge("db_sessions_live", "Tracked ORM sessions still in memory")
+DB_SESSIONS_OPEN = Gauge("db_sessions_open", "Tracked ORM sessions holding a transaction")
+DB_SESSIONS_LEAKED = Counter(
+    "db_sessions_leaked_total",
+    "Sessions that outlived their request or were never closed",
+    ("reason",),
+)
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class SessionTracker:
+    """Tracks live sessions and the ones holding a transaction."""
+
+    def __init__(self):
+        self.live: "weakref.WeakSet" = weakref.WeakSet()
+        self.open: Dict[int, dict] = {}
+        self.leaked = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def begin(self, session) -> None:
+        """Record that ``session`` started a transaction."""
+        key = session.info.get("_diagnostics_id")
+        if key is None:
+            key = session.info["_diagnostics_id"] = next(self._ids)
+            self.live.add(session)
+            weakref.finalize(session, self._collected, key)
+        owner = {
+            "route": _route() if has_request_context() else None,
+            "request_id": g.get("request_id") if has_request_context() else None,
+            "started": time.time(),
+        }
+        with self._lock:
+            self.open[key] = owner
+        if has_request_context():
+            g.setdefault("diagnostics_sessions", []).append((key, weakref.ref(session)))
+
+    def end(self, session) -> None:
+        """Record that ``session`` ended its transaction."""
+        key = session.info.get("_diagnostics_id")
+        if key is not None:
+            with self._lock:
+                self.open.pop(key, None)
+
+    def check_request(self) -> List[dict]:
+        """Leaks of the sessions begun by the current request."""
+        leaks = []
+        scoped = g.get("db_session")
+        for key, ref in g.pop("diagnostics_sessions", ()):
+            if scoped is not None and ref() is scoped:
+                # The request-scoped session from get_db() is closed after this check
+                continue
+            with self._lock:
+                owner = self.open.get(key)
+            if owner is not None and ref() is not None and not owner.get("reported"):
+                owner["reported"] = True
+                leaks.append(dict(owner, session=key))
+        for _ in leaks:
+            self._leak("outlived_request")
+        return leaks
+
+    def stats(self) -> dict:
+        """Counts of live, open and leaked sessions."""
+        with self._lock:
+            open_sessions = [dict(owner, session=key) for key, owner in self.open.items()]
+        now = time.time()
+        for owner in open_sessions:
+            owner["age_seconds"] = round(now - owner.pop("started"), 3)
+            owner.pop("reported", None)
+        return {"live": len(self.live), "open": open_sessions, "leaked": self.leaked}
+
+    def _collected(self, key: int) -> None:
+        with self._lock:
+            owner = self.open.pop(key, None)
+        if owner is not None and not owner.get("reported"):
+            self._leak("not_closed")
+
+    def _leak(self, reason: str) -> None:
+        with self._lock:
+            self.leaked += 1
+        DB_SESSIONS_LEAKED.inc(reason=reason)
+
+
+class MemoryDiagnostics:
+    """Per-route traced-memory accounting on top of ``tracemalloc``."""
+
+    def __init__(self, frames: int = 10, snapshot_every: int = 100, top: int = 25):
+        self.frames = frames
+        self.snapshot_every = snapshot_every
+        self.top = top
+        self.sessions = SessionTracker()
+        self.enabled = False
+        self.engine = None
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self._routes: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start ``tracemalloc`` if it is not already tracing."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.enabled = True
+
+    def snapshot(self) -> tracemalloc.Snapshot:
+        """Snapshot of traced allocations, without tracemalloc's own."""
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def set_baseline(self) -> None:
+        """Take the snapshot later reports are diffed against."""
+        self.baseline = self.snapshot()
+
+    def start_request(self, route: str) -> None:
+        """Remember the traced memory at the start of a request."""
+        with self._lock:
+            stats = self._routes.setdefault(route, {
+                "requests": 0, "retained_bytes": 0, "max_retained_bytes": 0, "last_diff": [],
+            })
+            stats["requests"] += 1
+            sampled = stats["requests"] % self.snapshot_every == 0
+        g.memory_start = tracemalloc.get_traced_memory()[0]
+        if sampled:
+            g.memory_snapshot = self.snapshot()
+
+    def finish_request(self, route: str) -> None:
+        """Attribute the memory retained by a request to its route."""
+        started = g.pop("memory_start", None)
+        if started is None:
+            return
+        retained = tracemalloc.get_traced_memory()[0] - started
+        before = g.pop("memory_snapshot", None)
+        diff = None
+        if before:
+            diff = _format_stats(self.snapshot().compare_to(before, "lineno"), self.top)
+        with self._lock:
+            stats = self._routes[route]
+            stats["retained_bytes"] += retained
+            stats["max_retained_bytes"] = max(stats["max_retained_bytes"], retained)
+            if diff is not None:
+                stats["last_diff"] = diff
+
+    def report(self, limit: Optional[int] = None) -> dict:
+        """Top allocation sites, per-route growth and session/connection counts."""
+        limit = limit or self.top
+        report = {
+            "enabled": self.enabled,
+            "pid": os.getpid(),
+            "rss_bytes": _rss_bytes(),
+            "sessions": self.sessions.stats(),
+            "connections_checked_out": _checked_out(self.engine),
+        }
+        if not self.enabled or not tracemalloc.is_tracing():
+            return report
+
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = self.snapshot()
+        report["traced_bytes"] = current
+        report["traced_peak_bytes"] = peak
+        report["top_allocations"] = _format_stats(snapshot.statistics("lineno"), limit)
+        if self.baseline is not None:
+            growth = snapshot.compare_to(self.baseline, "lineno")
+            report["growth_since_baseline"] = _format_stats(growth, limit)
+        with self._lock:
+            report["routes"] = {
+                route: dict(stats, last_diff=list(stats["last_diff"]))
+                for route, stats in sorted(
+                    self._routes.items(), key=lambda item: item[1]["retained_bytes"], reverse=True
+                )
+            }
+        return report
+
+
+diagnostics = MemoryDiagnostics(
+    frames=config.MEMORY_TRACEMALLOC_FRAMES,
+    snapshot_every=config.MEMORY_SNAPSHOT_EVERY,
+    top=config.MEMORY_TOP_ALLOCATIONS,
+)
+
+
+def _route() -> str:
+    rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    return f"{request.method} {rule}"
+
+
+def _format_stats(stats, limit: int) -> List[dict]:
+    formatted = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        entry = {
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        if hasattr(stat, "size_diff"):
+            entry["size_diff_bytes"] = stat.size_diff
+            entry["count_diff"] = stat.count_diff
+        formatted.append(entry)
+    return formatted
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS where /proc is unavailable (KiB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _checked_out(engine) -> Optional[int]:
+    checkedout = getattr(getattr(engine, "pool", None), "checkedout", None)
+    return checkedout() if callable(checkedout) else None
+
+
+def _after_begin(session, transaction, connection):
+    diagnostics.sessions.begin(session)
+
+
+def _after_transaction_end(session, transaction):
+    if transaction.parent is None:
+        diagnostics.sessions.end(session)
+
+
+def install_memory_diagnostics(app, engine, session_factory) -> MemoryDiagnostics:
+    """Track memory per route and sessions made by ``session_factory``."""
+    diagnostics.engine = engine
+    diagnostics.enable()
+    for name, listener in (
+        ("after_begin", _after_begin),
+        ("after_transaction_end", _after_transaction_end),
+    ):
+        if not event.contains(session_factory, name, listener):
+            event.listen(session_factory, name, listener)
+
+    DB_SESSIONS_LIVE.set_function(lambda: len(diagnostics.sessions.live))
+    DB_SESSIONS_OPEN.set_function(lambda: len(diagnostics.sessions.open))
+
+    @app.before_request
+    def start_memory_accounting():
+        diagnostics.start_request(_route())
+
+    @app.teardown_request
+    def finish_memory_accounting(exc):
+        diagnostics.finish_request(_route())
+        for leak in diagnostics.sessions.check_request():
+            current_app.logger.warning(
+                "Database session outlived its request",
+                extra={"fields": {"route": leak["route"], "session": leak["session"]}},
+            )
+
+    app.extensions["memory"] = diagnostics
+    return diagnostics
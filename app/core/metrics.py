@@ -0,0 +1,533 @@
+"""Prometheus-format metrics with per-thread shards and multi-process aggregation.
+
+Counters and histograms are recorded into a dict owned by the calling
+thread, so the hot path takes no lock; shards are only merged when metrics
+are scraped, and the shards of finished threads are folded into one. When
+``METRICS_MULTIPROC_DIR`` is set, every process writes its merged values to
+``<dir>/metrics_<pid>.json`` and a scrape served by any worker sums the files
+of all of them. The files of processes that have exited are folded into
+``metrics_dead.json``: their counters and histograms keep counting, their
+gauges are dropped.
+"""
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no pre-fork server, one process per directory
+    fcntl = None
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import Response, g, request
+
+from app.core.config import get_config
+
+config = get_config()
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+class Registry:
+    """Set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        """Add a metric; names must be unique."""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        """JSON-serializable values of every metric in this process."""
+        return {
+            name: {
+                "kind": metric.kind,
+                "help": metric.help,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", ())),
+                "samples": [[list(labels), value] for labels, value in metric.collect().items()],
+            }
+            for name, metric in list(self._metrics.items())
+        }
+
+    def reset(self) -> None:
+        """Drop every recorded value (used in forked children and tests)."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+
+registry = Registry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        registry: Registry = registry
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        # Values of finished threads, then one shard per live thread
+        self._base: dict = {}
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._shards_lock = threading.Lock()
+        registry.register(self)
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                # A thread per request would otherwise leave a shard per request
+                self._fold_finished()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _fold_finished(self) -> None:
+        # Caller holds _shards_lock; a finished thread no longer writes its shard
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._merge_into(self._base, shard)
+        self._shards = live
+
+    def _merged(self) -> dict:
+        with self._shards_lock:
+            self._fold_finished()
+            totals = self._merge_into({}, self._base)
+            for _, shard in self._shards:
+                self._merge_into(totals, shard)
+        return totals
+
+    def _merge_into(self, totals: dict, shard: dict) -> dict:
+        raise NotImplementedError
+
+    def _key(self, labels: dict) -> Labels:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def reset(self) -> None:
+        with self._shards_lock:
+            self._base = {}
+            self._shards = []
+            self._local = threading.local()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Add ``amount`` to the series selected by ``labels``."""
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def collect(self) -> Dict[Labels, float]:
+        """Values merged across threads."""
+        return self._merged()
+
+    def _merge_into(self, totals: dict, shard: dict) -> dict:
+        for key, value in list(shard.items()):
+            totals[key] = totals.get(key, 0) + value
+        return totals
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets=DEFAULT_BUCKETS,
+        **kwargs
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, **kwargs)
+
+    def observe(self, value: float, **labels) -> None:
+        """Record ``value`` in the series selected by ``labels``."""
+        shard = self._shard()
+        key = self._key(labels)
+        # Per-bucket (non-cumulative) counts, then +Inf, sum and count
+        state = shard.get(key)
+        if state is None:
+            state = shard[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> Dict[Labels, list]:
+        """Bucket counts, sum and count merged across threads."""
+        return self._merged()
+
+    def _merge_into(self, totals: dict, shard: dict) -> dict:
+        for key, state in list(shard.items()):
+            total = totals.get(key)
+            totals[key] = list(state) if total is None else [a + b for a, b in zip(total, state)]
+        return totals
+
+
+class Gauge(_Metric):
+    """Point-in-time value, set directly or read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), **kwargs):
+        super().__init__(name, help, labelnames, **kwargs)
+        self._values: Dict[Labels, float] = {}
+        self._function: Optional[Callable[[], Optional[float]]] = None
+
+    def set(self, value: float, **labels) -> None:
+        """Set the series selected by ``labels``."""
+        self._values[self._key(labels)] = value
+
+    def set_function(self, fn: Callable[[], Optional[float]]) -> None:
+        """Read the (unlabelled) value from ``fn`` whenever metrics are collected."""
+        self._function = fn
+
+    def collect(self) -> Dict[Labels, float]:
+        """Current values."""
+        values = dict(self._values)
+        if self._function is not None:
+            value = self._function()
+            if value is not None:
+                values[()] = value
+        return values
+
+    def reset(self) -> None:
+        self._values = {}
+
+
+def merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    """Sum the samples of several process snapshots."""
+    merged: dict = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, dict(metric, samples={}))
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif isinstance(value, list):
+                    target["samples"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["samples"][key] = current + value
+    for metric in merged.values():
+        metric["samples"] = [[list(key), value] for key, value in metric["samples"].items()]
+    return merged
+
+
+def render(snapshot: dict) -> str:
+    """Prometheus text exposition of a snapshot."""
+    lines = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        names = metric["labelnames"]
+        for labels, value in sorted(metric["samples"], key=lambda sample: sample[0]):
+            pairs = list(zip(names, labels))
+            if metric["kind"] == "histogram":
+                cumulative = 0
+                bounds = [_format_value(b) for b in metric["buckets"]] + ["+Inf"]
+                for bound, count in zip(bounds, value[:-2]):
+                    cumulative += count
+                    bucket = _format_labels(pairs + [("le", bound)])
+                    lines.append(f"{name}_bucket{bucket} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(pairs)} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{_format_labels(pairs)} {value[-1]}")
+            else:
+                lines.append(f"{name}{_format_labels(pairs)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+DEAD_FILE = "metrics_dead.json"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _retired(snapshot: dict) -> dict:
+    """What an exited process still contributes: its counters and histograms."""
+    return {name: metric for name, metric in snapshot.items() if metric["kind"] != "gauge"}
+
+
+def clear_multiprocess_dir(directory: str) -> None:
+    """Remove every process's values; the master calls this before forking workers."""
+    for path in glob.glob(os.path.join(directory, "metrics_*.json*")):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class MultiprocessWriter:
+    """Periodically persists this process's values for cross-worker scrapes."""
+
+    def __init__(self, directory: str, interval: float = 5.0, registry: Registry = registry):
+        self.directory = directory
+        self.interval = interval
+        self.registry = registry
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self) -> None:
+        """Start the background flush thread (once per process)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def flush(self) -> None:
+        """Write this process's snapshot atomically."""
+        path = os.path.join(self.directory, f"metrics_{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.registry.snapshot(), f)
+        os.replace(tmp, path)
+
+    def collect(self) -> dict:
+        """Merged snapshot of every process writing to the directory."""
+        self.flush()
+        with self._locked():
+            self._fold_dead()
+            snapshots = [snapshot for _, snapshot in self._read_all()]
+        return merge_snapshots(snapshots)
+
+    def _fold_dead(self) -> None:
+        """Fold the files of exited processes into ``metrics_dead.json``."""
+        dead_path = os.path.join(self.directory, DEAD_FILE)
+        folded = []
+        for path, snapshot in self._read_all():
+            pid = os.path.basename(path)[len("metrics_"):-len(".json")]
+            if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+                folded.append((path, snapshot))
+        if not folded:
+            return
+        snapshots = [_retired(snapshot) for _, snapshot in folded]
+        if os.path.exists(dead_path):
+            with open(dead_path) as f:
+                snapshots.append(json.load(f))
+        tmp = f"{dead_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(merge_snapshots(snapshots), f)
+        os.replace(tmp, dead_path)
+        for path, _ in folded:
+            os.remove(path)
+
+    def _read_all(self) -> List[Tuple[str, dict]]:
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, "metrics_*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append((path, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    @contextmanager
+    def _locked(self):
+        # Scrapes in different workers must not fold the same file twice
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status",
+    ("blueprint", "route", "method", "status"),
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ("blueprint", "route", "method"),
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "bcrypt_hash_duration_seconds", "Time spent hashing passwords",
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0),
+)
+PASSWORD_VERIFY_SECONDS = Histogram(
+    "bcrypt_verify_duration_seconds", "Time spent verifying passwords",
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0),
+)
+RESPONSES_COMPRESSED = Counter(
+    "http_responses_compressed_total",
+    "Compressed responses by encoding and cache result (hit, miss, stream)",
+    ("encoding", "cache"),
+)
+JWT_VERIFICATIONS = Counter("jwt_verify_total", "JWT verifications by result", ("result",))
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+POOL_CONNECT_SECONDS = Histogram(
+    "db_pool_connect_seconds", "Time spent opening database connections",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+POOL_PINGS = Counter(
+    "db_pool_pings_total", "Connection liveness pings by trigger and result", ("trigger", "result")
+)
+POOL_IDLE_CLOSED = Counter(
+    "db_pool_idle_closed_total", "Connections closed after sitting idle too long"
+)
+POOL_SIZE = Gauge("db_pool_size", "Configured connection pool size")
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out")
+POOL_CHECKED_IN = Gauge("db_pool_checked_in", "Idle connections open in the pool")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond the pool size")
+SQLITE_WRITER_BATCH_SIZE = Histogram(
+    "sqlite_writer_batch_size", "Writes committed together by the SQLite writer",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+JOBS_ENQUEUED = Counter("jobs_enqueued_total", "Background jobs enqueued by name", ("name",))
+JOBS_RUN = Counter(
+    "jobs_run_total",
+    "Background job runs by name and result (ok, retry, failed)",
+    ("name", "result"),
+)
+JOB_SECONDS = Histogram(
+    "job_duration_seconds", "Background job run time by name", ("name",),
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0),
+)
+AUDIT_BATCH_SIZE = Histogram(
+    "audit_batch_size", "Audit entries inserted per flush",
+    buckets=(1, 5, 10, 50, 100, 200, 500, 1000),
+)
+AUDIT_FLUSH_ERRORS = Counter(
+    "audit_flush_errors_total", "Audit flushes that failed and were kept for retry"
+)
+AUDIT_DEAD_LETTERED = Counter(
+    "audit_entries_dead_lettered_total",
+    "Audit entries the database kept rejecting, moved to a dead-letter file",
+)
+ROWS_ARCHIVED = Counter(
+    "rows_archived_total", "Soft-deleted rows moved to archive tables by table", ("table",)
+)
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total", "Log records dropped because the log buffer was full"
+)
+
+# Forked workers must not report the parent's values as their own
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.reset)
+
+
+def _pool_stat(engine, name: str) -> Callable[[], Optional[float]]:
+    # Looked up on every read: dispose() (at fork, for one) replaces the pool
+    def read():
+        method = getattr(engine.pool, name, None)
+        return method() if callable(method) else None
+    return read
+
+
+def install_metrics(app, engine) -> None:
+    """Record request metrics for ``app`` and serve them at ``/metrics``."""
+    POOL_SIZE.set_function(_pool_stat(engine, "size"))
+    POOL_CHECKED_OUT.set_function(_pool_stat(engine, "checkedout"))
+    POOL_CHECKED_IN.set_function(_pool_stat(engine, "checkedin"))
+    overflow = _pool_stat(engine, "overflow")
+    # QueuePool counts overflow from -pool_size; report only connections beyond it
+    POOL_OVERFLOW.set_function(lambda: None if overflow() is None else max(0, overflow()))
+
+    writer = None
+    if config.METRICS_MULTIPROC_DIR:
+        writer = MultiprocessWriter(config.METRICS_MULTIPROC_DIR, config.METRICS_FLUSH_SECONDS)
+        writer.start()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=writer.start)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        blueprint = request.blueprint or "app"
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - started, blueprint=blueprint, route=route, method=request.method
+        )
+        REQUESTS.inc(
+            blueprint=blueprint, route=route, method=request.method, status=response.status_code
+        )
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        """Prometheus scrape endpoint."""
+        snapshot = writer.collect() if writer is not None else registry.snapshot()
+        return Response(render(snapshot), content_type=CONTENT_TYPE)
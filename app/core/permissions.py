@@ -1,80 +1,114 @@
 """Permission and role checking utilities."""
-from enum import Enum
-from typing import List
+from functools import wraps
+from typing import List, Optional
 
-from flask import request
+from flask import g, request
 
 from app.core.auth import decode_access_token
-
-
-class Role(str, Enum):
-    """User roles."""
-    ADMIN = "admin"
-    MEMBER = "member"
+from app.core.policy import Principal, Role, policy  # noqa: F401
+from app.core.tracing import span
+from app.shared.responses import error_response
 
 
 def get_current_user() -> dict:
     """Extract current user from JWT token in request headers."""
+    if "jwt_claims" not in g:
+        g.jwt_claims = _decode_request_token()
+    return g.jwt_claims
+
+
+def get_principal() -> Optional[Principal]:
+    """Authenticated principal of the current request, resolved once and cached."""
+    if "principal" not in g:
+        claims = get_current_user()
+        g.principal = Principal.from_claims(claims) if claims else None
+    return g.principal
+
+
+def _decode_request_token() -> Optional[dict]:
     auth_header = request.headers.get("Authorization")
-    
+
     if not auth_header or not auth_header.startswith("Bearer "):
         return None
-    
+
     token = auth_header.split(" ")[1]
-    return decode_access_token(token)
+    with span("get_current_user"):
+        return decode_access_token(token)
+
+
+def _unauthorized():
+    return error_response(
+        error="UNAUTHORIZED",
+        message="Authentication required",
+        status_code=401
+    )
+
+
+def _forbidden(message: Optional[str] = None):
+    return error_response(
+        error="FORBIDDEN",
+        message=message or "You don't have permission to access this resource",
+        status_code=403
+    )
 
 
 def require_auth(f):
     """Decorator to require authentication."""
-    from functools import wraps
-    
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        current_user = get_current_user()
-        if not current_user:
-            from flask import jsonify
-            return jsonify({"error": "Unauthorized"}), 401
+        if not get_principal():
+            return _unauthorized()
         return f(*args, **kwargs)
     return decorated_function
 
 
-def require_role(required_role: str):
-    """Decorator to require a specific role."""
+def require_permission(
+    permission: str,
+    owner_arg: Optional[str] = None,
+    message: Optional[str] = None
+):
+    """Decorator to require a policy permission.
+
+    With ``owner_arg``, the view argument of that name is the owner of the
+    target resource and the ``<permission>:self`` variant also grants access.
+    """
+    policy.bit(permission)  # fail at import time on typos
+
     def decorator(f):
-        from functools import wraps
-        
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            current_user = get_current_user()
-            if not current_user:
-                from flask import jsonify
-                return jsonify({"error": "Unauthorized"}), 401
-            
-            if current_user.get("role") != required_role:
-                from flask import jsonify
-                return jsonify({"error": "Forbidden"}), 403
-            
+            principal = get_principal()
+            if not principal:
+                return _unauthorized()
+
+            owner_id = kwargs.get(owner_arg) if owner_arg else None
+            if not principal.can(permission, owner_id):
+                return _forbidden(message)
+
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
 
+def require_role(required_role: str):
+    """Decorator to require a specific role."""
+    return require_any_role([required_role])
+
+
 def require_any_role(required_roles: List[str]):
     """Decorator to require any of the specified roles."""
+    allowed = frozenset(Role(role).value for role in required_roles)
+
     def decorator(f):
-        from functools import wraps
-        
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            current_user = get_current_user()
-            if not current_user:
-                from flask import jsonify
-                return jsonify({"error": "Unauthorized"}), 401
-            
-            if current_user.get("role") not in required_roles:
-                from flask import jsonify
-                return jsonify({"error": "Forbidden"}), 403
-            
+            principal = get_principal()
+            if not principal:
+                return _unauthorized()
+
+            if principal.role not in allowed:
+                return _forbidden()
+
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -0,0 +1,155 @@
+"""Declarative authorization policy compiled to per-role permission bitmasks.
+
+Permissions are declared once in ``PERMISSIONS`` and granted to roles in
+``ROLE_PERMISSIONS``. At import time the table is compiled into one integer
+bit per permission and one mask per role, so a check is a dict lookup and a
+bitwise AND. A permission with a ``:self`` suffix grants the base permission
+only on resources owned by the principal (self-or-admin rules).
+"""
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import false, true
+
+
+class Role(str, Enum):
+    """User roles."""
+    ADMIN = "admin"
+    MEMBER = "member"
+
+
+PERMISSIONS: Tuple[str, ...] = (
+    "users:create",
+    "users:list",
+    "users:read",
+    "users:read:self",
+    "users:update",
+    "users:delete",
+    "clinics:create",
+    "clinics:list",
+    "clinics:list:inactive",
+    "clinics:read",
+    "clinics:update",
+    "clinics:delete",
+    "audit:read",
+    "ops:profile",
+    "ops:diagnostics",
+)
+
+ROLE_PERMISSIONS: Dict[str, Tuple[str, ...]] = {
+    Role.ADMIN.value: PERMISSIONS,
+    Role.MEMBER.value: (
+        "users:read:self",
+        "clinics:list",
+        "clinics:read",
+    ),
+}
+
+
+class Policy:
+    """Compiled permission table."""
+
+    def __init__(self, permissions: Iterable[str], role_permissions: Mapping[str, Iterable[str]]):
+        self.bits: Dict[str, int] = {name: 1 << i for i, name in enumerate(permissions)}
+        self.masks: Dict[str, int] = {}
+        for role, granted in role_permissions.items():
+            mask = 0
+            for name in granted:
+                mask |= self.bit(name)
+            self.masks[role] = mask
+
+    def bit(self, permission: str) -> int:
+        """Bit assigned to ``permission``."""
+        try:
+            return self.bits[permission]
+        except KeyError:
+            raise ValueError(f"Unknown permission: {permission}") from None
+
+    def mask_for(self, role: Optional[str]) -> int:
+        """Permission mask of ``role`` (0 for unknown roles)."""
+        return self.masks.get(role, 0)
+
+    def role_allows(
+        self,
+        role: str,
+        permission: str,
+        owner_id: Optional[int] = None,
+        principal_id: Optional[int] = None,
+    ) -> bool:
+        """Check a permission for a bare role, optionally against a resource owner."""
+        principal = Principal(id=principal_id, role=role, mask=self.mask_for(role))
+        return principal.can(permission, owner_id)
+
+
+def compile_policy(
+    permissions: Iterable[str] = PERMISSIONS,
+    role_permissions: Mapping[str, Iterable[str]] = ROLE_PERMISSIONS,
+) -> Policy:
+    """Compile a permission table into bitmasks."""
+    return Policy(permissions, role_permissions)
+
+
+policy = compile_policy()
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller of a request."""
+
+    id: Optional[int]
+    role: str
+    mask: int
+    email: Optional[str] = None
+
+    @classmethod
+    def from_claims(cls, claims: dict) -> Optional["Principal"]:
+        """Build a principal from decoded JWT claims; ``None`` if they name no valid subject."""
+        sub = claims.get("sub")
+        role = claims.get("role")
+        try:
+            principal_id = int(sub) if sub is not None else None
+        except (TypeError, ValueError):
+            return None
+        return cls(
+            id=principal_id,
+            role=role,
+            mask=policy.mask_for(role),
+            email=claims.get("email"),
+        )
+
+    def has(self, permission: str) -> bool:
+        """Whether the principal holds ``permission`` outright."""
+        bit = policy.bit(permission)
+        return self.mask & bit == bit
+
+    def can(self, permission: str, owner_id: Optional[int] = None) -> bool:
+        """Whether the principal may use ``permission`` on a resource owned by ``owner_id``."""
+        if self.has(permission):
+            return True
+        self_bit = policy.bits.get(f"{permission}:self")
+        return (
+            self_bit is not None
+            and owner_id is not None
+            and self.mask & self_bit == self_bit
+            and owner_id == self.id
+        )
+
+    def where(self, permission: str, owner_column=None):
+        """SQL criterion restricting a list query to rows the principal may see.
+
+        Returns ``true()`` when the permission is held outright, an owner match
+        when only the ``:self`` variant is held (and ``owner_column`` is
+        given), and ``false()`` otherwise.
+        """
+        if self.has(permission):
+            return true()
+        self_bit = policy.bits.get(f"{permission}:self")
+        if owner_column is not None and self_bit is not None and self.mask & self_bit == self_bit:
+            return owner_column == self.id
+        return false()
+
+
+def role_principals() -> List[Principal]:
+    """An anonymous principal per role, for work done on behalf of every role."""
+    return [Principal(id=None, role=role, mask=mask) for role, mask in policy.masks.items()]
@@ -0,0 +1,198 @@
+"""Connection pool that stays warm and checks liveness only when it must.
+
+``pool_pre_ping`` costs a round trip on every checkout. ``ManagedQueuePool``
+pings a connection at checkout only if it sat idle longer than
+``DB_PING_IDLE_SECONDS``. A ``PoolMaintainer`` thread in each worker keeps
+idle connections younger than that by pinging them in the background,
+reconnects the ones that failed, closes those idle past
+``DB_POOL_MAX_IDLE_SECONDS`` beyond ``DB_POOL_MIN_SIZE`` and tops the pool
+back up to that size. In steady state requests pay neither a ping nor a
+connect; checkout wait, connect time and pings are exported as metrics.
+"""
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.util import queue as sqla_queue
+
+from app.core.config import get_config
+from app.core.metrics import POOL_CHECKOUT_WAIT, POOL_CONNECT_SECONDS, POOL_IDLE_CLOSED, POOL_PINGS
+
+config = get_config()
+
+# Key in each connection record's ``info``: when it was last returned or pinged
+IDLE_SINCE = "idle_since"
+
+
+class ManagedQueuePool(QueuePool):
+    """QueuePool with idle-aware liveness checks, warm-up and maintenance."""
+
+    ping_idle_seconds: float = config.DB_PING_IDLE_SECONDS
+    max_idle_seconds: float = config.DB_POOL_MAX_IDLE_SECONDS
+    min_size: int = config.DB_POOL_MIN_SIZE
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+        if self._idle(record, time.monotonic()) > self.ping_idle_seconds:
+            # A failed ping invalidates the record; checkout then reconnects it
+            self._ping(record, "checkout")
+        return record
+
+    def _do_return_conn(self, record):
+        record.info[IDLE_SINCE] = time.monotonic()
+        super()._do_return_conn(record)
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        record = super()._create_connection()
+        POOL_CONNECT_SECONDS.observe(time.perf_counter() - started)
+        record.info[IDLE_SINCE] = time.monotonic()
+        return record
+
+    def open_connections(self) -> int:
+        """Connections currently open, idle or checked out."""
+        # QueuePool counts overflow from -pool_size
+        return self.size() + self.overflow()
+
+    def fill(self, size: Optional[int] = None) -> int:
+        """Open connections until ``size`` (default ``min_size``) are open.
+
+        Never opens more than ``pool_size``. Returns how many were opened.
+        """
+        target = self.min_size if size is None else size
+        if self.size() > 0:
+            target = min(target, self.size())
+        opened = 0
+        while self.open_connections() < target and self._inc_overflow():
+            try:
+                record = self._create_connection()
+            except BaseException:
+                self._dec_overflow()
+                raise
+            self._return_idle(record)
+            opened += 1
+        return opened
+
+    def maintain(self, interval: float = 0.0) -> None:
+        """One pass over the idle connections.
+
+        Pings those that would pass ``ping_idle_seconds`` before the next pass,
+        ``interval`` seconds from now, so checkouts find them fresh.
+        """
+        now = time.monotonic()
+        for _ in range(self.checkedin()):
+            try:
+                record = self._pool.get(False)
+            except sqla_queue.Empty:
+                break
+            idle = self._idle(record, now)
+            if idle > self.max_idle_seconds and self.open_connections() > self.min_size:
+                record.close()
+                self._dec_overflow()
+                POOL_IDLE_CLOSED.inc()
+                continue
+            if record.dbapi_connection is not None and idle + interval >= self.ping_idle_seconds:
+                self._ping(record, "background")
+            if record.dbapi_connection is None:
+                self._reconnect(record)
+            self._return_idle(record)
+        self.fill()
+
+    def _idle(self, record, now: float) -> float:
+        since = record.info.get(IDLE_SINCE)
+        if since is None or record.dbapi_connection is None:
+            return 0.0
+        return now - since
+
+    def _ping(self, record, trigger: str) -> bool:
+        try:
+            self._dialect.do_ping(record.dbapi_connection)
+            if trigger == "background":
+                # Don't leave the ping's implicit transaction open while idle
+                self._dialect.do_rollback(record.dbapi_connection)
+        except Exception as e:
+            POOL_PINGS.inc(trigger=trigger, result="failed")
+            record.invalidate(e)
+            return False
+        POOL_PINGS.inc(trigger=trigger, result="ok")
+        record.info[IDLE_SINCE] = time.monotonic()
+        return True
+
+    def _reconnect(self, record) -> None:
+        started = time.perf_counter()
+        try:
+            record.get_connection()
+        except Exception:
+            # Database still unreachable: checkout retries the connect
+            return
+        POOL_CONNECT_SECONDS.observe(time.perf_counter() - started)
+        record.info[IDLE_SINCE] = time.monotonic()
+
+    def _return_idle(self, record) -> None:
+        # Like _do_return_conn but keeps the record's idle time
+        try:
+            self._pool.put(record, False)
+        except sqla_queue.Full:
+            try:
+                record.close()
+            finally:
+                self._dec_overflow()
+
+
+class PoolMaintainer:
+    """Runs ``maintain`` on an engine's pool every ``interval`` seconds."""
+
+    def __init__(self, engine, interval: float):
+        self.engine = engine
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background thread (once per process)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="pool-maintainer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            # Looked up each pass: dispose() replaces the engine's pool
+            pool = self.engine.pool
+            if not isinstance(pool, ManagedQueuePool):
+                continue
+            try:
+                pool.maintain(self.interval)
+            except Exception:
+                # Unreachable database; checkouts report it, retry next pass
+                pass
+
+
+def start_pool_maintenance(engine) -> Optional[PoolMaintainer]:
+    """Warm ``engine``'s pool up to ``DB_POOL_MIN_SIZE`` and keep it maintained.
+
+    Called by each worker before it accepts requests; raises if the database
+    cannot be reached. Returns the running maintainer, or None if the pool is
+    not a ``ManagedQueuePool`` or ``DB_POOL_MAINTAIN_SECONDS`` is 0.
+    """
+    pool = engine.pool
+    if not isinstance(pool, ManagedQueuePool):
+        return None
+    maintainer = None
+    if config.DB_POOL_MAINTAIN_SECONDS > 0:
+        # Started first: if the database is down now, later passes fill the pool
+        maintainer = PoolMaintainer(engine, config.DB_POOL_MAINTAIN_SECONDS)
+        maintainer.start()
+    pool.fill()
+    return maintainer
@@ -0,0 +1,201 @@
+"""On-demand request profiling and a low-frequency sampling profiler.
+
+An admin can profile a single request by sending ``X-Profile: 1`` or
+``?__profile=1``: the view runs under ``cProfile`` and the report is saved to
+``PROFILE_DIR`` (named in the ``X-Profile-Report`` response header). With the
+value ``text`` the pstats report replaces the response body instead.
+
+The sampling profiler (``SAMPLING_PROFILER_ENABLED``) snapshots the stacks of
+threads serving requests ``SAMPLING_PROFILER_HZ`` times a second and writes
+per-route collapsed-stack files (``<route>.<pid>.collapsed``) that
+flamegraph.pl and speedscope read directly.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter as _Counts
+from typing import Dict, Optional
+
+from flask import Response, g, request
+
+from app.core.config import get_config
+from app.core.permissions import get_principal
+
+config = get_config()
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ARG = "__profile"
+
+# cProfile instruments one request at a time; concurrent requests are not profiled
+_profile_lock = threading.Lock()
+
+
+def _route_name() -> str:
+    rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    return f"{request.method} {rule}"
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") or "root"
+
+
+def _requested_mode() -> Optional[str]:
+    return request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_ARG)
+
+
+def start_request_profile() -> None:
+    """Begin profiling the current request if an admin asked for it."""
+    mode = _requested_mode()
+    if not mode or mode == "0":
+        return
+    principal = get_principal()
+    if not principal or not principal.has("ops:profile"):
+        return
+    if not _profile_lock.acquire(blocking=False):
+        return
+    profiler = cProfile.Profile()
+    g.request_profile = (profiler, mode)
+    profiler.enable()
+
+
+def finish_request_profile(response):
+    """Stop profiling and attach or store the report."""
+    state = g.pop("request_profile", None)
+    if state is None:
+        return response
+    profiler, mode = state
+    try:
+        profiler.disable()
+    finally:
+        _profile_lock.release()
+
+    if mode == "text":
+        report = io.StringIO()
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats("cumulative").print_stats(config.PROFILE_TOP_FUNCTIONS)
+        profiled = Response(report.getvalue(), content_type="text/plain; charset=utf-8")
+        profiled.headers["X-Profiled-Status"] = str(response.status_code)
+        return profiled
+
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{_slug(_route_name())}.prof"
+    profiler.dump_stats(os.path.join(config.PROFILE_DIR, filename))
+    response.headers["X-Profile-Report"] = filename
+    return response
+
+
+def abort_request_profile(exc) -> None:
+    """Release the profiler if the request ended without ``finish_request_profile``."""
+    state = g.pop("request_profile", None)
+    if state is not None:
+        state[0].disable()
+        _profile_lock.release()
+
+
+class SamplingProfiler:
+    """Periodically samples the stacks of threads that are serving requests."""
+
+    def __init__(self, directory: str, hz: float = 19.0, flush_interval: float = 60.0):
+        self.directory = directory
+        self.interval = 1.0 / hz
+        self.flush_interval = flush_interval
+        self._active: Dict[int, str] = {}
+        self._stacks: Dict[str, _Counts] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def enter(self, route: str) -> None:
+        """Mark the calling thread as serving ``route``."""
+        self._active[threading.get_ident()] = route
+
+    def exit(self) -> None:
+        """Mark the calling thread as idle."""
+        self._active.pop(threading.get_ident(), None)
+
+    def start(self) -> None:
+        """Start the sampling thread (once per process)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def sample(self) -> None:
+        """Record one stack per busy thread."""
+        frames = sys._current_frames()
+        for thread_id, route in list(self._active.items()):
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            stack = collapse(frame)
+            with self._lock:
+                self._stacks.setdefault(route, _Counts())[stack] += 1
+
+    def flush(self) -> None:
+        """Write the cumulative samples of this process, one file per route."""
+        with self._lock:
+            snapshot = {route: dict(counts) for route, counts in self._stacks.items()}
+        os.makedirs(self.directory, exist_ok=True)
+        for route, counts in snapshot.items():
+            path = os.path.join(self.directory, f"{_slug(route)}.{os.getpid()}.collapsed")
+            with open(f"{path}.tmp", "w") as f:
+                for stack, count in sorted(counts.items()):
+                    f.write(f"{stack} {count}\n")
+            os.replace(f"{path}.tmp", path)
+
+    def _run(self) -> None:
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+            if time.monotonic() >= next_flush:
+                next_flush = time.monotonic() + self.flush_interval
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+
+def collapse(frame) -> str:
+    """Render a stack as ``root;...;leaf`` frame labels."""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        labels.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def install_profiling(app) -> Optional[SamplingProfiler]:
+    """Enable on-demand profiling and, if configured, the sampling profiler."""
+    app.before_request(start_request_profile)
+    app.after_request(finish_request_profile)
+    app.teardown_request(abort_request_profile)
+
+    if not config.SAMPLING_PROFILER_ENABLED:
+        return None
+
+    sampler = SamplingProfiler(
+        config.SAMPLING_PROFILER_DIR,
+        hz=config.SAMPLING_PROFILER_HZ,
+        flush_interval=config.SAMPLING_PROFILER_FLUSH_SECONDS,
+    )
+
+    @app.before_request
+    def mark_sampled_thread():
+        sampler.enter(_route_name())
+
+    @app.teardown_request
+    def unmark_sampled_thread(exc):
+        sampler.exit()
+
+    sampler.start()
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=sampler.start)
+    app.extensions["sampling_profiler"] = sampler
+    return sampler
@@ -0,0 +1,130 @@
+"""Login throttling: token buckets and exponential lockout checked before hashing."""
+import time
+from typing import Optional
+
+from flask import request
+
+from app.core.config import get_config
+from app.shared.exceptions import TooManyRequestsError
+from app.shared.kvstore import MemoryStore, SQLiteStore
+
+config = get_config()
+
+
+class TokenBucket:
+    """Token bucket of ``capacity`` tokens refilled at ``rate`` tokens per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+
+    def take(self, store, key: str) -> float:
+        """Consume one token; return 0 if allowed, else seconds until one is available."""
+        result = {}
+
+        def consume(state):
+            now = time.time()
+            if state is None:
+                tokens = self.capacity
+            else:
+                tokens = min(self.capacity, state["tokens"] + (now - state["ts"]) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                result["wait"] = 0.0
+            else:
+                result["wait"] = (1 - tokens) / self.rate
+            return {"tokens": tokens, "ts": now}
+
+        # A full bucket is indistinguishable from a missing one, so let it expire
+        store.update(key, consume, ttl=self.capacity / self.rate)
+        return result["wait"]
+
+
+class LoginThrottle:
+    """Bounds password-hash work per email and per client IP.
+
+    ``check`` runs before the user lookup and the bcrypt verification, so a
+    rejected attempt costs a store update instead of a hash. Consecutive
+    failures for an email lock it for ``lockout_base * 2 ** n`` seconds
+    (capped at ``lockout_max``) once ``lockout_threshold`` is reached.
+    """
+
+    def __init__(
+        self,
+        store,
+        email_bucket: TokenBucket,
+        ip_bucket: TokenBucket,
+        lockout_threshold: int = 5,
+        lockout_base: float = 30.0,
+        lockout_max: float = 900.0,
+    ):
+        self.store = store
+        self.email_bucket = email_bucket
+        self.ip_bucket = ip_bucket
+        self.lockout_threshold = lockout_threshold
+        self.lockout_base = lockout_base
+        self.lockout_max = lockout_max
+
+    def check(self, email: str, client_ip: Optional[str] = None) -> None:
+        """Raise ``TooManyRequestsError`` if this attempt must not be evaluated."""
+        email = email.lower()
+        lockout = self.store.get(f"lock:{email}")
+        if lockout and lockout["until"] > time.time():
+            self._reject(lockout["until"] - time.time())
+
+        if client_ip:
+            wait = self.ip_bucket.take(self.store, f"ip:{client_ip}")
+            if wait:
+                self._reject(wait)
+
+        wait = self.email_bucket.take(self.store, f"email:{email}")
+        if wait:
+            self._reject(wait)
+
+    def record_failure(self, email: str) -> None:
+        """Count a failed attempt, locking the email out when over the threshold."""
+        def fail(state):
+            failures = (state or {}).get("failures", 0) + 1
+            until = 0.0
+            if failures >= self.lockout_threshold:
+                exponent = failures - self.lockout_threshold
+                until = time.time() + min(self.lockout_max, self.lockout_base * 2 ** exponent)
+            return {"failures": failures, "until": until}
+
+        self.store.update(f"lock:{email.lower()}", fail, ttl=self.lockout_max * 2)
+
+    def record_success(self, email: str) -> None:
+        """Forget past failures after a successful login."""
+        self.store.delete(f"lock:{email.lower()}")
+
+    @staticmethod
+    def _reject(wait: float) -> None:
+        raise TooManyRequestsError(
+            "Too many login attempts, try again later",
+            retry_after=max(1, int(wait + 0.999)),
+        )
+
+
+def client_ip() -> Optional[str]:
+    """Address of the client making the current request."""
+    if config.TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.remote_addr
+
+
+def _build_store():
+    if config.LOGIN_THROTTLE_BACKEND == "sqlite":
+        return SQLiteStore(config.LOGIN_THROTTLE_SQLITE_PATH, table="login_throttle")
+    return MemoryStore()
+
+
+login_throttle = LoginThrottle(
+    store=_build_store(),
+    email_bucket=TokenBucket(config.LOGIN_EMAIL_BURST, config.LOGIN_EMAIL_PER_MINUTE / 60),
+    ip_bucket=TokenBucket(config.LOGIN_IP_BURST, config.LOGIN_IP_PER_MINUTE / 60),
+    lockout_threshold=config.LOGIN_LOCKOUT_THRESHOLD,
+    lockout_base=config.LOGIN_LOCKOUT_BASE_SECONDS,
+    lockout_max=config.LOGIN_LOCKOUT_MAX_SECONDS,
+)
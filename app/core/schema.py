@@ -0,0 +1,71 @@
+"""Startup check that the database schema is at the Alembic head.
+
+Tables are created and changed only by migrations (``alembic upgrade head``).
+At boot the revisions stamped in ``alembic_version`` are compared with the
+heads of ``MIGRATIONS_DIR``, which are read from the migration files' source
+rather than by importing Alembic, so the check costs one query.
+"""
+import ast
+import os
+import re
+from typing import Set
+
+from sqlalchemy import exc, text
+
+_REVISION = re.compile(r"^revision\s*(?::[^=]*)?=\s*(.+)$", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\s*(?::[^=]*)?=\s*(.+)$", re.MULTILINE)
+
+
+class SchemaError(RuntimeError):
+    """The database is not at the head revision of the migrations."""
+
+
+def _literal(source: str):
+    try:
+        return ast.literal_eval(source.split("#")[0].strip())
+    except (ValueError, SyntaxError):
+        return None
+
+
+def head_revisions(directory: str) -> Set[str]:
+    """Revisions in ``directory`` that no other migration revises."""
+    revisions, parents = set(), set()
+    for name in os.listdir(directory):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(directory, name)) as f:
+            source = f.read()
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(_literal(revision.group(1)))
+        down = _DOWN_REVISION.search(source)
+        down = _literal(down.group(1)) if down else None
+        if isinstance(down, str):
+            parents.add(down)
+        elif isinstance(down, (tuple, list)):
+            parents.update(down)
+    return revisions - parents
+
+
+def current_revisions(connection) -> Set[str]:
+    """Revisions stamped in the database; empty if it was never migrated."""
+    try:
+        return set(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+    except exc.DBAPIError as e:
+        # No alembic_version table; a lost connection is a different problem
+        if e.connection_invalidated:
+            raise
+        return set()
+
+
+def check_schema(engine, directory: str) -> None:
+    """Raise ``SchemaError`` unless the database is at the migrations' head."""
+    heads = head_revisions(directory)
+    with engine.connect() as connection:
+        current = current_revisions(connection)
+    if current != heads:
+        raise SchemaError(
+            f"Database schema is at {sorted(current) or 'no revision'}, migrations head is "
+            f"{sorted(heads)}; run 'alembic upgrade head'"
+        )
@@ -0,0 +1,330 @@
+"""Pre-fork production server: ``python -m app serve``.
+
+The master builds the application once, binds the listening socket and
+forks ``SERVER_WORKERS`` workers that inherit both, so imported code and
+configuration stay shared copy-on-write. Each worker accepts from the shared
+socket and serves connections on at most ``SERVER_THREADS`` threads; when all
+of them are busy it stops accepting and leaves new connections to the others.
+
+No database connection crosses the fork: the master disposes the engine's
+pool before forking and every child drops whatever it inherited (see
+``app.db``), so workers open their own: ``DB_POOL_MIN_SIZE`` of them before
+accepting requests, kept fresh in the background (see ``app.core.pool``).
+Each worker also runs background jobs on ``JOBS_WORKERS`` threads of its own
+(see ``app.core.jobs``).
+
+SIGTERM or SIGINT to the master drains the workers: they stop accepting,
+finish the requests in flight, flush logs and spans, and exit. Workers still
+running after ``SERVER_GRACEFUL_TIMEOUT`` seconds are killed. A worker that
+dies on its own is replaced.
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from app.core.config import get_config
+
+config = get_config()
+
+# Workers that exit sooner than this after starting are respawned with a delay
+MIN_WORKER_LIFETIME = 1.0
+
+
+class _RequestHandler(WSGIRequestHandler):
+    def setup(self):
+        # Idle keep-alive connections are closed after this long
+        self.timeout = self.server.keepalive or None
+        super().setup()
+
+    def handle_one_request(self):
+        super().handle_one_request()
+        if self.server.draining or not self.server.keepalive:
+            self.close_connection = True
+
+    def log_request(self, code="-", size="-"):
+        # Requests are recorded by the access log
+        pass
+
+
+class PoolWSGIServer(BaseWSGIServer):
+    """WSGI server handling connections on a bounded pool of threads.
+
+    The accept loop waits while all ``threads`` are busy, so connections it
+    cannot serve yet stay in the listen backlog for other workers.
+    """
+
+    multithread = True
+
+    def __init__(self, app, listener: socket.socket, threads: int = 8, keepalive: float = 5.0):
+        self.keepalive = keepalive
+        self.draining = False
+        self._slots = threading.BoundedSemaphore(threads)
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix="request")
+        host, port = listener.getsockname()[:2]
+        super().__init__(host, port, app, handler=_RequestHandler, fd=listener.fileno())
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def drain(self) -> None:
+        """Stop accepting and wait for the requests in flight.
+
+        Must not be called from the thread running ``serve_forever``.
+        """
+        self.draining = True
+        self.shutdown()
+        self._executor.shutdown(wait=True)
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Listening socket shared by every worker."""
+    listener = socket.create_server((host, port), backlog=backlog)
+    listener.set_inheritable(True)
+    return listener
+
+
+def run_worker(app, listener: socket.socket, threads: int, keepalive: float) -> None:
+    """Serve ``app`` from ``listener`` until SIGTERM or SIGINT, then drain."""
+    server = PoolWSGIServer(app, listener, threads=threads, keepalive=keepalive)
+    drainer = threading.Thread(target=server.drain, name="drain")
+
+    def stop(signum, frame):
+        if not drainer.is_alive() and not server.draining:
+            drainer.start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    maintainer = _warm_pool(app)
+    jobs = _start_jobs()
+    audit = _start_audit()
+    archiver = _start_archiver()
+    app.logger.info("Worker started", extra={"fields": {"pid": os.getpid(), "threads": threads}})
+    try:
+        server.serve_forever()
+    finally:
+        if drainer.is_alive():
+            drainer.join()
+        if maintainer is not None:
+            maintainer.stop()
+        # Let running jobs finish; jobs still queued stay in the table
+        jobs.stop()
+        # Buffered audit entries are committed, or left in the spill file
+        audit.stop()
+        archiver.stop()
+        server.server_close()
+        app.logger.info("Worker stopped", extra={"fields": {"pid": os.getpid()}})
+        _flush(app)
+
+
+def _warm_pool(app):
+    # Connect before accepting requests so the first ones don't pay for it
+    from app.core.pool import start_pool_maintenance
+    from app.db import get_engine
+
+    try:
+        return start_pool_maintenance(get_engine())
+    except Exception as e:
+        app.logger.warning(
+            "Could not warm the connection pool", extra={"fields": {"error": str(e)}}
+        )
+        return None
+
+
+def _start_jobs():
+    # Pick up jobs left queued by earlier processes without waiting for a write
+    from app.core.jobs import get_runner
+
+    runner = get_runner()
+    runner.notify()
+    return runner
+
+
+def _start_audit():
+    # Recover spill files of workers that died before flushing them
+    from app.features.audit.recorder import get_recorder
+
+    recorder = get_recorder()
+    recorder.start()
+    return recorder
+
+
+def _start_archiver():
+    # Every worker archives; batches skip rows another worker has claimed
+    from app.core.archive import get_archiver
+
+    archiver = get_archiver()
+    archiver.start()
+    return archiver
+
+
+def _flush(app) -> None:
+    for name, method in (("tracing", "force_flush"), ("logging", "flush")):
+        flush = getattr(app.extensions.get(name), method, None)
+        if flush is not None:
+            flush()
+
+
+class Master:
+    """Forks workers, replaces the ones that die and drains them on shutdown."""
+
+    def __init__(self, app, listener: socket.socket, workers: int, threads: int,
+                 keepalive: float, graceful_timeout: float):
+        self.app = app
+        self.listener = listener
+        self.workers = workers
+        self.threads = threads
+        self.keepalive = keepalive
+        self.graceful_timeout = graceful_timeout
+        self.children: Dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return pid
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            run_worker(self.app, self.listener, self.threads, self.keepalive)
+        except BaseException:
+            code = 1
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            # Skip the master's atexit handlers and interpreter teardown
+            os._exit(code)
+
+    def run(self) -> None:
+        """Run until SIGTERM or SIGINT, then drain the workers."""
+        def stop(signum, frame):
+            self.stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        for _ in range(self.workers):
+            self.spawn()
+        self.app.logger.info(
+            "Serving",
+            extra={"fields": {
+                "address": "%s:%s" % self.listener.getsockname()[:2],
+                "workers": self.workers,
+                "threads": self.threads,
+            }},
+        )
+        while not self.stopping:
+            self._reap(respawn=True)
+            time.sleep(0.2)
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Ask every worker to drain and kill the ones that outlast the timeout."""
+        for pid in list(self.children):
+            _signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.05)
+        for pid in list(self.children):
+            self.app.logger.warning(
+                "Killing worker after graceful timeout", extra={"fields": {"pid": pid}}
+            )
+            _signal(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            del self.children[pid]
+        self.listener.close()
+        _flush(self.app)
+
+    def _reap(self, respawn: bool) -> None:
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if not pid:
+                return
+            started = self.children.pop(pid, None)
+            if started is None or not respawn or self.stopping:
+                continue
+            self.app.logger.warning(
+                "Worker exited; replacing it",
+                extra={"fields": {"pid": pid, "status": os.waitstatus_to_exitcode(status)
+                                  if hasattr(os, "waitstatus_to_exitcode") else status}},
+            )
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            self.spawn()
+
+
+def _signal(pid: int, signum: int) -> None:
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def serve(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    workers: Optional[int] = None,
+    threads: Optional[int] = None,
+) -> None:
+    """Preload the application and serve it from pre-forked workers."""
+    from app.db import engine
+    from app.main import create_app, warm_up
+
+    workers = workers or config.SERVER_WORKERS
+    threads = threads or config.SERVER_THREADS
+    if config.METRICS_MULTIPROC_DIR:
+        # Values of a previous run's workers are not this run's
+        from app.core.metrics import clear_multiprocess_dir
+
+        clear_multiprocess_dir(config.METRICS_MULTIPROC_DIR)
+    app = create_app()
+    warm_up()
+    listener = bind(
+        host or config.SERVER_HOST,
+        config.SERVER_PORT if port is None else port,
+        config.SERVER_BACKLOG,
+    )
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        run_worker(app, listener, threads, config.SERVER_KEEPALIVE_SECONDS)
+        return
+
+    # Close the master's own connections; children must not share them
+    engine.dispose()
+    # Objects loaded so far are never collected: the collector in each
+    # worker then leaves their pages shared instead of touching them
+    gc.collect()
+    gc.freeze()
+    Master(
+        app,
+        listener,
+        workers=workers,
+        threads=threads,
+        keepalive=config.SERVER_KEEPALIVE_SECONDS,
+        graceful_timeout=config.SERVER_GRACEFUL_TIMEOUT,
+    ).run()
@@ -0,0 +1,74 @@
+"""Soft delete: rows are marked deleted instead of removed.
+
+A model with ``SoftDeleteMixin`` gets a ``deleted_at`` column. Services delete
+with ``soft_delete(obj)``, and every ORM query leaves out rows whose
+``deleted_at`` is set: the criteria are added to each SELECT by a session
+event, so ``session.query(User)``, ``select(User)`` and ``session.get(User, id)``
+all see live rows only. A statement that needs deleted rows too opts out with
+``.execution_options(include_deleted=True)``.
+
+Deleted rows stay in their table until the archiver (``app.core.archive``)
+moves those deleted more than ``ARCHIVE_RETENTION_DAYS`` ago into the table
+registered for them with ``@archives(Model)``::
+
+    @archives(User)
+    class UserArchive(Base):
+        __tablename__ = "users_archive"
+        ...
+
+The archive table keeps the columns it shares with the live table plus
+``deleted_at`` and ``archived_at``; columns it leaves out are not copied.
+"""
+from datetime import datetime
+from typing import Callable, Dict, Type
+
+from sqlalchemy import Column, DateTime, event, text
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+# Execution option that lets a statement see soft-deleted rows
+INCLUDE_DELETED = "include_deleted"
+
+# Predicate of the partial indexes that cover live rows only
+LIVE = text("deleted_at IS NULL")
+DELETED = text("deleted_at IS NOT NULL")
+
+# Live model -> archive model
+_archives: Dict[Type, Type] = {}
+
+
+class SoftDeleteMixin:
+    """Adds ``deleted_at``; a row is live while it is NULL."""
+
+    deleted_at = Column(DateTime, nullable=True)
+
+
+def soft_delete(obj: SoftDeleteMixin) -> None:
+    """Mark ``obj`` deleted; it is written with the session's next flush."""
+    obj.deleted_at = datetime.utcnow()
+
+
+def archives(model: Type[SoftDeleteMixin]) -> Callable[[Type], Type]:
+    """Register the decorated model as the archive table of ``model``."""
+    def register(archive: Type) -> Type:
+        _archives[model] = archive
+        return archive
+    return register
+
+
+def archive_tables() -> Dict[Type, Type]:
+    """Every registered live model and its archive model."""
+    return dict(_archives)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_deleted(state: ORMExecuteState) -> None:
+    # Refreshing or lazy-loading an object already loaded must still find it
+    if not state.is_select or state.is_column_load or state.is_relationship_load:
+        return
+    if state.execution_options.get(INCLUDE_DELETED, False):
+        return
+    state.statement = state.statement.options(
+        with_loader_criteria(
+            SoftDeleteMixin, lambda cls: cls.deleted_at.is_(None), include_aliases=True
+        )
+    )
@@ -0,0 +1,158 @@
+"""SQLite production profile: WAL, tuned pragmas and a single writer.
+
+``install_sqlite_profile`` sets the ``SQLITE_*`` pragmas on every new
+connection and lets SQLAlchemy, not pysqlite, emit ``BEGIN``, so SAVEPOINTs
+nest inside the outer transaction. Sessions bound with the ``sqlite_begin``
+execution option begin with that mode (``IMMEDIATE`` takes the write lock up
+front instead of failing to upgrade a read lock with ``database is locked``).
+
+In WAL mode readers never wait for the writer, but SQLite still allows one
+writer at a time. ``SingleWriter`` runs every service write on one thread:
+writes that queue up while a transaction commits are applied in the next one,
+each in its own SAVEPOINT, and committed together, so a burst of writes pays
+for one fsync instead of contending for the lock. Reads stay on the request's
+own pooled connection and run in parallel.
+"""
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import get_config
+from app.core.metrics import SQLITE_WRITER_BATCH_SIZE
+
+config = get_config()
+
+BEGIN_OPTION = "sqlite_begin"
+
+
+def _pragmas() -> List[str]:
+    pragmas = []
+    if config.SQLITE_JOURNAL_MODE:
+        pragmas.append(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+    if config.SQLITE_SYNCHRONOUS:
+        pragmas.append(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+    pragmas.append(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+    pragmas.append(f"PRAGMA cache_size={config.SQLITE_CACHE_SIZE}")
+    pragmas.append(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+    return pragmas
+
+
+def install_sqlite_profile(engine) -> None:
+    """Apply the SQLite profile to every connection ``engine`` opens."""
+    pragmas = _pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _configure(dbapi_connection, connection_record):
+        # Autocommit at the driver level: the "begin" listener opens transactions
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        mode = conn.get_execution_options().get(BEGIN_OPTION)
+        conn.exec_driver_sql(f"BEGIN {mode}" if mode else "BEGIN")
+
+
+_STOP = object()
+
+
+class SingleWriter:
+    """Runs writes on one thread and commits them in groups.
+
+    ``submit(fn)`` queues ``fn(session)``; the returned future resolves once
+    the transaction it ran in has committed, with ``fn``'s result detached from
+    the writer's session. A write that raises is rolled back to its SAVEPOINT
+    and fails alone; a failed commit fails every write in the group.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch: int = 64):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the writer thread (once per process)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Finish the queued writes and stop the thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, fn: Callable[[Session], Any]) -> Future:
+        """Queue ``fn(session)`` for the writer thread."""
+        self.start()
+        future: Future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def _run(self) -> None:
+        session = self.session_factory()
+        try:
+            while True:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._commit(session, batch)
+                if stop:
+                    return
+        finally:
+            session.close()
+
+    def _next_batch(self) -> Tuple[List[Tuple[Callable, Future]], bool]:
+        # Block for one write, then take whatever queued behind it
+        job = self._queue.get()
+        if job is _STOP:
+            return [], True
+        batch = [job]
+        while len(batch) < self.max_batch:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                return batch, True
+            batch.append(job)
+        return batch, False
+
+    def _commit(self, session: Session, batch: List[Tuple[Callable, Future]]) -> None:
+        outcomes = []
+        try:
+            for fn, future in batch:
+                # Cancelled while queued: its request gave up waiting
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with session.begin_nested():
+                        result = fn(session)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                outcomes.append((future, result))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            for future, _ in outcomes:
+                future.set_exception(e)
+            return
+        finally:
+            session.expunge_all()
+        SQLITE_WRITER_BATCH_SIZE.observe(len(outcomes))
+        for future, result in outcomes:
+            future.set_result(result)
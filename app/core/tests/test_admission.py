@@ -0,0 +1,126 @@
+"""Admission control tests."""
+import random
+import time
+
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from app.core.admission import AdaptiveLimiter, AdmissionMiddleware, route_class
+
+
+def _ok_app(environ, start_response):
+    return Response("ok")(environ, start_response)
+
+
+def _middleware(limit=1, **kwargs):
+    limiters = {
+        name: AdaptiveLimiter(initial_limit=limit, min_limit=1)
+        for name in ("read", "write", "auth")
+    }
+    return AdmissionMiddleware(_ok_app, limiters, **kwargs)
+
+
+def test_route_classes():
+    """Test requests are bucketed by cost."""
+    assert route_class("POST", "/auth/login") == "auth"
+    assert route_class("GET", "/clinics") == "read"
+    assert route_class("PATCH", "/clinics/1") == "write"
+
+
+def test_limit_grows_while_latency_is_flat():
+    """Test additive increase when latency stays near the baseline."""
+    limiter = AdaptiveLimiter(initial_limit=10, max_limit=100)
+    for _ in range(100):
+        assert limiter.try_acquire()
+        limiter.release(0.01)
+    
+    assert limiter.stats()["limit"] > 10
+
+
+def test_limit_shrinks_when_latency_climbs():
+    """Test multiplicative decrease, once per window, while latency exceeds the tolerance."""
+    limiter = AdaptiveLimiter(initial_limit=50, min_limit=5, tolerance=2.0, window=10)
+    for _ in range(10):
+        limiter.try_acquire()
+        limiter.release(0.01)
+    limits = []
+    for _ in range(50):
+        limiter.try_acquire()
+        limiter.release(0.5)
+        limits.append(limiter.stats()["limit"])
+    
+    # Halved at the end of each window, not on every slow response
+    assert limits[:10] == [50] * 9 + [25]
+    assert limiter.stats()["limit"] == 5
+
+
+def test_limit_is_stable_under_steady_mixed_traffic():
+    """Test a healthy mix of fast and slow endpoints never shrinks the limit."""
+    rng = random.Random(42)
+    limiter = AdaptiveLimiter(initial_limit=100, min_limit=2, max_limit=100)
+    # One trivially fast response first, as a 401 would have been
+    limiter.try_acquire()
+    limiter.release(0.0001)
+    limits = []
+    for _ in range(2000):
+        limiter.try_acquire()
+        limiter.release(rng.choice((0.001, 0.003, 0.01, 0.03)))
+        limits.append(limiter.stats()["limit"])
+    
+    assert min(limits) == 100
+
+
+def test_client_errors_are_not_sampled():
+    """Test cheap 4xx responses release their slot without counting as latency samples."""
+    def not_found(environ, start_response):
+        return Response("missing", status=404)(environ, start_response)
+    
+    limiter = AdaptiveLimiter(initial_limit=5, window=1)
+    limiters = {name: limiter for name in ("read", "write", "auth")}
+    client = Client(AdmissionMiddleware(not_found, limiters))
+    for _ in range(3):
+        assert client.get("/clinics/999").status_code == 404
+    
+    assert limiter.stats() == {"limit": 5, "in_flight": 0, "shed": 0}
+    assert limiter._baseline is None
+
+
+def test_sheds_over_limit_with_retry_after():
+    """Test requests beyond the in-flight limit get 503."""
+    middleware = _middleware(limit=1)
+    middleware.limiters["read"].try_acquire()
+    
+    response = Client(middleware).get("/clinics")
+    
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json["error"] == "SERVICE_UNAVAILABLE"
+    assert middleware.limiters["read"].stats()["shed"] == 1
+
+
+def test_health_never_shed():
+    """Test exempt paths bypass the limiter."""
+    middleware = _middleware(limit=1)
+    middleware.limiters["read"].try_acquire()
+    
+    assert Client(middleware).get("/health").status_code == 200
+
+
+def test_slot_released_when_response_closes():
+    """Test the in-flight count drops once the body is consumed."""
+    middleware = _middleware(limit=1)
+    client = Client(middleware)
+    
+    assert client.get("/clinics", buffered=True).status_code == 200
+    assert client.get("/clinics", buffered=True).status_code == 200
+    assert middleware.limiters["read"].in_flight == 0
+
+
+def test_sheds_requests_queued_too_long():
+    """Test requests stamped long ago by the proxy are dropped early."""
+    middleware = _middleware(limit=10, max_queue_delay=0.5)
+    stale = f"t={int((time.time() - 5) * 1000)}"
+    
+    response = Client(middleware).get("/clinics", headers={"X-Request-Start": stale})
+    
+    assert response.status_code == 503
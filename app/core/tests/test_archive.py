@@ -0,0 +1,94 @@
+"""Soft delete and archival tests."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.archive import Archiver
+from app.core.soft_delete import INCLUDE_DELETED
+from app.db import SessionLocal
+from app.features.auth.model import User, UserArchive
+from app.features.clinics.model import Clinic, ClinicArchive
+
+
+@pytest.fixture
+def archiver(db_connection):
+    return Archiver(SessionLocal, retention_days=30, batch_size=2, interval=0)
+
+
+def _all(db, model):
+    db.expire_all()
+    query = select(model).order_by(model.id).execution_options(**{INCLUDE_DELETED: True})
+    return db.scalars(query).all()
+
+
+def test_deleted_clinics_are_hidden_but_kept(client, db, admin_token):
+    """Test a deleted clinic disappears from every read while its row stays."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    kept = client.post(
+        "/clinics", json={"name": "Kept", "address": "1 Main St"}, headers=headers
+    ).json["data"]
+    gone = client.post(
+        "/clinics", json={"name": "Gone", "address": "2 Main St"}, headers=headers
+    ).json["data"]
+
+    assert client.delete(f"/clinics/{gone['id']}", headers=headers).status_code == 200
+    assert client.get(f"/clinics/{gone['id']}", headers=headers).status_code == 404
+    assert client.delete(f"/clinics/{gone['id']}", headers=headers).status_code == 404
+    assert [c["id"] for c in client.get("/clinics", headers=headers).json["data"]] == [kept["id"]]
+
+    db.expire_all()
+    assert db.get(Clinic, gone["id"]) is None
+    (_, deleted) = _all(db, Clinic)
+    assert deleted.deleted_at is not None
+
+
+def test_deleted_users_email_can_be_reused(client, db, admin_token, member_user_id):
+    """Test signing up again with the email of a deleted user."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    email = db.get(User, member_user_id).email
+    assert client.delete(f"/users/{member_user_id}", headers=headers).status_code == 200
+
+    body = {"name": "Again", "email": email, "password": "secret123"}
+    response = client.post("/auth/signup", json=body)
+    assert response.status_code == 201
+    assert [u.email for u in _all(db, User)].count(email) == 2
+
+
+def test_archiver_moves_rows_deleted_before_retention(db, archiver):
+    """Test only rows deleted longer ago than the retention move, in batches."""
+    now = datetime.utcnow()
+    old = now - timedelta(days=31)
+    db.add_all([
+        Clinic(name="Live", address="a"),
+        Clinic(name="Recent", address="b", deleted_at=now - timedelta(days=1)),
+        *[Clinic(name=f"Old {i}", address="c", deleted_at=old) for i in range(3)],
+        User(name="Old", email="old@example.com", password="hash", deleted_at=old),
+    ])
+    db.commit()
+
+    assert archiver.run_once() == {"users": 1, "clinics": 3}
+    assert [c.name for c in _all(db, Clinic)] == ["Live", "Recent"]
+    assert [c.name for c in _all(db, ClinicArchive)] == ["Old 0", "Old 1", "Old 2"]
+    (user,) = _all(db, UserArchive)
+    assert (user.email, user.role, user.deleted_at) == ("old@example.com", "MEMBER", old)
+    assert not hasattr(user, "password")
+    assert archiver.run_once() == {"users": 0, "clinics": 0}
+
+
+def test_archived_ids_are_not_reused(db, archiver):
+    """Test a row created after another was archived gets a new id and archives too."""
+    old = datetime.utcnow() - timedelta(days=31)
+    first = User(name="First", email="first@example.com", password="hash", deleted_at=old)
+    db.add(first)
+    db.commit()
+    first_id = first.id
+    assert archiver.run_once()["users"] == 1
+
+    second = User(name="Second", email="second@example.com", password="hash", deleted_at=old)
+    db.add(second)
+    db.commit()
+    assert second.id != first_id
+    assert archiver.run_once()["users"] == 1
+
+    assert [u.email for u in _all(db, UserArchive)] == ["first@example.com", "second@example.com"]
@@ -0,0 +1,99 @@
+"""Response compression tests: negotiation, thresholds, caching and streaming."""
+import gzip
+import zlib
+
+import pytest
+from flask import Response, jsonify
+
+from app.core import compression
+
+ROWS = [{"id": i, "name": f"Clinic {i}", "address": f"{i} Main St"} for i in range(200)]
+
+
+@pytest.fixture
+def compressed_app(fresh_app):
+    """The app with a large, a small and a streamed route."""
+    @fresh_app.route("/test/large")
+    def large():
+        return jsonify(ROWS)
+
+    @fresh_app.route("/test/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @fresh_app.route("/test/stream")
+    def stream():
+        return Response((f"line {i}\n" * 50 for i in range(3)), mimetype="text/plain")
+
+    fresh_app.extensions["compression"].clear()
+    return fresh_app
+
+
+def test_gzip_when_accepted(compressed_app):
+    """Test large JSON is gzipped for clients that accept it and varies on it."""
+    client = compressed_app.test_client()
+    plain = client.get("/test/large")
+    zipped = client.get("/test/large", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+    assert int(zipped.headers["Content-Length"]) < len(plain.data) / 4
+    assert gzip.decompress(zipped.data) == plain.data
+
+
+def test_small_and_refused_responses_stay_plain(compressed_app):
+    """Test bodies under the threshold and gzip;q=0 are sent uncompressed."""
+    client = compressed_app.test_client()
+    small = client.get("/test/small", headers={"Accept-Encoding": "gzip"})
+    refused = client.get("/test/large", headers={"Accept-Encoding": "gzip;q=0"})
+
+    assert "Content-Encoding" not in small.headers
+    assert "Content-Encoding" not in refused.headers
+    assert refused.json == ROWS
+
+
+def test_same_body_is_compressed_once(compressed_app, monkeypatch):
+    """Test repeated identical payloads are served from the compressed cache."""
+    calls = []
+    original = compression.compress
+
+    def counting(body, encoding):
+        calls.append(encoding)
+        return original(body, encoding)
+
+    monkeypatch.setattr(compression, "compress", counting)
+    client = compressed_app.test_client()
+
+    bodies = {client.get("/test/large", headers={"Accept-Encoding": "gzip"}).data for _ in range(3)}
+    assert calls == ["gzip"]
+    assert len(bodies) == 1
+
+
+def test_streamed_responses_are_compressed_per_chunk(compressed_app):
+    """Test streams are gzipped incrementally, each chunk decodable on arrival."""
+    response = compressed_app.test_client().get("/test/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    chunks = list(response.response)
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decoder.decompress(chunks[0]) == b"line 0\n" * 50
+    assert gzip.decompress(b"".join(chunks)) == b"".join(b"line %d\n" % i * 50 for i in range(3))
+
+
+def test_brotli_preferred_when_available(compressed_app, monkeypatch):
+    """Test br wins over gzip at equal quality when brotli is installed."""
+    class FakeBrotli:
+        @staticmethod
+        def compress(body, quality):
+            return b"br:" + body[:10]
+
+    monkeypatch.setattr(compression, "brotli", FakeBrotli)
+    client = compressed_app.test_client()
+    both = client.get("/test/large", headers={"Accept-Encoding": "gzip, br"})
+    gzip_first = client.get("/test/large", headers={"Accept-Encoding": "br;q=0.5, gzip"})
+
+    assert both.headers["Content-Encoding"] == "br"
+    assert both.data.startswith(b"br:")
+    assert gzip_first.headers["Content-Encoding"] == "gzip"
@@ -0,0 +1,143 @@
+"""Request deadline tests."""
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app.core import deadlines
+from app.core.deadlines import check_deadline, remaining
+from app.core.config import parse_route_timeouts
+from app.db import engine, get_db
+from app.shared.exceptions import GatewayTimeoutError
+
+# Counts forever; only the deadline stops it
+ENDLESS_QUERY = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+)
+
+
+@pytest.fixture
+def slow_app(fresh_app):
+    """Application with a route running an endless query."""
+    @fresh_app.route("/slow")
+    def slow():
+        try:
+            db = next(get_db())
+            db.execute(ENDLESS_QUERY)
+        except GatewayTimeoutError as e:
+            return {"error": e.error_code}, e.status_code
+        return {"error": None}, 200
+    
+    @fresh_app.route("/budget")
+    def budget():
+        return {"remaining": remaining()}
+    
+    return fresh_app
+
+
+@pytest.mark.real_db
+def test_slow_query_interrupted_at_deadline(slow_app):
+    """Test a statement is cancelled when the request runs out of time."""
+    client = slow_app.test_client()
+    started = time.monotonic()
+    
+    response = client.get("/slow", headers={"X-Request-Timeout": "0.2"})
+    
+    assert response.status_code == 504
+    assert response.json["error"] == "GATEWAY_TIMEOUT"
+    assert time.monotonic() - started < 2
+    assert engine.pool.checkedout() == 0
+
+
+def test_header_only_shortens_route_default(slow_app, monkeypatch):
+    """Test clients can lower but not raise the route's deadline."""
+    client = slow_app.test_client()
+    monkeypatch.setattr(deadlines.config, "REQUEST_TIMEOUTS", {"GET /budget": 2.0})
+    
+    shorter = client.get("/budget", headers={"X-Request-Timeout": "0.5"}).json["remaining"]
+    longer = client.get("/budget", headers={"X-Request-Timeout": "60"}).json["remaining"]
+    
+    assert 0 < shorter <= 0.5
+    assert 1 < longer <= 2.0
+
+
+def test_check_deadline(slow_app):
+    """Test check_deadline raises only once the deadline has passed."""
+    with slow_app.test_request_context("/budget"):
+        deadlines.start_deadline()
+        check_deadline()
+        deadlines.g.deadline = time.monotonic() - 1
+        with pytest.raises(GatewayTimeoutError):
+            check_deadline()
+    
+    check_deadline()
+
+
+@pytest.mark.real_db
+def test_request_shares_one_session(slow_app):
+    """Test get_db returns one session per request and closes it at teardown."""
+    with slow_app.test_request_context("/budget"):
+        first = next(get_db())
+        assert next(get_db()) is first
+        first.execute(text("SELECT 1"))
+        assert engine.pool.checkedout() == 1
+        slow_app.do_teardown_request()
+    
+    assert engine.pool.checkedout() == 0
+
+
+def test_parse_route_timeouts():
+    """Test per-route timeouts are parsed from configuration."""
+    assert parse_route_timeouts("GET /users=5, POST  /auth/login=2.5,") == {
+        "GET /users": 5.0,
+        "POST /auth/login": 2.5,
+    }
+
+
+@pytest.mark.parametrize("header", ["0", "-1", "nan", "inf", "soon"])
+def test_header_cannot_remove_deadline(slow_app, monkeypatch, header):
+    """Test non-positive or malformed header values leave the route's deadline."""
+    monkeypatch.setattr(deadlines.config, "REQUEST_TIMEOUTS", {"GET /budget": 2.0})
+    
+    with slow_app.test_request_context("/budget", headers={"X-Request-Timeout": header}):
+        assert deadlines.request_timeout() == 2.0
+
+
+class _Cursor:
+    def __init__(self):
+        self.executed = []
+    
+    def execute(self, statement):
+        self.executed.append(statement)
+    
+    def close(self):
+        pass
+
+
+def test_statement_timeout_sent_only_when_budget_moved(slow_app, monkeypatch):
+    """Test the server-side timeout is not sent again before every statement."""
+    monkeypatch.setattr(deadlines, "STATEMENT_TIMEOUT_SLACK", 0.5)
+    conn = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), info={})
+    cursor = _Cursor()
+    
+    def execute():
+        deadlines._before_cursor_execute(conn, cursor, "SELECT 1", {}, None, False)
+    
+    with slow_app.test_request_context("/budget"):
+        deadlines.g.deadline = time.monotonic() + 10
+        for _ in range(3):
+            execute()
+        assert len(cursor.executed) == 1
+        
+        deadlines.g.deadline -= 1
+        execute()
+        deadlines.g.deadline += 5
+        execute()
+        assert len(cursor.executed) == 3
+    
+    record = SimpleNamespace(info=conn.info)
+    reset = _Cursor()
+    deadlines._reset_on_checkin(SimpleNamespace(cursor=lambda: reset), record)
+    assert reset.executed == ["SET statement_timeout = DEFAULT"]
+    assert record.info == {}
@@ -0,0 +1,123 @@
+"""Idempotency-Key tests."""
+import threading
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+from app.core import idempotency
+from app.shared.kvstore import MemoryStore
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Fresh key store and a call log for the test endpoint."""
+    monkeypatch.setattr(idempotency, "store", MemoryStore())
+    return []
+
+
+@pytest.fixture
+def client(calls):
+    """App with one slow idempotent endpoint."""
+    app = Flask(__name__)
+    
+    @app.route("/things", methods=["POST"])
+    @idempotency.idempotent
+    def create_thing():
+        calls.append(1)
+        time.sleep(0.1)
+        if app.config.get("FAIL"):
+            return jsonify({"error": "boom"}), 500
+        return jsonify({"id": len(calls)}), 201
+    
+    return app.test_client()
+
+
+def test_retry_replays_stored_response(client, calls):
+    """Test a retried request returns the first response without re-running."""
+    headers = {"Idempotency-Key": "abc"}
+    first = client.post("/things", json={"name": "x"}, headers=headers)
+    second = client.post("/things", json={"name": "x"}, headers=headers)
+    
+    assert second.status_code == 201
+    assert second.json == first.json
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert len(calls) == 1
+
+
+def test_concurrent_retry_waits_for_first(client, calls):
+    """Test a retry arriving mid-flight waits instead of executing again."""
+    headers = {"Idempotency-Key": "abc"}
+    responses = []
+    
+    def post():
+        responses.append(client.post("/things", json={"name": "x"}, headers=headers))
+    
+    threads = [threading.Thread(target=post) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert {r.status_code for r in responses} == {201}
+
+
+def test_key_reused_with_different_body(client, calls):
+    """Test the same key with another payload is rejected."""
+    headers = {"Idempotency-Key": "abc"}
+    client.post("/things", json={"name": "x"}, headers=headers)
+    
+    response = client.post("/things", json={"name": "y"}, headers=headers)
+    
+    assert response.status_code == 422
+    assert response.json["error"] == "IDEMPOTENCY_KEY_REUSED"
+
+
+def test_server_errors_are_not_stored(client, calls):
+    """Test a 5xx releases the key so the retry runs again."""
+    headers = {"Idempotency-Key": "abc"}
+    client.application.config["FAIL"] = True
+    client.post("/things", json={}, headers=headers)
+    client.application.config["FAIL"] = False
+    
+    response = client.post("/things", json={}, headers=headers)
+    
+    assert response.status_code == 201
+    assert len(calls) == 2
+
+
+def test_requests_without_key_always_run(client, calls):
+    """Test the header is opt-in."""
+    client.post("/things", json={})
+    client.post("/things", json={})
+    
+    assert len(calls) == 2
+
+
+def test_stored_response_replayed_only_in_its_format(client, calls):
+    """Test a retry asking for another response format does not get the stored body."""
+    headers = {"Idempotency-Key": "fmt"}
+    msgpack_headers = dict(headers, Accept="application/msgpack")
+    client.post("/things", json={"name": "x"}, headers=msgpack_headers)
+    json_headers = dict(headers, Accept="application/json")
+    second = client.post("/things", json={"name": "x"}, headers=json_headers)
+    
+    assert "Idempotent-Replayed" not in second.headers
+    assert len(calls) == 2
+
+
+def test_anonymous_keys_scoped_by_client_address(client, calls):
+    """Test anonymous clients cannot replay each other's responses."""
+    headers = {"Idempotency-Key": "shared"}
+    def post(address):
+        return client.post("/things", json={"name": "x"}, headers=headers,
+                           environ_base={"REMOTE_ADDR": address})
+
+    post("10.0.0.1")
+    other = post("10.0.0.2")
+    same = post("10.0.0.1")
+    
+    assert "Idempotent-Replayed" not in other.headers
+    assert same.headers["Idempotent-Replayed"] == "true"
+    assert len(calls) == 2
@@ -0,0 +1,128 @@
+"""Background job tests: outbox semantics, retries, leases and feature jobs."""
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.jobs import FAILED, QUEUED, RUNNING, Job, JobRunner, backoff, enqueue, job
+from app.db import SessionLocal
+
+calls = []
+
+
+@job("test.record")
+def record(value):
+    calls.append(value)
+
+
+@job("test.fail")
+def fail(value):
+    calls.append(value)
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def runner(db_connection):
+    calls.clear()
+    return JobRunner(SessionLocal, workers=0, backoff_seconds=10, backoff_max_seconds=60)
+
+
+def _jobs(db):
+    db.expire_all()
+    return db.query(Job).all()
+
+
+def test_jobs_run_only_after_commit(db, runner):
+    """Test a job is stored with its transaction and runs once it commits."""
+    enqueue(db, "test.record", value=1)
+    db.rollback()
+    assert runner.run_pending() == 0
+
+    enqueue(db, "test.record", value=2)
+    db.commit()
+    assert runner.run_pending() == 1
+    assert calls == [2]
+    # Finished jobs are deleted
+    assert _jobs(db) == []
+
+
+def test_failures_are_retried_with_backoff_then_kept(db, runner):
+    """Test a failing job is rescheduled until its attempts run out."""
+    enqueue(db, "test.fail", max_attempts=2, value="x")
+    db.commit()
+
+    assert runner.run_pending() == 1
+    (queued,) = _jobs(db)
+    assert queued.status == QUEUED
+    assert queued.attempts == 1
+    assert queued.last_error == "RuntimeError: boom"
+    assert queued.run_at > datetime.utcnow() + timedelta(seconds=4)
+    # Not due yet
+    assert runner.run_pending() == 0
+
+    queued.run_at = datetime.utcnow()
+    db.commit()
+    assert runner.run_pending() == 1
+    (failed,) = _jobs(db)
+    assert failed.status == FAILED
+    assert failed.attempts == 2
+    assert calls == ["x", "x"]
+    assert runner.run_pending() == 0
+
+
+def test_expired_leases_are_claimed_again(db, runner):
+    """Test a job left running by a dead process is picked up once its lease ends."""
+    now = datetime.utcnow()
+    db.add_all([
+        Job(name="test.record", payload=json.dumps({"value": "stale"}), status=RUNNING, attempts=1,
+            max_attempts=3, locked_by="dead", locked_until=now - timedelta(seconds=1)),
+        Job(name="test.record", payload=json.dumps({"value": "busy"}), status=RUNNING, attempts=1,
+            max_attempts=3, locked_by="alive", locked_until=now + timedelta(minutes=5)),
+    ])
+    db.commit()
+
+    assert runner.run_pending() == 1
+    assert calls == ["stale"]
+    assert [j.locked_by for j in _jobs(db)] == ["alive"]
+
+
+def test_backoff_doubles_up_to_the_cap():
+    """Test retry delays grow exponentially, jittered, and stay under the cap."""
+    assert 1 <= backoff(1, 2, 60) <= 2
+    assert 8 <= backoff(4, 2, 60) <= 16
+    assert 30 <= backoff(10, 2, 60) <= 60
+
+
+def test_signup_enqueues_welcome_notification(client, db, runner):
+    """Test signup commits a welcome job instead of sending it inline."""
+    response = client.post(
+        "/auth/signup", json={"name": "New", "email": "new@example.com", "password": "secret123"}
+    )
+    assert response.status_code == 201
+
+    (welcome,) = _jobs(db)
+    assert welcome.name == "auth.welcome"
+    assert json.loads(welcome.payload) == {"user_id": response.json["data"]["id"]}
+    assert runner.run(runner.claim(1)[0]) == "ok"
+
+
+@pytest.mark.real_db
+def test_worker_pool_runs_committed_jobs(db):
+    """Test the dispatcher hands committed jobs to its worker threads."""
+    calls.clear()
+    runner = JobRunner(SessionLocal, workers=2, poll_interval=0.05)
+    for value in range(6):
+        enqueue(db, "test.record", value=value)
+    db.commit()
+
+    runner.notify()
+    try:
+        deadline = time.monotonic() + 5
+        while len(calls) < 6 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        runner.stop()
+
+    assert sorted(calls) == list(range(6))
+    assert _jobs(db) == []
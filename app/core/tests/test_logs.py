@@ -0,0 +1,110 @@
+"""Structured logging tests."""
+import io
+import json
+import logging
+
+import pytest
+
+from app.core import logs
+from app.core.logs import QueueLogHandler
+
+
+@pytest.fixture
+def log_lines(app, monkeypatch):
+    """Read the JSON lines written by the application's log handler."""
+    stream = io.StringIO()
+    monkeypatch.setattr(logs.handler, "stream", stream)
+    monkeypatch.setattr(logs.handler, "path", None)
+    logs.handler.flush()
+    stream.seek(0)
+    stream.truncate()
+    
+    def read():
+        logs.handler.flush()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+    return read
+
+
+def test_access_log_fields(client, admin_token, admin_user, log_lines):
+    """Test each request writes one structured access record."""
+    response = client.get(
+        "/clinics",
+        headers={"Authorization": f"Bearer {admin_token}", "X-Request-ID": "req-123"},
+    )
+    
+    assert response.headers["X-Request-ID"] == "req-123"
+    [entry] = [e for e in log_lines() if e["logger"] == "app.access"]
+    assert entry["request_id"] == "req-123"
+    assert entry["route"] == "/clinics"
+    assert entry["method"] == "GET"
+    assert entry["status"] == 200
+    assert entry["principal_id"] == admin_user.id
+    assert entry["db_queries"] >= 1
+    assert entry["db_ms"] >= 0
+    assert entry["duration_ms"] >= entry["db_ms"]
+
+
+def test_request_id_generated_when_missing(client, log_lines):
+    """Test requests without an id get a generated one."""
+    response = client.get("/health")
+    
+    [entry] = log_lines()
+    assert entry["request_id"] == response.headers["X-Request-ID"]
+    assert len(entry["request_id"]) == 32
+
+
+def test_errors_logged_with_request_id(fresh_app, log_lines):
+    """Test unhandled exceptions are logged as JSON with their request id."""
+    fresh_app.config["PROPAGATE_EXCEPTIONS"] = False
+    
+    @fresh_app.route("/boom")
+    def boom():
+        raise RuntimeError("boom")
+    
+    response = fresh_app.test_client().get("/boom", headers={"X-Request-ID": "req-err"})
+    
+    assert response.status_code == 500
+    [error] = [e for e in log_lines() if e["level"] == "ERROR"]
+    assert error["request_id"] == "req-err"
+    assert "RuntimeError: boom" in error["exception"]
+
+
+def test_full_buffer_drops_and_counts():
+    """Test logging never blocks: records beyond capacity are dropped."""
+    stream = io.StringIO()
+    handler = QueueLogHandler(capacity=2, batch_size=10)
+    handler.stream = stream
+    logger = logging.getLogger("test.logs.drop")
+    logger.addHandler(handler)
+    logger.propagate = False
+    
+    for i in range(5):
+        logger.warning("event %s", i)
+    handler.flush()
+    
+    messages = [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+    assert messages == ["event 0", "event 1"]
+    assert handler.dropped == 3
+    logger.removeHandler(handler)
+
+
+def test_batches_written_in_one_call():
+    """Test buffered records are written together."""
+    writes = []
+    
+    class Stream:
+        def write(self, data):
+            writes.append(data)
+        
+        def flush(self):
+            pass
+    
+    handler = QueueLogHandler(batch_size=100)
+    handler.stream = Stream()
+    for i in range(3):
+        record = logging.makeLogRecord({"msg": f"line {i}", "levelname": "INFO", "name": "test"})
+        handler.handle(record)
+    handler.flush()
+    
+    assert len(writes) == 1
+    assert writes[0].count("\n") == 3
@@ -0,0 +1,152 @@
+"""Metrics tests."""
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from app.core.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MultiprocessWriter,
+    Registry,
+    clear_multiprocess_dir,
+    merge_snapshots,
+    render,
+)
+
+
+def test_counter_merges_thread_shards():
+    """Test increments from many threads are all counted."""
+    registry = Registry()
+    counter = Counter("hits_total", "Hits", ("route",), registry=registry)
+    
+    def work():
+        for _ in range(1000):
+            counter.inc(route="/clinics")
+    
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert counter.collect() == {("/clinics",): 4000}
+
+
+def test_finished_threads_shards_are_folded():
+    """Test a thread per request does not leave a shard per request behind."""
+    registry = Registry()
+    counter = Counter("hits_total", "Hits", registry=registry)
+    histogram = Histogram("latency_seconds", "Latency", buckets=(1.0,), registry=registry)
+    
+    def work():
+        counter.inc()
+        histogram.observe(0.5)
+    
+    for _ in range(50):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    work()
+    
+    assert len(counter._shards) <= 2
+    assert len(histogram._shards) <= 2
+    assert counter.collect() == {(): 51}
+    assert histogram.collect() == {(): [51, 0, 25.5, 51]}
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the exposition format of a histogram."""
+    registry = Registry()
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+    
+    text = render(registry.snapshot())
+    
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+
+
+def test_label_values_are_escaped():
+    """Test quotes in label values cannot break the format."""
+    registry = Registry()
+    Counter("c_total", "C", ("route",), registry=registry).inc(route='a"b')
+    
+    assert 'c_total{route="a\\"b"} 1' in render(registry.snapshot())
+
+
+def test_gauge_function_read_at_collect():
+    """Test callback gauges are evaluated on scrape."""
+    registry = Registry()
+    gauge = Gauge("pool_checked_out", "Checked out", registry=registry)
+    values = iter([3, 4])
+    gauge.set_function(lambda: next(values))
+    
+    assert gauge.collect() == {(): 3}
+    assert gauge.collect() == {(): 4}
+
+
+def test_snapshots_from_workers_are_summed(tmp_path):
+    """Test values written by several processes are aggregated."""
+    registry = Registry()
+    counter = Counter("requests_total", "Requests", ("status",), registry=registry)
+    counter.inc(2, status="200")
+    other_worker = registry.snapshot()
+    other_worker["requests_total"]["samples"] = [[["200"], 5], [["500"], 1]]
+    (tmp_path / "metrics_99999.json").write_text(__import__("json").dumps(other_worker))
+    
+    merged = MultiprocessWriter(str(tmp_path), registry=registry).collect()
+    
+    assert sorted(merged["requests_total"]["samples"]) == [[["200"], 7], [["500"], 1]]
+    assert merge_snapshots([]) == {}
+
+
+def _exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    return process.pid
+
+
+def test_exited_workers_keep_counters_but_not_gauges(tmp_path):
+    """Test a dead worker's file is folded once into the dead totals, without its gauges."""
+    registry = Registry()
+    counter = Counter("requests_total", "Requests", registry=registry)
+    gauge = Gauge("pool_size", "Pool size", registry=registry)
+    counter.inc(2)
+    gauge.set(5)
+    dead_worker = registry.snapshot()
+    dead_worker["requests_total"]["samples"] = [[[], 3]]
+    for _ in range(2):
+        (tmp_path / f"metrics_{_exited_pid()}.json").write_text(json.dumps(dead_worker))
+    writer = MultiprocessWriter(str(tmp_path), registry=registry)
+    
+    for _ in range(2):
+        merged = writer.collect()
+        assert merged["requests_total"]["samples"] == [[[], 8]]
+        assert merged["pool_size"]["samples"] == [[[], 5]]
+    assert sorted(p for p in os.listdir(tmp_path) if p.endswith(".json")) == [
+        f"metrics_{os.getpid()}.json", "metrics_dead.json",
+    ]
+    
+    clear_multiprocess_dir(str(tmp_path))
+    assert [p for p in os.listdir(tmp_path) if p.startswith("metrics_")] == []
+
+
+def test_metrics_endpoint(client):
+    """Test request metrics are exposed in Prometheus format."""
+    client.get("/health")
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    assert (
+        'http_requests_total{blueprint="app",route="/health",method="GET",status="200"}'
+        in response.text
+    )
+    assert "db_pool_checked_out" in response.text
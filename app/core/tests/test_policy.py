@@ -0,0 +1,93 @@
+"""Authorization policy tests."""
+import pytest
+
+from app.core.auth import create_access_token
+from app.core.policy import Principal, compile_policy, policy
+from app.features.auth.model import User
+from app.features.clinics.utils import can_manage_clinic, can_view_clinic
+from app.features.users.utils import is_authorized_to_view_user
+
+
+def _principal(role, user_id=1):
+    return Principal.from_claims({"sub": str(user_id), "role": role, "email": "x@example.com"})
+
+
+def test_compiled_masks_are_disjoint_bits():
+    """Test every permission gets its own bit and roles OR them together."""
+    compiled = compile_policy(("a", "b", "c"), {"r": ("a", "c")})
+    
+    assert compiled.bits == {"a": 1, "b": 2, "c": 4}
+    assert compiled.masks == {"r": 5}
+
+
+def test_unknown_permission_rejected():
+    """Test typos in permission names fail loudly."""
+    with pytest.raises(ValueError):
+        compile_policy(("a",), {"r": ("b",)})
+    with pytest.raises(ValueError):
+        _principal("admin").has("clinics:fly")
+
+
+def test_unknown_role_has_no_permissions():
+    """Test a token with an unexpected role is granted nothing."""
+    principal = _principal("superuser")
+    
+    assert principal.mask == 0
+    assert not principal.can("clinics:read")
+
+
+def test_self_or_admin_rule():
+    """Test members can read only their own user record."""
+    member = _principal("member", user_id=7)
+    admin = _principal("admin", user_id=1)
+    
+    assert member.can("users:read", owner_id=7)
+    assert not member.can("users:read", owner_id=8)
+    assert not member.can("users:read")
+    assert admin.can("users:read", owner_id=8)
+
+
+def test_where_pushes_scope_into_sql():
+    """Test list scoping compiles to a SQL criterion."""
+    member = _principal("member", user_id=7)
+    admin = _principal("admin")
+    
+    assert str(admin.where("users:read", User.id)) == "true"
+    assert str(member.where("users:read", User.id)) == "users.id = :id_1"
+    assert str(member.where("users:delete", User.id)) == "false"
+
+
+def test_list_queries_use_where(db, admin_user, member_user):
+    """Test list queries return only the rows the principal's criterion admits."""
+    from app.features.users.service import UsersService
+    
+    member = _principal("member", user_id=member_user.id)
+    admin = _principal("admin", user_id=admin_user.id)
+    
+    assert [u.id for u in UsersService.list_users(db, member)] == [member_user.id]
+    assert {u.id for u in UsersService.list_users(db, admin)} == {admin_user.id, member_user.id}
+
+
+@pytest.mark.parametrize("sub", ["alice", "1.5", ["1"]])
+def test_non_numeric_subject_is_no_principal(sub):
+    """Test a signed token naming no numeric user yields no principal."""
+    assert Principal.from_claims({"sub": sub, "role": "admin"}) is None
+
+
+def test_non_numeric_subject_unauthorized(client):
+    """Test such a token is rejected with 401 rather than failing the request."""
+    token = create_access_token({"sub": "alice", "role": "admin"})
+    
+    response = client.get("/clinics", headers={"Authorization": f"Bearer {token}"})
+    
+    assert response.status_code == 401
+
+
+def test_legacy_helpers_follow_policy():
+    """Test the feature utils delegate to the compiled policy."""
+    assert is_authorized_to_view_user(3, 3, "member")
+    assert not is_authorized_to_view_user(3, 4, "member")
+    assert is_authorized_to_view_user(1, 4, "admin")
+    assert can_view_clinic("member") and not can_manage_clinic("member")
+    assert can_manage_clinic("admin")
+    assert policy.mask_for("member") != policy.mask_for("admin")
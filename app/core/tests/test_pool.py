@@ -0,0 +1,109 @@
+"""Connection pool tests: warm-up, idle-aware pings and maintenance."""
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.pool import IDLE_SINCE, ManagedQueuePool
+
+
+class _Pool(ManagedQueuePool):
+    ping_idle_seconds = 30.0
+    max_idle_seconds = 300.0
+    min_size = 2
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """File SQLite engine on the managed pool, counting pings."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=_Pool, pool_size=5)
+    pings = []
+    ping = engine.dialect.do_ping
+    monkeypatch.setattr(engine.dialect, "do_ping", lambda conn: pings.append(conn) or ping(conn))
+    engine.pings = pings
+    yield engine
+    engine.dispose()
+
+
+def _age(pool, seconds):
+    """Pretend every idle connection was returned ``seconds`` earlier."""
+    for record in list(pool._pool.queue):
+        record.info[IDLE_SINCE] -= seconds
+
+
+def _query(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT 1")).scalar()
+
+
+def test_fill_opens_minimum_connections(engine):
+    """Test warm-up opens min_size connections that checkouts then reuse."""
+    assert engine.pool.fill() == 2
+    assert engine.pool.checkedin() == 2
+    assert engine.pool.fill() == 0
+
+    _query(engine)
+    assert engine.pool.open_connections() == 2
+
+
+def test_checkout_pings_only_idle_connections(engine):
+    """Test recently used connections skip the ping, idle ones get one."""
+    _query(engine)
+    _query(engine)
+    assert engine.pings == []
+
+    _age(engine.pool, 31)
+    _query(engine)
+    assert len(engine.pings) == 1
+
+
+def test_failed_ping_reconnects(engine, monkeypatch):
+    """Test a connection failing its ping is replaced before it is handed out."""
+    _query(engine)
+    dead = engine.pool._pool.queue[0].dbapi_connection
+    _age(engine.pool, 31)
+
+    def ping(conn):
+        raise engine.dialect.loaded_dbapi.OperationalError("server closed the connection")
+    monkeypatch.setattr(engine.dialect, "do_ping", ping)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert conn.connection.dbapi_connection is not dead
+
+
+def test_maintain_refreshes_and_closes_idle_connections(engine):
+    """Test maintenance pings aging connections and closes extras idle too long."""
+    with engine.connect(), engine.connect(), engine.connect():
+        pass
+    assert engine.pool.checkedin() == 3
+
+    # About to need a ping at checkout: pinged now instead
+    _age(engine.pool, 25)
+    engine.pool.maintain(interval=10)
+    assert len(engine.pings) == 3
+    _query(engine)
+    assert len(engine.pings) == 3
+
+    # Idle past the limit: closed down to min_size
+    _age(engine.pool, 301)
+    engine.pool.maintain(interval=10)
+    assert engine.pool.open_connections() == 2
+    assert engine.pool.checkedin() == 2
+
+
+def test_maintainer_runs_in_background(engine, monkeypatch):
+    """Test start_pool_maintenance warms the pool and keeps it topped up."""
+    from app.core import pool as pool_module
+    monkeypatch.setattr(pool_module.config, "DB_POOL_MAINTAIN_SECONDS", 0.01)
+
+    maintainer = pool_module.start_pool_maintenance(engine)
+    try:
+        assert engine.pool.checkedin() == 2
+        engine.dispose()
+        deadline = time.monotonic() + 2
+        while engine.pool.checkedin() < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert engine.pool.checkedin() == 2
+    finally:
+        maintainer.stop()
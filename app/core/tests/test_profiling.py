@@ -0,0 +1,74 @@
+"""Profiling tests."""
+import os
+import sys
+import threading
+
+from app.core.profiling import SamplingProfiler, collapse
+
+
+def test_admin_gets_inline_profile(client, admin_token):
+    """Test an admin can profile a request and read the report."""
+    headers = {"Authorization": f"Bearer {admin_token}", "X-Profile": "text"}
+    
+    response = client.get("/clinics", headers=headers)
+    
+    assert response.status_code == 200
+    assert response.headers["X-Profiled-Status"] == "200"
+    assert "function calls" in response.text
+
+
+def test_profile_report_stored(client, admin_token, tmp_path, monkeypatch):
+    """Test the default mode saves a pstats file."""
+    from app.core import profiling
+    monkeypatch.setattr(profiling.config, "PROFILE_DIR", str(tmp_path))
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    
+    response = client.get("/clinics?__profile=1", headers=headers)
+    
+    assert response.json["success"] is True
+    assert os.path.exists(tmp_path / response.headers["X-Profile-Report"])
+
+
+def test_member_cannot_profile(client, member_token):
+    """Test the profile switch is ignored for non-admins."""
+    headers = {"Authorization": f"Bearer {member_token}", "X-Profile": "text"}
+    
+    response = client.get("/clinics", headers=headers)
+    
+    assert "X-Profiled-Status" not in response.headers
+    assert response.json["success"] is True
+
+
+def test_sampler_writes_collapsed_stacks(tmp_path):
+    """Test busy threads are sampled into per-route collapsed files."""
+    sampler = SamplingProfiler(str(tmp_path), hz=100)
+    busy = threading.Event()
+    done = threading.Event()
+    
+    def handle_request():
+        sampler.enter("GET /clinics")
+        busy.set()
+        done.wait()
+        sampler.exit()
+    
+    thread = threading.Thread(target=handle_request)
+    thread.start()
+    busy.wait()
+    sampler.sample()
+    sampler.sample()
+    done.set()
+    thread.join()
+    sampler.flush()
+    
+    [path] = list(tmp_path.iterdir())
+    assert path.name.startswith("GET_clinics.")
+    stack, count = path.read_text().strip().rsplit(" ", 1)
+    assert "handle_request" in stack.split(";")[-3]
+    assert count == "2"
+
+
+def test_collapse_orders_root_to_leaf():
+    """Test collapsed stacks start at the outermost frame."""
+    stack = collapse(sys._getframe())
+    
+    assert stack.split(";")[-1].startswith("test_collapse_orders_root_to_leaf")
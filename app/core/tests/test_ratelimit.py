@@ -0,0 +1,68 @@
+"""Login throttling tests."""
+import time
+
+import pytest
+
+from app.core.ratelimit import LoginThrottle, TokenBucket
+from app.shared.exceptions import TooManyRequestsError
+from app.shared.kvstore import MemoryStore
+
+
+def _throttle(**kwargs):
+    options = dict(
+        store=MemoryStore(),
+        email_bucket=TokenBucket(3, 0.001),
+        ip_bucket=TokenBucket(100, 0.001),
+        lockout_threshold=10,
+    )
+    options.update(kwargs)
+    return LoginThrottle(**options)
+
+
+def test_email_bucket_limits_attempts():
+    """Test attempts beyond the burst are rejected with a retry hint."""
+    throttle = _throttle()
+    for _ in range(3):
+        throttle.check("john@example.com", "10.0.0.1")
+    
+    with pytest.raises(TooManyRequestsError) as exc_info:
+        throttle.check("JOHN@example.com", "10.0.0.1")
+    assert int(exc_info.value.headers["Retry-After"]) > 0
+
+
+def test_ip_bucket_limits_spraying_across_emails():
+    """Test one IP cannot spread attempts over many accounts."""
+    throttle = _throttle(ip_bucket=TokenBucket(2, 0.001))
+    throttle.check("a@example.com", "10.0.0.1")
+    throttle.check("b@example.com", "10.0.0.1")
+    
+    with pytest.raises(TooManyRequestsError):
+        throttle.check("c@example.com", "10.0.0.1")
+    throttle.check("c@example.com", "10.0.0.2")
+
+
+def test_lockout_grows_exponentially():
+    """Test each failure past the threshold doubles the lockout."""
+    store = MemoryStore()
+    throttle = _throttle(store=store, lockout_threshold=2, lockout_base=10, lockout_max=1000)
+    
+    throttle.record_failure("john@example.com")
+    assert store.get("lock:john@example.com")["until"] == 0
+    throttle.record_failure("john@example.com")
+    first = store.get("lock:john@example.com")["until"] - time.time()
+    throttle.record_failure("john@example.com")
+    second = store.get("lock:john@example.com")["until"] - time.time()
+    
+    assert 9 < first <= 10
+    assert 19 < second <= 20
+    with pytest.raises(TooManyRequestsError):
+        throttle.check("john@example.com")
+
+
+def test_success_clears_failures():
+    """Test a successful login resets the failure count."""
+    throttle = _throttle(lockout_threshold=1)
+    throttle.record_failure("john@example.com")
+    throttle.record_success("john@example.com")
+    
+    throttle.check("john@example.com")
@@ -0,0 +1,132 @@
+"""Pre-fork server tests."""
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from app.core.server import PoolWSGIServer, bind
+from app.db import engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+needs_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+@pytest.fixture
+def slow_server():
+    """Pool server with a slow endpoint that records its peak concurrency."""
+    app = Flask(__name__)
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    @app.route("/slow")
+    def slow():
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.2)
+        with lock:
+            state["active"] -= 1
+        return "done"
+
+    listener = bind("127.0.0.1", 0)
+    server = PoolWSGIServer(app, listener, threads=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server, listener.getsockname()[1], state
+    if not server.draining:
+        server.drain()
+    thread.join()
+    server.server_close()
+    listener.close()
+
+
+def _get(port, results):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", "/slow")
+    response = conn.getresponse()
+    results.append((response.status, response.read()))
+    conn.close()
+
+
+def test_threads_per_worker_are_bounded(slow_server):
+    """Test connections beyond the thread count wait instead of running."""
+    server, port, state = slow_server
+    results = []
+    clients = [threading.Thread(target=_get, args=(port, results)) for _ in range(4)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+
+    assert [status for status, _ in results] == [200] * 4
+    assert state["peak"] == 2
+
+
+def test_drain_finishes_requests_in_flight(slow_server):
+    """Test draining stops the accept loop only after running requests complete."""
+    server, port, state = slow_server
+    results = []
+    client = threading.Thread(target=_get, args=(port, results))
+    client.start()
+    time.sleep(0.05)
+
+    server.drain()
+    client.join()
+
+    assert results == [(200, b"done")]
+    assert state["active"] == 0
+
+
+@needs_fork
+def test_child_does_not_inherit_pooled_connections():
+    """Test a forked child starts with an empty pool instead of the parent's connections."""
+    with engine.connect():
+        assert engine.pool.checkedout() == 1
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if engine.pool.checkedout() == 0 else 1)
+        _, status = os.waitpid(pid, 0)
+
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+@needs_fork
+def test_serve_drains_workers_on_sigterm(tmp_path):
+    """Test python -m app serve answers from its workers and exits cleanly on SIGTERM."""
+    listener = bind("127.0.0.1", 0)
+    port = listener.getsockname()[1]
+    listener.close()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'serve.db'}")
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "app", "serve",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", "2",
+        ],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                conn.request("GET", "/health")
+                assert conn.getresponse().status == 200
+                conn.close()
+                break
+            except OSError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.1)
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=10) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
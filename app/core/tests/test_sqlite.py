@@ -0,0 +1,123 @@
+"""SQLite profile tests: pragmas, transaction control and the single writer."""
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.sqlite import BEGIN_OPTION, SingleWriter, install_sqlite_profile
+from app.db import Base
+from app.features.clinics.model import Clinic
+from app.shared.exceptions import NotFoundError
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Profiled SQLite file with the schema, counting commits."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    install_sqlite_profile(engine)
+    Base.metadata.create_all(engine)
+    engine.commits = 0
+
+    @event.listens_for(engine, "commit")
+    def count(conn):
+        engine.commits += 1
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def writer(engine):
+    """Single writer on ``engine``."""
+    writer_engine = engine.execution_options(**{BEGIN_OPTION: "IMMEDIATE"})
+    writer = SingleWriter(sessionmaker(bind=writer_engine, expire_on_commit=False))
+    yield writer
+    writer.stop()
+
+
+def _insert(name):
+    def insert(session):
+        clinic = Clinic(name=name, address="1 Main St", is_active=True)
+        session.add(clinic)
+        return clinic
+    return insert
+
+
+def test_profile_sets_pragmas(engine):
+    """Test every connection gets WAL, NORMAL sync and the busy timeout."""
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+
+def test_savepoints_nest_in_the_outer_transaction(engine):
+    """Test a released SAVEPOINT is still undone by rolling back the transaction."""
+    with engine.connect() as conn:
+        with conn.begin() as transaction:
+            with conn.begin_nested():
+                conn.execute(text("INSERT INTO clinics (name, address, is_active, created_at) "
+                                  "VALUES ('x', 'y', 1, CURRENT_TIMESTAMP)"))
+            transaction.rollback()
+        assert conn.execute(text("SELECT count(*) FROM clinics")).scalar() == 0
+
+
+def test_writer_groups_queued_writes_into_one_commit(engine, writer):
+    """Test writes queued behind a running group share the next commit."""
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(session):
+        started.set()
+        release.wait(5)
+        return _insert("first")(session)
+
+    first = writer.submit(blocking)
+    assert started.wait(5)
+    queued = [writer.submit(_insert(f"clinic {i}")) for i in range(5)]
+    release.set()
+
+    clinics = [future.result(5) for future in [first] + queued]
+    assert engine.commits == 2
+    assert len({clinic.id for clinic in clinics}) == 6
+    # Detached with the values they were committed with
+    assert clinics[-1].name == "clinic 4" and clinics[-1].created_at is not None
+
+
+def test_failed_write_is_rolled_back_alone(engine, writer):
+    """Test a write that raises fails without undoing the rest of its group."""
+    def failing(session):
+        session.add(Clinic(name="lost", address="nowhere", is_active=True))
+        session.flush()
+        raise NotFoundError("gone")
+
+    results = [
+        writer.submit(_insert("kept")), writer.submit(failing), writer.submit(_insert("also kept"))
+    ]
+    assert results[0].result(5).name == "kept"
+    with pytest.raises(NotFoundError):
+        results[1].result(5)
+    assert results[2].result(5).name == "also kept"
+    with engine.connect() as conn:
+        names = conn.execute(text("SELECT name FROM clinics")).scalars()
+        assert sorted(names) == ["also kept", "kept"]
+
+
+def test_services_write_through_the_writer(engine, writer, monkeypatch):
+    """Test service writes run on the writer thread and return usable objects."""
+    import app.db
+    from app.features.clinics.service import ClinicsService
+
+    monkeypatch.setattr(app.db.config, "SQLITE_SINGLE_WRITER", True)
+    monkeypatch.setattr(app.db, "_writer", writer)
+    db = sessionmaker(bind=engine)()
+    try:
+        clinic = ClinicsService.create_clinic(db, "North", "2 Side St")
+        updated = ClinicsService.update_clinic(db, clinic.id, name="North Wing")
+        assert (updated.id, updated.name, updated.address) == (clinic.id, "North Wing", "2 Side St")
+        with pytest.raises(NotFoundError):
+            ClinicsService.update_clinic(db, clinic.id + 100, name="Nobody")
+        ClinicsService.delete_clinic(db, clinic.id)
+        assert db.query(Clinic).count() == 0
+    finally:
+        db.close()
@@ -0,0 +1,116 @@
+"""Startup tests: schema check at boot and deferred imports."""
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.schema import SchemaError, check_schema, head_revisions
+from app.db import Base
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def _migration(directory, revision, down_revision):
+    (directory / f"{revision}_step.py").write_text(
+        f'"""Step."""\nrevision = {revision!r}\ndown_revision = {down_revision!r}\n'
+    )
+
+
+@pytest.fixture
+def versions(tmp_path):
+    """Migrations a -> b -> (c, d) merged by e, plus an unmerged branch f off b."""
+    directory = tmp_path / "versions"
+    directory.mkdir()
+    _migration(directory, "a", None)
+    _migration(directory, "b", "a")
+    _migration(directory, "c", "b")
+    _migration(directory, "d", "b")
+    _migration(directory, "e", ("c", "d"))
+    _migration(directory, "f", "b")
+    return directory
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Empty SQLite database."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _stamp(engine, *revisions):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL)"
+        ))
+        conn.execute(text("DELETE FROM alembic_version"))
+        for revision in revisions:
+            conn.execute(text("INSERT INTO alembic_version VALUES (:v)"), {"v": revision})
+
+
+def test_head_revisions(versions):
+    """Test heads are the revisions nothing else revises."""
+    assert head_revisions(str(versions)) == {"e", "f"}
+
+
+def test_check_schema(versions, database):
+    """Test the check passes only when the database is stamped with every head."""
+    with pytest.raises(SchemaError, match="no revision"):
+        check_schema(database, str(versions))
+
+    _stamp(database, "e")
+    with pytest.raises(SchemaError):
+        check_schema(database, str(versions))
+
+    _stamp(database, "e", "f")
+    check_schema(database, str(versions))
+
+
+def test_create_app_refuses_unmigrated_database(app, monkeypatch, versions):
+    """Test create_app fails in error mode and only warns in warn mode."""
+    from app.core.config import get_config
+    from app.main import create_app
+    config = get_config()
+    monkeypatch.setattr(config, "MIGRATIONS_DIR", str(versions))
+    
+    monkeypatch.setattr(config, "SCHEMA_CHECK", "error")
+    with pytest.raises(SchemaError):
+        create_app()
+    
+    monkeypatch.setattr(config, "SCHEMA_CHECK", "warn")
+    assert create_app() is not None
+
+
+def test_migrations_build_the_models_schema(tmp_path, monkeypatch):
+    """Test upgrading to head creates exactly the tables the models declare."""
+    command = pytest.importorskip("alembic.command")
+    from alembic.autogenerate import compare_metadata
+    from alembic.config import Config
+    from alembic.migration import MigrationContext
+
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    alembic_config = Config()
+    alembic_config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    command.upgrade(alembic_config, "head")
+
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+        check_schema(engine, os.path.join(ROOT, "alembic", "versions"))
+    finally:
+        engine.dispose()
+
+
+def test_import_defers_engine_and_heavy_modules():
+    """Test importing the app neither creates the engine nor loads passlib or email-validator."""
+    code = (
+        "import sys, app.main, app.db\n"
+        "assert app.db._engine is None\n"
+        "loaded = [m for m in ('passlib', 'email_validator') if m in sys.modules]\n"
+        "assert not loaded, loaded\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
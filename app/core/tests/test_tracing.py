@@ -0,0 +1,174 @@
+"""Tracing tests."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app.core import tracing
+from app.core.tracing import (
+    BatchProcessor,
+    FileExporter,
+    InMemoryExporter,
+    OTLPExporter,
+    Tracer,
+    parse_traceparent,
+)
+
+
+@pytest.fixture
+def app(monkeypatch, db_connection):
+    """Create a test application with in-memory tracing."""
+    from app.main import create_app
+    monkeypatch.setattr(tracing.config, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracing.config, "TRACING_EXPORTER", "memory")
+    monkeypatch.setattr(tracing.config, "TRACING_SAMPLE_RATIO", 1.0)
+    app = create_app()
+    app.config['TESTING'] = True
+    
+    yield app
+    
+    tracing.tracer.processor = None
+
+
+@pytest.fixture
+def spans(app):
+    """Spans exported by the traced application."""
+    exporter = app.extensions["tracing"].exporter
+    exporter.clear()
+    return exporter.spans
+
+
+def test_request_spans_cover_route_service_and_sql(client, admin_token, spans):
+    """Test one request produces a connected tree of spans."""
+    response = client.post(
+        "/clinics",
+        json={"name": "Clinic", "address": "1 Main St"},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    
+    assert response.status_code == 201
+    names = [s.name for s in spans]
+    for expected in (
+        "POST /clinics",
+        "view clinics.create_clinic",
+        "get_current_user",
+        "validate CreateClinicRequestSchema",
+        "ClinicsService.create_clinic",
+        "db.query",
+        "serialize",
+    ):
+        assert expected in names
+    
+    by_id = {s.span_id: s for s in spans}
+    root = next(s for s in spans if s.name == "POST /clinics")
+    assert root.parent_id is None
+    assert root.attributes["http.status_code"] == 201
+    assert {s.trace_id for s in spans} == {root.trace_id}
+    
+    insert = next(s for s in spans if s.attributes.get("db.statement", "").startswith("INSERT"))
+    assert by_id[insert.parent_id].name == "ClinicsService.create_clinic"
+    assert response.headers["traceparent"] == root.traceparent
+
+
+def test_incoming_traceparent_is_continued(client, spans):
+    """Test a W3C traceparent header joins the caller's trace."""
+    parent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    
+    response = client.get("/health", headers={"traceparent": parent})
+    
+    root = spans[-1]
+    assert root.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert root.parent_id == "00f067aa0ba902b7"
+    assert response.headers["traceparent"].startswith("00-4bf92f3577b34da6a3ce929d0e0e4736-")
+
+
+def test_unsampled_traceparent_records_nothing(client, spans):
+    """Test the sampled flag of an incoming traceparent is honoured."""
+    traceparent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00"
+    client.get("/health", headers={"traceparent": traceparent})
+    
+    assert spans == []
+
+
+def test_parse_traceparent_rejects_invalid_values():
+    """Test malformed and all-zero trace contexts are ignored."""
+    assert parse_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01") == (
+        "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True
+    )
+
+
+def test_spans_are_noops_outside_a_trace():
+    """Test instrumented code records nothing without a current span."""
+    exporter = InMemoryExporter()
+    tracer = Tracer(tracing.SimpleProcessor(exporter))
+    
+    with tracer.span("orphan") as span:
+        assert span is None
+    
+    assert exporter.spans == []
+
+
+def test_batch_processor_writes_otlp_json_file(tmp_path):
+    """Test batched spans are written as OTLP/JSON lines."""
+    path = tmp_path / "spans.jsonl"
+    processor = BatchProcessor(FileExporter(str(path), service_name="test"), max_batch=10)
+    tracer = Tracer(processor)
+    root = tracer.start_trace("GET /clinics")
+    token = tracer.activate(root)
+    with tracer.span("db.query"):
+        pass
+    tracer.deactivate(token)
+    tracer.end(root)
+    
+    processor.force_flush()
+    
+    [line] = path.read_text().splitlines()
+    payload = json.loads(line)["resourceSpans"][0]
+    assert payload["resource"]["attributes"][0]["value"] == {"stringValue": "test"}
+    exported = payload["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in exported] == ["db.query", "GET /clinics"]
+    assert exported[0]["parentSpanId"] == exported[1]["spanId"]
+
+
+def test_batch_processor_drops_oldest_when_full():
+    """Test a full buffer drops spans instead of growing."""
+    exporter = InMemoryExporter()
+    processor = BatchProcessor(exporter, max_queue=2, max_batch=10)
+    tracer = Tracer(processor)
+    
+    for name in ("a", "b", "c"):
+        tracer.end(tracer.start_trace(name))
+    processor.force_flush()
+    
+    assert [s.name for s in exporter.spans] == ["b", "c"]
+    assert processor.dropped == 1
+
+
+def test_otlp_exporter_posts_to_collector():
+    """Test the OTLP exporter posts JSON batches to a collector endpoint."""
+    received = []
+    
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200)
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    tracer = Tracer(tracing.SimpleProcessor(
+        OTLPExporter(f"http://127.0.0.1:{server.server_port}/v1/traces")
+    ))
+    
+    tracer.end(tracer.start_trace("GET /health"))
+    thread.join(5)
+    server.server_close()
+    
+    assert received[0]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == "GET /health"
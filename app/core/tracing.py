@@ -0,0 +1,550 @@
+"""Lightweight request tracing: spans from route to service to SQL.
+
+A request whose trace is sampled gets a root span; everything it calls
+inside the same context (JSON parsing, model validation, token decoding,
+``@traced`` service methods, each SQL statement, response serialization)
+becomes a child span. Outside a sampled request ``span()`` is a no-op, so
+instrumented code costs one context-variable lookup.
+
+Trace context follows W3C Trace Context: an incoming ``traceparent`` header
+is continued and the response carries the request's own ``traceparent``.
+Finished spans go to a pluggable exporter: ``InMemoryExporter`` for tests,
+or ``FileExporter``/``OTLPExporter`` behind a ``BatchProcessor`` that encodes
+batches as OTLP/JSON.
+"""
+import collections
+import contextvars
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.request
+from functools import wraps
+from typing import Callable, List, Optional, Tuple
+
+from flask import Request, g, request
+from pydantic import BaseModel
+from sqlalchemy import event
+
+from app.core.config import get_config
+
+config = get_config()
+
+TRACEPARENT = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+MAX_STATEMENT_LENGTH = 2000
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    """One timed operation in a trace."""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind",
+        "start_ns", "end_ns", "attributes", "status", "status_message",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        kind: int = KIND_INTERNAL,
+        attributes: Optional[dict] = None,
+    ):
+        self.trace_id = trace_id
+        self.span_id = _random_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.status = STATUS_UNSET
+        self.status_message: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds between start and end, once ended."""
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e9
+
+    @property
+    def traceparent(self) -> str:
+        """W3C ``traceparent`` value identifying this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        """Mark the span failed with ``error``."""
+        self.status = STATUS_ERROR
+        self.status_message = str(error)
+        self.attributes["error.type"] = type(error).__name__
+
+
+class _SpanScope:
+    """Context manager making a span current for the duration of a block."""
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.span.record_error(exc)
+        _current.reset(self.token)
+        self.tracer.end(self.span)
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NOOP = _NoopScope()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to a processor.
+
+    With no processor configured nothing is sampled and every ``span()``
+    is a no-op.
+    """
+
+    def __init__(self, processor=None, sample_ratio: float = 1.0):
+        self.processor = processor
+        self.sample_ratio = sample_ratio
+
+    def start_trace(
+        self, name: str, traceparent: Optional[str] = None, **attributes
+    ) -> Optional[Span]:
+        """Start a root span, continuing ``traceparent`` when valid.
+
+        Returns ``None`` when the trace is not sampled. An incoming
+        ``traceparent`` decides sampling through its flags.
+        """
+        if self.processor is None:
+            return None
+        parent = parse_traceparent(traceparent) if traceparent else None
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+            if not sampled:
+                return None
+        else:
+            if self.sample_ratio < 1.0 and random.random() >= self.sample_ratio:
+                return None
+            trace_id, parent_id = _random_id(16), None
+        return Span(name, trace_id, parent_id, kind=KIND_SERVER, attributes=attributes)
+
+    def span(self, name: str, kind: int = KIND_INTERNAL, **attributes):
+        """Context manager recording a child of the current span, if any."""
+        parent = _current.get()
+        if parent is None:
+            return _NOOP
+        return _SpanScope(self, Span(name, parent.trace_id, parent.span_id, kind, attributes))
+
+    def child(self, name: str, kind: int = KIND_INTERNAL, **attributes) -> Optional[Span]:
+        """Start a child of the current span without making it current."""
+        parent = _current.get()
+        if parent is None:
+            return None
+        return Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+    def activate(self, span: Span) -> contextvars.Token:
+        """Make ``span`` current; undo with ``deactivate``."""
+        return _current.set(span)
+
+    def deactivate(self, token: contextvars.Token) -> None:
+        """Restore the span that was current before ``activate``."""
+        _current.reset(token)
+
+    def end(self, span: Span) -> None:
+        """Finish ``span`` and pass it to the processor."""
+        if span.end_ns is not None:
+            return
+        span.end_ns = time.time_ns()
+        processor = self.processor
+        if processor is not None:
+            processor.on_end(span)
+
+
+tracer = Tracer()
+
+
+def span(name: str, **attributes):
+    """Context manager tracing a block as a child of the current span."""
+    return tracer.span(name, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    """Span of the running operation, if it is being traced."""
+    return _current.get()
+
+
+def _random_id(size: int) -> str:
+    value = 0
+    while not value:
+        value = random.getrandbits(size * 8)
+    return f"{value:0{size * 2}x}"
+
+
+def parse_traceparent(value: str) -> Optional[Tuple[str, str, bool]]:
+    """Parse a W3C ``traceparent`` into ``(trace_id, parent_span_id, sampled)``."""
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def traced(obj):
+    """Trace a function, the static methods of a service class, or a Pydantic model's validation."""
+    if isinstance(obj, type) and issubclass(obj, BaseModel):
+        # Wrap the entry points rather than the validator, which a deferred
+        # build (``defer_build``) replaces when the model is first used
+        name = f"validate {obj.__name__}"
+        obj.__init__ = _wrap(obj.__init__, name)
+        for attr in ("model_validate", "model_validate_json"):
+            setattr(obj, attr, classmethod(_wrap(getattr(obj, attr).__func__, name)))
+        return obj
+    if isinstance(obj, type):
+        for attr, value in list(vars(obj).items()):
+            if isinstance(value, staticmethod) and not attr.startswith("__"):
+                setattr(obj, attr, staticmethod(_wrap(value.__func__, f"{obj.__name__}.{attr}")))
+        return obj
+    return _wrap(obj, obj.__qualname__)
+
+
+def _wrap(fn: Callable, name: str) -> Callable:
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            return fn(*args, **kwargs)
+        with tracer.span(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+class TracedRequest(Request):
+    """Request class that traces JSON body parsing."""
+
+    def get_json(self, *args, **kwargs):
+        with tracer.span("json.parse"):
+            return super().get_json(*args, **kwargs)
+
+
+class InMemoryExporter:
+    """Keeps exported spans in a list (for tests)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileExporter:
+    """Appends each batch as one line of OTLP/JSON to ``path``."""
+
+    def __init__(self, path: str, service_name: str = "backend"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(encode_otlp(spans, self.service_name), separators=(",", ":"))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OTLPExporter:
+    """POSTs batches as OTLP/JSON to a collector's ``/v1/traces`` endpoint."""
+
+    def __init__(self, endpoint: str, service_name: str = "backend", timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        body = json.dumps(encode_otlp(spans, self.service_name)).encode()
+        req = urllib.request.Request(
+            self.endpoint, data=body, method="POST", headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            response.read()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class SimpleProcessor:
+    """Exports every span as soon as it ends, on the calling thread."""
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+
+    def on_end(self, span: Span) -> None:
+        self.exporter.export([span])
+
+    def force_flush(self) -> None:
+        pass
+
+
+class BatchProcessor:
+    """Buffers ended spans and exports them in batches from a background thread.
+
+    The buffer holds at most ``max_queue`` spans; when it is full the oldest
+    are dropped (counted in ``dropped``) rather than slowing requests down.
+    A batch is exported every ``interval`` seconds or as soon as
+    ``max_batch`` spans are waiting. Export errors are counted and ignored.
+    """
+
+    def __init__(
+        self, exporter, max_queue: int = 2048, max_batch: int = 512, interval: float = 5.0
+    ):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.interval = interval
+        self.dropped = 0
+        self.failed = 0
+        self._queue: collections.deque = collections.deque(maxlen=max_queue)
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(span)
+            full = len(self._queue) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def start(self) -> None:
+        """Start the export thread (once per process)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def force_flush(self) -> None:
+        """Export everything buffered so far."""
+        while True:
+            with self._lock:
+                size = min(self.max_batch, len(self._queue))
+                batch = [self._queue.popleft() for _ in range(size)]
+            if not batch:
+                return
+            try:
+                self.exporter.export(batch)
+            except Exception:
+                self.failed += len(batch)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.force_flush()
+
+    def _reset_after_fork(self) -> None:
+        # Spans buffered by the parent belong to the parent
+        self._queue.clear()
+        self._thread = None
+        self.start()
+
+
+def encode_otlp(spans: List[Span], service_name: str) -> dict:
+    """Encode spans as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+            "scopeSpans": [{
+                "scope": {"name": "app.core.tracing"},
+                "spans": [_otlp_span(s) for s in spans],
+            }],
+        }],
+    }
+
+
+def _otlp_span(s: Span) -> dict:
+    encoded = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": s.kind,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": [_otlp_attribute(k, v) for k, v in s.attributes.items()],
+        "status": {"code": s.status},
+    }
+    if s.parent_id:
+        encoded["parentSpanId"] = s.parent_id
+    if s.status_message:
+        encoded["status"]["message"] = s.status_message
+    return encoded
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _build_processor():
+    if config.TRACING_EXPORTER == "memory":
+        return SimpleProcessor(InMemoryExporter())
+    if config.TRACING_EXPORTER == "otlp":
+        exporter = OTLPExporter(config.TRACING_OTLP_ENDPOINT, config.TRACING_SERVICE_NAME)
+    else:
+        exporter = FileExporter(config.TRACING_FILE_PATH, config.TRACING_SERVICE_NAME)
+    processor = BatchProcessor(
+        exporter,
+        max_queue=config.TRACING_MAX_QUEUE,
+        max_batch=config.TRACING_BATCH_SIZE,
+        interval=config.TRACING_FLUSH_SECONDS,
+    )
+    processor.start()
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=processor._reset_after_fork)
+    return processor
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    sql_span = tracer.child(
+        "db.query",
+        kind=KIND_CLIENT,
+        **{"db.system": conn.dialect.name, "db.statement": statement[:MAX_STATEMENT_LENGTH]},
+    )
+    if sql_span is not None and context is not None:
+        context._trace_span = sql_span
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    sql_span = getattr(context, "_trace_span", None)
+    if sql_span is not None:
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            sql_span.set_attribute("db.rowcount", cursor.rowcount)
+        tracer.end(sql_span)
+
+
+def _handle_db_error(exception_context):
+    sql_span = getattr(exception_context.execution_context, "_trace_span", None)
+    if sql_span is not None:
+        sql_span.record_error(exception_context.original_exception)
+        tracer.end(sql_span)
+
+
+def instrument_engine(engine) -> None:
+    """Trace every SQL statement executed on ``engine``."""
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_db_error),
+    ):
+        if not event.contains(engine, name, listener):
+            event.listen(engine, name, listener)
+
+
+def install_tracing(app, engine, processor=None):
+    """Trace requests to ``app`` (call after registering blueprints).
+
+    Returns the span processor; with the ``memory`` exporter its
+    ``exporter.spans`` holds the finished spans.
+    """
+    tracer.processor = processor or _build_processor()
+    tracer.sample_ratio = config.TRACING_SAMPLE_RATIO
+    app.request_class = TracedRequest
+    instrument_engine(engine)
+
+    for endpoint, view in list(app.view_functions.items()):
+        if endpoint != "static":
+            app.view_functions[endpoint] = _wrap(view, f"view {endpoint}")
+
+    @app.before_request
+    def start_request_span():
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        root = tracer.start_trace(
+            f"{request.method} {rule}",
+            traceparent=request.headers.get(TRACEPARENT),
+            **{"http.method": request.method, "http.target": request.path},
+        )
+        if root is not None:
+            g.trace_span = root
+            g.trace_token = tracer.activate(root)
+
+    @app.after_request
+    def tag_request_span(response):
+        root = g.get("trace_span")
+        if root is not None:
+            root.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                root.status = STATUS_ERROR
+            response.headers[TRACEPARENT] = root.traceparent
+        return response
+
+    @app.teardown_request
+    def end_request_span(exc):
+        root = g.pop("trace_span", None)
+        if root is None:
+            return
+        if exc is not None:
+            root.record_error(exc)
+        try:
+            tracer.deactivate(g.pop("trace_token"))
+        except ValueError:
+            # Teardown ran in a different context than before_request
+            pass
+        tracer.end(root)
+
+    app.extensions["tracing"] = tracer.processor
+    return tracer.processor
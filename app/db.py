@@ -1,20 +1,119 @@
-"""Database configuration and session management."""
+"""Database configuration and session management.
+
+The engine is created on first use (``get_engine()``, or importing
+``engine`` from here), so importing models does not load a database driver.
+Services commit their writes through ``write()``.
+"""
+import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+from flask import g, has_request_context
 from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import get_config
+from app.core.deadlines import remaining
+from app.core.pool import ManagedQueuePool
+from app.core.sqlite import BEGIN_OPTION, SingleWriter, install_sqlite_profile
+from app.shared.exceptions import GatewayTimeoutError
+from app.shared.resilience import CircuitBreaker
 
 config = get_config()
 
-# Create engine
-engine = create_engine(
-    config.DATABASE_URL,
-    echo=config.SQL_ECHO,
-    pool_pre_ping=True,
-)
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _engine_options(url: str) -> dict:
+    """Use the managed pool wherever the dialect would pick a plain QueuePool."""
+    parsed = make_url(url)
+    if parsed.get_dialect().get_pool_class(parsed) is QueuePool:
+        return {"poolclass": ManagedQueuePool}
+    return {}
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that creates the engine the first time a session needs it."""
+    
+    def __call__(self, **local_kw):
+        if "bind" not in self.kw and "bind" not in local_kw:
+            get_engine()
+        return super().__call__(**local_kw)
+
+
+# Session factory; bound to the engine when it is created
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
+_engine = None
+_engine_lock = threading.Lock()
+_writer: Optional[SingleWriter] = None
+
+
+def get_engine():
+    """The application's engine, created on first call."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    config.DATABASE_URL,
+                    echo=config.SQL_ECHO,
+                    **_engine_options(config.DATABASE_URL),
+                )
+                if _engine.dialect.name == "sqlite" and config.SQLITE_PROFILE:
+                    install_sqlite_profile(_engine)
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def get_writer() -> Optional[SingleWriter]:
+    """This process's SQLite writer, or None when writes commit in place."""
+    global _writer
+    engine = get_engine()
+    single_writer = config.SQLITE_PROFILE and config.SQLITE_SINGLE_WRITER
+    if engine.dialect.name != "sqlite" or not single_writer:
+        return None
+    if _writer is None:
+        with _engine_lock:
+            if _writer is None:
+                writer_engine = engine.execution_options(**{BEGIN_OPTION: "IMMEDIATE"})
+                _writer = SingleWriter(
+                    lambda: SessionLocal(bind=writer_engine, expire_on_commit=False),
+                    max_batch=config.SQLITE_WRITER_MAX_BATCH,
+                )
+    return _writer
+
+
+def __getattr__(name):
+    # ``from app.db import engine`` keeps working: it creates the engine then
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _dispose_after_fork():
+    # Pooled connections inherited from the parent are the parent's: forget
+    # them without closing, which would shut the parent's sockets too
+    global _writer
+    if _engine is not None:
+        _engine.dispose(close=False)
+    # The writer's thread did not survive the fork; the child starts its own
+    _writer = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+# Trips on connection-level failures or slow statements so reads can serve
+# last-known-good data and writes fail fast while the database recovers
+db_breaker = CircuitBreaker(
+    failure_threshold=config.DB_BREAKER_FAILURE_THRESHOLD,
+    latency_threshold=config.DB_BREAKER_LATENCY_SECONDS,
+    reset_timeout=config.DB_BREAKER_RESET_SECONDS,
+    failure_types=(exc.OperationalError, exc.InterfaceError, exc.TimeoutError),
+)
 
 # Base class for models
 Base = declarative_base()
@@ -23,8 +122,12 @@ Base = declarative_base()
 # Import all models here to register them with Base.metadata
 # This ensures Alembic can detect all tables when generating migrations
 # ============================================================================
-from app.features.auth.model import User  # noqa: F401, E402
-from app.features.clinics.model import Clinic  # noqa: F401, E402
+from app.features.auth.model import User, UserArchive  # noqa: F401, E402
+from app.features.clinics.model import Clinic, ClinicArchive  # noqa: F401, E402
+from app.features.audit.model import AuditEntry  # noqa: F401, E402
+# A module import, not ``from ... import Job``: app.core.jobs imports this
+# module and may be imported first
+import app.core.jobs  # noqa: F401, E402
 
 # When adding new features with models, import them here:
 # from app.features.yourfeature.model import YourModel  # noqa: F401, E402
@@ -32,9 +135,51 @@ from app.features.clinics.model import Clinic  # noqa: F401, E402
 
 
 def get_db():
-    """Dependency for getting DB session in routes."""
+    """Dependency for getting DB session in routes.
+    
+    Inside a request every call returns the same session, which is closed by
+    ``close_request_session`` when the request ends, so its connection goes
+    back to the pool even if the route raised or ran out of time.
+    """
+    if has_request_context():
+        if "db_session" not in g:
+            g.db_session = SessionLocal()
+        yield g.db_session
+        return
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def write(db: Session, fn: Callable[[Session], Any]) -> Any:
+    """Run ``fn(session)`` as a write, commit it and return its result.
+
+    On SQLite with the single writer, ``fn`` runs on the writer thread and is
+    committed with the writes queued alongside it; what it returns is detached,
+    with the attributes it had at commit. Elsewhere ``fn`` runs on ``db``,
+    which is then committed. A write still queued when the request runs out
+    of time is dropped and ``GatewayTimeoutError`` raised.
+    """
+    writer = get_writer()
+    if writer is None:
+        result = fn(db)
+        db.commit()
+        return result
+    future = writer.submit(fn)
+    left = remaining()
+    try:
+        return future.result(timeout=None if left is None else max(0.0, left))
+    except FutureTimeoutError:
+        if future.cancel():
+            raise GatewayTimeoutError("Request deadline exceeded")
+        # Already running: its group is committing, so report how it ended
+        return future.result()
+
+
+def close_request_session(exc=None) -> None:
+    """Close the current request's session, returning its connection to the pool."""
+    db = g.pop("db_session", None)
+    if db is not None:
+        db.close()
@@ -0,0 +1 @@
+"""Audit feature module."""
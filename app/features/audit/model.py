@@ -0,0 +1,30 @@
+"""Audit models."""
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+
+from app.db import Base
+
+
+class AuditEntry(Base):
+    """One admin mutation: who changed which resource, and how."""
+    
+    __tablename__ = "audit_log"
+    __table_args__ = (Index("ix_audit_log_resource", "resource", "resource_id"),)
+    
+    id = Column(Integer, primary_key=True)
+    # Assigned when the action is recorded; makes replaying a spill file idempotent
+    entry_id = Column(String, unique=True, nullable=False)
+    actor_id = Column(Integer, index=True, nullable=True)
+    action = Column(String, nullable=False)
+    resource = Column(String, nullable=False)
+    resource_id = Column(Integer, nullable=True)
+    changes = Column(JSON, nullable=False)
+    request_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return (
+            f"<AuditEntry(id={self.id}, action={self.action}, "
+            f"resource={self.resource}:{self.resource_id})>"
+        )
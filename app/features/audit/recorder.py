@@ -0,0 +1,387 @@
+"""Write-behind audit trail.
+
+``record()`` returns as soon as the entry is appended to this process's spill
+file and to an in-memory buffer; requests never wait for the audit insert. A
+flusher thread writes the buffer to ``audit_log`` in multi-row INSERTs, through
+``app.db.write`` like every other write, once ``AUDIT_BATCH_SIZE`` entries are
+waiting or ``AUDIT_FLUSH_SECONDS`` have passed.
+
+The spill file (``AUDIT_SPILL_DIR/audit-<pid>-<token>.jsonl``) is the
+crash-safe copy of the buffer. Each flush rotates it and deletes the rotated
+files only once their entries are committed. A flush that fails keeps both its
+entries and its files for the next one, which skips entries already committed
+(a commit whose outcome was lost). Once ``max_attempts`` flushes in a row
+failed for a reason other than an unreachable database, the entries are
+inserted one by one and those still rejected are moved to a dead-letter file
+in ``AUDIT_SPILL_DIR/dead``, so one bad entry cannot hold back the rest. At
+startup every process adopts the
+spill files of processes that are gone and commits what they hold. Entries
+carry a unique ``entry_id``, so rows committed before a crash are not inserted
+twice. ``AUDIT_FSYNC`` fsyncs every append, so entries survive a power loss
+too, not only a crashed process.
+"""
+import glob
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import g, has_request_context
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_config
+from app.core.logs import audit_logger
+from app.core.metrics import AUDIT_BATCH_SIZE, AUDIT_DEAD_LETTERED, AUDIT_FLUSH_ERRORS
+from app.db import SessionLocal, db_breaker, write
+from app.features.audit.model import AuditEntry
+from app.shared.exceptions import GatewayTimeoutError, ServiceUnavailableError
+
+config = get_config()
+
+# Errors that say nothing about the entries: the database could not be reached
+_UNREACHABLE = (GatewayTimeoutError, ServiceUnavailableError) + tuple(db_breaker.failure_types)
+
+
+def snapshot(obj: Any, fields: Iterable[str]) -> Dict[str, Any]:
+    """JSON-ready values of ``obj``'s ``fields``."""
+    values = {}
+    for field in fields:
+        value = getattr(obj, field)
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        values[field] = value
+    return values
+
+
+def changes(before: Optional[dict], after: Optional[dict]) -> Dict[str, dict]:
+    """Fields that differ between two snapshots, as ``{field: {"before": x, "after": y}}``."""
+    before, after = before or {}, after or {}
+    return {
+        field: {"before": before.get(field), "after": after.get(field)}
+        for field in sorted(set(before) | set(after))
+        if before.get(field) != after.get(field)
+    }
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class AuditRecorder:
+    """Buffers audit entries in memory and on disk and inserts them in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        spill_dir: str,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        fsync: bool = False,
+        max_attempts: int = 5,
+    ):
+        self.session_factory = session_factory
+        self.spill_dir = spill_dir
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_attempts = max(max_attempts, 1)
+        self.pid = os.getpid()
+        self.token = uuid.uuid4().hex[:12]
+        self._buffer: List[dict] = []
+        # Entries of a failed flush, retried first by the next one
+        self._unflushed: List[dict] = []
+        # Flushes in a row the database rejected
+        self._failures = 0
+        # Rotated spill files holding entries not committed yet
+        self._spilled: List[str] = []
+        self._file = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def spill_path(self) -> str:
+        """This recorder's current spill file."""
+        return os.path.join(self.spill_dir, f"audit-{self.pid}-{self.token}.jsonl")
+
+    @property
+    def dead_letter_dir(self) -> str:
+        """Where entries the database keeps rejecting are moved."""
+        return os.path.join(self.spill_dir, "dead")
+
+    def start(self) -> None:
+        """Start the flusher thread, which first recovers orphaned spill files.
+
+        With a ``flush_interval`` of 0 nothing runs in the background and
+        entries are written by ``flush()``.
+        """
+        if self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher thread and flush what is buffered."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            self._wake.set()
+            thread.join()
+        self.flush()
+
+    def record(self, entry: dict) -> None:
+        """Buffer ``entry`` (a JSON-serializable dict) for the next flush."""
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                self._file = open(self.spill_path, "ab", buffering=0)
+            self._file.write(line)
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.batch_size
+        self.start()
+        if full:
+            self._wake.set()
+
+    def pending(self) -> int:
+        """Entries recorded but not committed yet."""
+        with self._lock:
+            return len(self._buffer) + len(self._unflushed)
+
+    def flush(self) -> int:
+        """Insert every buffered entry; returns how many were committed."""
+        with self._flush_lock:
+            with self._lock:
+                retrying = bool(self._unflushed)
+                batch = self._unflushed + self._buffer
+                self._buffer, self._unflushed = [], []
+                if self._file is not None:
+                    # New entries go to a fresh file; this one goes once they commit
+                    self._file.close()
+                    self._file = None
+                    self._sequence += 1
+                    rotated = f"{self.spill_path}.{self._sequence}"
+                    os.replace(self.spill_path, rotated)
+                    self._spilled.append(rotated)
+            try:
+                self._insert(batch, skip_existing=retrying)
+                committed, kept = len(batch), []
+            except Exception as e:
+                AUDIT_FLUSH_ERRORS.inc()
+                audit_logger.exception(
+                    "Audit flush failed", extra={"fields": {"entries": len(batch)}}
+                )
+                if not isinstance(e, _UNREACHABLE):
+                    self._failures += 1
+                if self._failures < self.max_attempts:
+                    with self._lock:
+                        self._unflushed = batch
+                    return 0
+                committed, kept = self._isolate(batch)
+            if kept:
+                with self._lock:
+                    self._unflushed = kept
+                return committed
+            self._failures = 0
+            for path in self._spilled:
+                self._remove(path)
+            self._spilled = []
+            return committed
+
+    def _isolate(self, entries: List[dict]) -> Tuple[int, List[dict]]:
+        """Insert ``entries`` one by one and dead-letter those the database rejects.
+
+        Returns how many were committed and the entries left for the next
+        flush, which are those after the database became unreachable.
+        """
+        committed, dead = 0, []
+        kept: List[dict] = []
+        for index, entry in enumerate(entries):
+            try:
+                self._insert([entry], skip_existing=True)
+            except _UNREACHABLE:
+                kept = entries[index:]
+                break
+            except Exception:
+                dead.append(entry)
+            else:
+                committed += 1
+        if dead:
+            self._dead_letter(dead)
+        return committed, kept
+
+    def _dead_letter(self, entries: List[dict]) -> None:
+        os.makedirs(self.dead_letter_dir, exist_ok=True)
+        with self._lock:
+            self._sequence += 1
+            name = f"audit-{self.pid}-{self.token}.{self._sequence}.jsonl"
+            path = os.path.join(self.dead_letter_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        AUDIT_DEAD_LETTERED.inc(len(entries))
+        audit_logger.error(
+            "Audit entries moved to a dead-letter file",
+            extra={"fields": {"entries": len(entries), "path": path}},
+        )
+
+    def recover(self) -> int:
+        """Commit the entries of spill files whose process is gone; returns how many."""
+        recovered = 0
+        for path in sorted(glob.glob(os.path.join(self.spill_dir, "audit-*-*.jsonl*"))):
+            pid, _, rest = os.path.basename(path)[len("audit-"):].partition("-")
+            token = rest.split(".", 1)[0]
+            owned_elsewhere = pid.isdigit() and int(pid) != self.pid and _pid_alive(int(pid))
+            if token == self.token or owned_elsewhere:
+                continue
+            # Adopt the file first, so that only one process replays it
+            with self._lock:
+                self._sequence += 1
+                adopted = f"{self.spill_path}.{self._sequence}"
+            try:
+                os.rename(path, adopted)
+            except FileNotFoundError:
+                continue
+            entries = []
+            with open(adopted, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # Torn last line of a process that died mid-append
+                        continue
+            try:
+                self._insert(entries, skip_existing=True)
+            except _UNREACHABLE:
+                raise
+            except Exception:
+                # A rejected entry must not stop every later start from recovering
+                _, kept = self._isolate(entries)
+                if kept:
+                    raise
+            self._remove(adopted)
+            recovered += len(entries)
+        return recovered
+
+    def _insert(self, entries: List[dict], skip_existing: bool = False) -> None:
+        if not entries:
+            return
+        rows = [
+            dict(entry, created_at=datetime.fromisoformat(entry["created_at"])) for entry in entries
+        ]
+
+        def insert_rows(session: Session) -> int:
+            inserted = 0
+            for start in range(0, len(rows), self.batch_size):
+                chunk = rows[start:start + self.batch_size]
+                if skip_existing:
+                    ids = [row["entry_id"] for row in chunk]
+                    query = select(AuditEntry.entry_id).where(AuditEntry.entry_id.in_(ids))
+                    existing = set(session.scalars(query))
+                    chunk = [row for row in chunk if row["entry_id"] not in existing]
+                if chunk:
+                    # One multi-row INSERT ... VALUES (...), (...) per chunk
+                    session.execute(insert(AuditEntry).values(chunk))
+                    inserted += len(chunk)
+            return inserted
+
+        session = self.session_factory()
+        try:
+            inserted = write(session, insert_rows)
+        finally:
+            session.close()
+        AUDIT_BATCH_SIZE.observe(inserted)
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _run(self) -> None:
+        try:
+            self.recover()
+        except Exception:
+            audit_logger.exception("Audit spill recovery failed")
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+_recorder: Optional[AuditRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> AuditRecorder:
+    """This process's audit recorder."""
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = AuditRecorder(
+                    SessionLocal,
+                    config.AUDIT_SPILL_DIR,
+                    batch_size=config.AUDIT_BATCH_SIZE,
+                    flush_interval=config.AUDIT_FLUSH_SECONDS,
+                    fsync=config.AUDIT_FSYNC,
+                    max_attempts=config.AUDIT_MAX_ATTEMPTS,
+                )
+    return _recorder
+
+
+def record(resource: str, action: str, resource_id: Optional[int], diff: Dict[str, dict]) -> None:
+    """Audit ``action`` on a resource by the current request's principal."""
+    if not config.AUDIT_ENABLED:
+        return
+    actor_id = request_id = None
+    if has_request_context():
+        from app.core.permissions import get_principal
+
+        principal = get_principal()
+        actor_id = principal.id if principal is not None else None
+        request_id = g.get("request_id")
+    get_recorder().record({
+        "entry_id": uuid.uuid4().hex,
+        "actor_id": actor_id,
+        "action": action,
+        "resource": resource,
+        "resource_id": resource_id,
+        "changes": diff,
+        "request_id": request_id,
+        "created_at": datetime.utcnow().isoformat(),
+    })
+
+
+def _reset_after_fork():
+    # The child buffers into a spill file of its own
+    global _recorder
+    _recorder = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
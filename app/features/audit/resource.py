@@ -0,0 +1,38 @@
+"""Audit resource (response schemas and ORM mapping)."""
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.tracing import traced
+from app.features.audit.schemas import AuditQuerySchema
+
+# Re-exported like the other features' request schemas
+AuditQuery = AuditQuerySchema
+
+
+@traced
+class AuditEntryResponse(BaseModel):
+    """Response schema for an audit entry."""
+    
+    id: int
+    actor_id: Optional[int]
+    action: str
+    resource: str
+    resource_id: Optional[int]
+    changes: Dict[str, Dict[str, Any]]
+    request_id: Optional[str]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+        defer_build = True
+
+
+@traced
+class AuditPageResponse(BaseModel):
+    """One page of audit entries, newest first."""
+    
+    entries: List[AuditEntryResponse]
+    next_cursor: Optional[int]
+    
+    class Config:
+        defer_build = True
@@ -0,0 +1,27 @@
+"""Audit routes (endpoints)."""
+from flask import Blueprint
+
+from app.db import get_db
+from app.core.permissions import require_permission
+from app.features.audit.service import AuditService
+from app.features.audit.resource import AuditEntryResponse, AuditPageResponse, AuditQuery
+from app.shared.binding import bind_query
+from app.shared.responses import success_response
+
+audit_bp = Blueprint("audit", __name__, url_prefix="/audit")
+
+
+@audit_bp.route("", methods=["GET"])
+@require_permission("audit:read")
+def list_entries():
+    """List audit entries, newest first (admin only)."""
+    query = bind_query(AuditQuery)
+    
+    db = next(get_db())
+    entries, next_cursor = AuditService.list_entries(db, **query.model_dump())
+    
+    page = AuditPageResponse(
+        entries=[AuditEntryResponse.model_validate(entry) for entry in entries],
+        next_cursor=next_cursor,
+    )
+    return success_response(data=page.model_dump())
@@ -0,0 +1,23 @@
+"""Audit request/response schemas (Pydantic models)."""
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional
+
+from app.core.tracing import traced
+
+
+@traced
+class AuditQuerySchema(BaseModel):
+    """Query parameters for listing audit entries."""
+    
+    model_config = ConfigDict(defer_build=True, extra="forbid")
+    
+    resource: Optional[str] = Field(
+        None, pattern="^(users|clinics)$", description="Only entries about this resource type"
+    )
+    resource_id: Optional[int] = Field(None, description="Only entries about this resource")
+    actor_id: Optional[int] = Field(None, description="Only entries by this user")
+    action: Optional[str] = Field(
+        None, pattern="^(create|update|delete)$", description="Only this action"
+    )
+    limit: int = Field(50, ge=1, le=200, description="Entries per page")
+    cursor: Optional[int] = Field(None, ge=1, description="next_cursor of the previous page")
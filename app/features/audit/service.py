@@ -0,0 +1,45 @@
+"""Audit service (business logic)."""
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.db import db_breaker
+from app.features.audit.model import AuditEntry
+from app.core.tracing import traced
+
+
+@traced
+class AuditService:
+    """Audit trail queries."""
+    
+    @staticmethod
+    @db_breaker.protect
+    def list_entries(
+        db: Session,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+        resource: Optional[str] = None,
+        resource_id: Optional[int] = None,
+        actor_id: Optional[int] = None,
+        action: Optional[str] = None,
+    ) -> Tuple[List[AuditEntry], Optional[int]]:
+        """A page of entries, newest first, and the cursor of the next page.
+        
+        Pages are keyed on the entry id rather than an offset, so each one is
+        an index range scan and entries flushed meanwhile don't shift pages.
+        """
+        query = db.query(AuditEntry)
+        if cursor is not None:
+            query = query.filter(AuditEntry.id < cursor)
+        if resource is not None:
+            query = query.filter(AuditEntry.resource == resource)
+        if resource_id is not None:
+            query = query.filter(AuditEntry.resource_id == resource_id)
+        if actor_id is not None:
+            query = query.filter(AuditEntry.actor_id == actor_id)
+        if action is not None:
+            query = query.filter(AuditEntry.action == action)
+        # One extra row tells whether there is a next page
+        entries = query.order_by(AuditEntry.id.desc()).limit(limit + 1).all()
+        if len(entries) > limit:
+            return entries[:limit], entries[limit - 1].id
+        return entries, None
@@ -0,0 +1 @@
+"""Audit tests module."""
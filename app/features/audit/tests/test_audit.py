@@ -0,0 +1,166 @@
+"""Audit feature tests: diffs, write-behind flushing, spill recovery and the query endpoint."""
+import json
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.db import SessionLocal
+from app.features.audit import recorder as recorder_module
+from app.features.audit.model import AuditEntry
+from app.features.audit.recorder import AuditRecorder, changes
+
+
+@pytest.fixture
+def recorder(db_connection, tmp_path, monkeypatch):
+    recorder = AuditRecorder(SessionLocal, str(tmp_path), batch_size=2, flush_interval=0)
+    monkeypatch.setattr(recorder_module, "_recorder", recorder)
+    return recorder
+
+
+def _entry(**overrides):
+    entry = {
+        "entry_id": uuid.uuid4().hex,
+        "actor_id": 1,
+        "action": "update",
+        "resource": "clinics",
+        "resource_id": 1,
+        "changes": {"name": {"before": "Old", "after": "New"}},
+        "request_id": None,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    entry.update(overrides)
+    return entry
+
+
+def _entries(db):
+    db.expire_all()
+    return db.query(AuditEntry).order_by(AuditEntry.id).all()
+
+
+def test_changes_keeps_only_changed_fields():
+    """Test diffs list changed fields with their before and after values."""
+    assert changes({"name": "A", "address": "X"}, {"name": "B", "address": "X"}) == {
+        "name": {"before": "A", "after": "B"}
+    }
+    assert changes(None, {"name": "A"}) == {"name": {"before": None, "after": "A"}}
+
+
+def test_admin_mutations_are_recorded_and_queryable(
+    client, db, admin_token, admin_user_id, recorder
+):
+    """Test clinic changes are buffered, flushed in a batch and paged newest first."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    body = {"name": "Old", "address": "1 Main St"}
+    clinic = client.post("/clinics", json=body, headers=headers).json["data"]
+    client.patch(f"/clinics/{clinic['id']}", json={"name": "New"}, headers=headers)
+    client.delete(f"/clinics/{clinic['id']}", headers=headers)
+
+    # Nothing is written while the requests run
+    assert _entries(db) == []
+    assert recorder.pending() == 3
+    assert recorder.flush() == 3
+    assert os.listdir(recorder.spill_dir) == []
+
+    created, updated, deleted = _entries(db)
+    assert {e.actor_id for e in (created, updated, deleted)} == {admin_user_id}
+    assert created.changes["address"] == {"before": None, "after": "1 Main St"}
+    assert updated.changes == {"name": {"before": "Old", "after": "New"}}
+    assert deleted.changes["is_active"] == {"before": True, "after": None}
+
+    first = client.get("/audit?resource=clinics&limit=2", headers=headers).json["data"]
+    assert [e["action"] for e in first["entries"]] == ["delete", "update"]
+    next_page = f"/audit?resource=clinics&limit=2&cursor={first['next_cursor']}"
+    rest = client.get(next_page, headers=headers).json["data"]
+    assert [e["action"] for e in rest["entries"]] == ["create"]
+    assert rest["next_cursor"] is None
+
+
+def test_orphaned_spill_files_are_recovered_once(db, recorder):
+    """Test a dead process's spill file is committed, skipping torn and committed entries."""
+    committed, lost = _entry(), _entry(action="delete")
+    recorder._insert([committed])
+    orphan = os.path.join(recorder.spill_dir, f"audit-{os.getpid()}-deadbeef.jsonl")
+    with open(orphan, "w") as f:
+        f.write(json.dumps(committed) + "\n" + json.dumps(lost) + "\n" + '{"entry_id": "tor')
+
+    assert recorder.recover() == 2
+    assert [e.entry_id for e in _entries(db)] == [committed["entry_id"], lost["entry_id"]]
+    assert os.listdir(recorder.spill_dir) == []
+    assert recorder.recover() == 0
+
+
+def test_failed_flush_keeps_entries_for_the_next_one(db, recorder, monkeypatch):
+    """Test entries and their spill file survive a flush the database rejects."""
+    recorder.record(_entry())
+    real_insert = recorder._insert
+
+    def failing_insert(entries, skip_existing=False):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(recorder, "_insert", failing_insert)
+    assert recorder.flush() == 0
+    assert recorder.pending() == 1
+    assert len(os.listdir(recorder.spill_dir)) == 1
+
+    monkeypatch.setattr(recorder, "_insert", real_insert)
+    recorder.record(_entry())
+    assert recorder.flush() == 2
+    assert len(_entries(db)) == 2
+    assert os.listdir(recorder.spill_dir) == []
+
+
+def test_retry_skips_entries_of_a_lost_commit(db, recorder, monkeypatch):
+    """Test a flush whose commit succeeded but reported an error is not inserted twice."""
+    recorder.record(_entry())
+    real_insert = recorder._insert
+
+    def commit_then_fail(entries, skip_existing=False):
+        real_insert(entries, skip_existing)
+        raise RuntimeError("connection lost after commit")
+
+    monkeypatch.setattr(recorder, "_insert", commit_then_fail)
+    assert recorder.flush() == 0
+    monkeypatch.setattr(recorder, "_insert", real_insert)
+
+    assert recorder.flush() == 1
+    assert len(_entries(db)) == 1
+    assert os.listdir(recorder.spill_dir) == []
+
+
+def test_rejected_entry_is_dead_lettered(db, recorder):
+    """Test an entry the database keeps refusing is moved aside after max_attempts flushes."""
+    recorder.max_attempts = 2
+    good, bad = _entry(), _entry(action=None)
+    recorder.record(good)
+    recorder.record(bad)
+
+    assert recorder.flush() == 0
+    assert recorder.pending() == 2
+    assert recorder.flush() == 1
+
+    assert [e.entry_id for e in _entries(db)] == [good["entry_id"]]
+    assert recorder.pending() == 0
+    assert os.listdir(recorder.spill_dir) == ["dead"]
+    (dead,) = os.listdir(recorder.dead_letter_dir)
+    with open(os.path.join(recorder.dead_letter_dir, dead)) as f:
+        assert [json.loads(line)["entry_id"] for line in f] == [bad["entry_id"]]
+
+    # Later entries are no longer held back
+    recorder.record(_entry())
+    assert recorder.flush() == 1
+
+
+def test_audit_query_requires_permission(client, member_token, recorder):
+    """Test members cannot read the audit log."""
+    response = client.get("/audit", headers={"Authorization": f"Bearer {member_token}"})
+    assert response.status_code == 403
+
+
+def test_audit_query_rejects_unknown_parameters(client, admin_token, recorder):
+    """Test query parameters are validated like request bodies."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = client.get("/audit?limit=0&colour=red", headers=headers)
+    assert response.status_code == 400
+    assert set(response.json["details"]) == {"limit", "colour"}
@@ -0,0 +1,25 @@
+"""Auth background jobs."""
+from app.db import SessionLocal
+from app.core.jobs import job
+from app.core.logs import jobs_logger
+from app.features.auth.model import User
+
+WELCOME = "auth.welcome"
+
+
+@job(WELCOME)
+def send_welcome(user_id: int) -> None:
+    """Send a newly registered user their welcome notification.
+
+    Delivery is a structured log record until a mail or push provider is
+    configured; the job is retried if sending raises.
+    """
+    with SessionLocal() as db:
+        user = db.get(User, user_id)
+        if user is None:
+            # Deleted before the job ran
+            return
+        jobs_logger.info(
+            "Welcome notification sent",
+            extra={"fields": {"user_id": user.id, "email": user.email, "notification": "welcome"}},
+        )
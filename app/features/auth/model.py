@@ -1,23 +1,50 @@
 """Auth models."""
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum, Index
 
 from app.db import Base
-from app.core.permissions import Role
+from app.core.policy import Role
+from app.core.soft_delete import DELETED, LIVE, SoftDeleteMixin, archives
 
 
-class User(Base):
+class User(SoftDeleteMixin, Base):
     """User model."""
     
     __tablename__ = "users"
+    __table_args__ = (
+        # Only live users hold their email; a deleted user's can be reused
+        Index("ix_users_email", "email", unique=True, sqlite_where=LIVE, postgresql_where=LIVE),
+        Index("ix_users_deleted_at", "deleted_at", sqlite_where=DELETED, postgresql_where=DELETED),
+        # Ids freed by archiving are never handed out again, so archived rows and
+        # audit entries keep pointing at the one row they were about
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    email = Column(String, unique=True, index=True, nullable=False)
+    email = Column(String, nullable=False)
     password = Column(String, nullable=False)
     role = Column(SQLEnum(Role), default=Role.MEMBER, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, role={self.role})>"
+
+
+@archives(User)
+class UserArchive(Base):
+    """A user deleted more than the retention period ago, without credentials."""
+    
+    __tablename__ = "users_archive"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    email = Column(String, index=True, nullable=False)
+    role = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    deleted_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<UserArchive(id={self.id}, email={self.email}, deleted_at={self.deleted_at})>"
@@ -1,6 +1,7 @@
 """Auth resource (response schemas and ORM mapping)."""
 from pydantic import BaseModel
 from datetime import datetime
+from app.core.tracing import traced
 from app.features.auth.schemas import SignupRequestSchema, LoginRequestSchema
 
 # Re-export request schemas for backward compatibility
@@ -8,6 +9,7 @@ SignupRequest = SignupRequestSchema
 LoginRequest = LoginRequestSchema
 
 
+@traced
 class UserResponse(BaseModel):
     """Response schema for user."""
     
@@ -19,10 +21,15 @@ class UserResponse(BaseModel):
     
     class Config:
         from_attributes = True
+        defer_build = True
 
 
+@traced
 class LoginResponse(BaseModel):
     """Response schema for login."""
     
     access_token: str
     user: UserResponse
+    
+    class Config:
+        defer_build = True
@@ -2,46 +2,82 @@
 from typing import Optional
 from sqlalchemy.orm import Session
 
+from app.db import db_breaker, write
+from app.features.auth.jobs import WELCOME
 from app.features.auth.model import User
-from app.core.auth import hash_password, verify_password, create_access_token
+from app.core.auth import hash_password, verify_password, verify_dummy_password, create_access_token
+from app.core.deadlines import check_deadline
+from app.core.jobs import enqueue
 from app.core.permissions import Role
+from app.core.ratelimit import login_throttle
+from app.core.tracing import traced
 from app.shared.exceptions import ValidationError, ConflictError, UnauthorizedError
 
 
+def _find_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+
+@traced
 class AuthService:
-    """Authentication service."""
+    """Authentication service.
+    
+    Only the database calls go through ``db_breaker``: a bcrypt hash slower
+    than ``DB_BREAKER_LATENCY_SECONDS`` says nothing about the database.
+    """
     
     @staticmethod
     def signup(db: Session, name: str, email: str, password: str, role: str = "member") -> User:
         """Register a new user."""
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == email).first()
+        existing_user = db_breaker.call(_find_by_email, db, email)
         if existing_user:
             raise ConflictError(f"User with email {email} already exists")
         
-        # Create new user
+        # Create new user; don't start a bcrypt hash the client won't wait for
+        check_deadline()
         hashed_password = hash_password(password)
-        new_user = User(
-            name=name,
-            email=email,
-            password=hashed_password,
-            role=role,
-        )
         
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        def insert(session: Session) -> User:
+            new_user = User(
+                name=name,
+                email=email,
+                password=hashed_password,
+                role=role,
+            )
+            session.add(new_user)
+            session.flush()
+            # Sent after the commit, off the request path
+            enqueue(session, WELCOME, user_id=new_user.id)
+            return new_user
         
-        return new_user
+        return db_breaker.call(write, db, insert)
     
     @staticmethod
-    def login(db: Session, email: str, password: str) -> tuple[User, str]:
+    def login(
+        db: Session,
+        email: str,
+        password: str,
+        client_ip: Optional[str] = None
+    ) -> tuple[User, str]:
         """Authenticate user and return token."""
-        user = db.query(User).filter(User.email == email).first()
+        # Reject throttled attempts before paying for a lookup or a hash
+        login_throttle.check(email, client_ip)
         
-        if not user or not verify_password(password, user.password):
+        user = db_breaker.call(_find_by_email, db, email)
+        
+        check_deadline()
+        if user:
+            valid = verify_password(password, user.password)
+        else:
+            valid = verify_dummy_password(password)
+        
+        if not valid:
+            login_throttle.record_failure(email)
             raise UnauthorizedError("Invalid email or password")
         
+        login_throttle.record_success(email)
+        
         # Create token
         access_token = create_access_token(
             data={"sub": str(user.id), "email": user.email, "role": user.role}
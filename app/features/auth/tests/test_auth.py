@@ -68,3 +68,70 @@ def test_login_invalid_credentials(client, db):
     
     assert response.status_code == 401
     assert response.json["success"] is False
+
+
+@pytest.fixture
+def fresh_throttle():
+    """Reset login throttling state around a test."""
+    from app.core.ratelimit import login_throttle
+    login_throttle.store.clear()
+    yield login_throttle
+    login_throttle.store.clear()
+
+
+def test_login_locked_out_after_repeated_failures(client, db, fresh_throttle):
+    """Test repeated wrong passwords are rejected without checking the hash."""
+    client.post("/auth/signup", json={
+        "name": "John Doe",
+        "email": "john@example.com",
+        "password": "password123"
+    })
+    
+    for _ in range(fresh_throttle.lockout_threshold):
+        response = client.post("/auth/login", json={
+            "email": "john@example.com",
+            "password": "wrong-password"
+        })
+        assert response.status_code == 401
+    
+    response = client.post("/auth/login", json={
+        "email": "john@example.com",
+        "password": "password123"
+    })
+    
+    assert response.status_code == 429
+    assert response.json["error"] == "TOO_MANY_REQUESTS"
+    assert "Retry-After" in response.headers
+
+
+def test_slow_password_hashing_does_not_trip_db_breaker(client, admin_token, monkeypatch):
+    """Test bcrypt time is not counted as database latency."""
+    import time
+    from app.core import auth
+    from app.db import db_breaker
+    
+    hash_password = auth.hash_password
+    
+    def slow_hash(password):
+        time.sleep(0.05)
+        return hash_password(password)
+    
+    monkeypatch.setattr("app.features.auth.service.hash_password", slow_hash)
+    monkeypatch.setattr("app.features.users.service.hash_password", slow_hash)
+    monkeypatch.setattr(db_breaker, "latency_threshold", 0.04)
+    monkeypatch.setattr(db_breaker, "failure_threshold", 1)
+    try:
+        for i in range(2):
+            response = client.post("/auth/signup", json={
+                "name": "Slow", "email": f"slow{i}@example.com", "password": "password123"
+            })
+            assert response.status_code == 201
+        response = client.post(
+            "/users",
+            json={"name": "Slow", "email": "slow@example.com", "password": "password123"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 201
+        assert db_breaker.state == db_breaker.CLOSED
+    finally:
+        db_breaker.reset()
@@ -0,0 +1,31 @@
+"""Clinics background jobs."""
+from typing import Optional
+
+from app.db import SessionLocal
+from app.core.jobs import job
+from app.core.policy import role_principals
+from app.shared.exceptions import NotFoundError
+
+WARM_CACHE = "clinics.warm_cache"
+
+
+@job(WARM_CACHE)
+def warm_cache(clinic_id: Optional[int] = None) -> None:
+    """Reload the clinic reads a change affected.
+
+    Each successful read refreshes the last-known-good copy served while the
+    database is down, so an outage right after a change serves the changed
+    data. Only the cache of the process running the job is warmed.
+    """
+    # Imported here: the service imports this module to enqueue the job
+    from app.features.clinics.service import ClinicsService
+
+    with SessionLocal() as db:
+        if clinic_id is not None:
+            try:
+                ClinicsService.get_clinic(db, clinic_id)
+            except NotFoundError:
+                pass
+        for principal in role_principals():
+            if principal.has("clinics:list"):
+                ClinicsService.list_clinics(db, principal)
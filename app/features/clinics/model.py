@@ -1,15 +1,25 @@
 """Clinics model."""
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 
 from app.db import Base
+from app.core.soft_delete import DELETED, LIVE, SoftDeleteMixin, archives
 
 
-class Clinic(Base):
+class Clinic(SoftDeleteMixin, Base):
     """Clinic model."""
     
     __tablename__ = "clinics"
+    __table_args__ = (
+        Index("ix_clinics_is_active", "is_active", sqlite_where=LIVE, postgresql_where=LIVE),
+        Index(
+            "ix_clinics_deleted_at", "deleted_at", sqlite_where=DELETED, postgresql_where=DELETED
+        ),
+        # Ids freed by archiving are never handed out again, so archived rows and
+        # audit entries keep pointing at the one row they were about
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -19,3 +29,21 @@ class Clinic(Base):
     
     def __repr__(self):
         return f"<Clinic(id={self.id}, name={self.name}, is_active={self.is_active})>"
+
+
+@archives(Clinic)
+class ClinicArchive(Base):
+    """A clinic deleted more than the retention period ago."""
+    
+    __tablename__ = "clinics_archive"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    address = Column(String, nullable=False)
+    is_active = Column(Boolean, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    deleted_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<ClinicArchive(id={self.id}, name={self.name}, deleted_at={self.deleted_at})>"
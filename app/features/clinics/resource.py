@@ -1,6 +1,7 @@
 """Clinics resource (response schemas and ORM mapping)."""
 from pydantic import BaseModel
 from datetime import datetime
+from app.core.tracing import traced
 from app.features.clinics.schemas import CreateClinicRequestSchema, UpdateClinicRequestSchema
 
 # Re-export request schemas for backward compatibility
@@ -8,6 +9,7 @@ CreateClinicRequest = CreateClinicRequestSchema
 UpdateClinicRequest = UpdateClinicRequestSchema
 
 
+@traced
 class ClinicResponse(BaseModel):
     """Response schema for clinic."""
     
@@ -19,3 +21,4 @@ class ClinicResponse(BaseModel):
     
     class Config:
         from_attributes = True
+        defer_build = True
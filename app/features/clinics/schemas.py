@@ -1,18 +1,26 @@
 """Clinics request/response schemas (Pydantic models)."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
+from app.core.tracing import traced
 
+
+@traced
 class CreateClinicRequestSchema(BaseModel):
     """Request schema for creating clinic."""
     
+    model_config = ConfigDict(defer_build=True)
+    
     name: str = Field(..., min_length=1, max_length=255, description="Clinic name")
     address: str = Field(..., min_length=1, max_length=500, description="Full address")
 
 
+@traced
 class UpdateClinicRequestSchema(BaseModel):
     """Request schema for updating clinic."""
     
+    model_config = ConfigDict(defer_build=True)
+    
     name: Optional[str] = Field(None, min_length=1, max_length=255, description="Updated clinic name")
     address: Optional[str] = Field(None, min_length=1, max_length=500, description="Updated address")
     is_active: Optional[bool] = Field(None, description="Active status")
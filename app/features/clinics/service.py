@@ -1,42 +1,84 @@
 """Clinics service (business logic)."""
 from typing import Optional
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from app.db import SessionLocal, db_breaker, write
+from app.features.audit.recorder import changes, record, snapshot
+from app.features.clinics.jobs import WARM_CACHE
 from app.features.clinics.model import Clinic
+from app.core.config import get_config
+from app.core.jobs import enqueue
+from app.core.policy import Principal, role_principals
+from app.core.soft_delete import soft_delete
+from app.core.tracing import traced
 from app.shared.exceptions import NotFoundError
+from app.shared.resilience import StaleReader
+from app.shared.singleflight import SingleFlight
 
+config = get_config()
 
+# Concurrent identical reads share one query instead of stampeding the database
+_reads = SingleFlight(timeout=config.SINGLEFLIGHT_TIMEOUT_SECONDS)
+
+AUDIT_FIELDS = ("name", "address", "is_active")
+
+# Last-known-good results served while the database is failing or slow
+_stale = StaleReader(db_breaker, SessionLocal, max_entries=config.STALE_CACHE_MAX_ENTRIES)
+
+
+def _detached(db: Session, clinics: list[Clinic]) -> list[Clinic]:
+    """Detach loaded clinics so they can be shared safely across callers."""
+    for clinic in clinics:
+        db.expunge(clinic)
+    return clinics
+
+
+def _list_key(principal: Principal) -> tuple:
+    # The visibility criterion has no owner part, so it depends on the
+    # permission mask alone: members never share an admin's result
+    return ("list_clinics", principal.mask)
+
+
+@traced
 class ClinicsService:
     """Clinics management service."""
     
     @staticmethod
     def get_clinic(db: Session, clinic_id: int) -> Clinic:
         """Get clinic by ID."""
-        clinic = db.query(Clinic).filter(Clinic.id == clinic_id).first()
-        if not clinic:
-            raise NotFoundError(f"Clinic {clinic_id} not found")
-        return clinic
+        def load(session: Session) -> Clinic:
+            return _detached(session, [ClinicsService._load_clinic(session, clinic_id)])[0]
+        
+        return _stale.read(db, ("get_clinic", clinic_id), load, flight=_reads)
     
     @staticmethod
-    def list_clinics(db: Session, active_only: bool = False) -> list[Clinic]:
-        """List all clinics."""
-        query = db.query(Clinic)
-        if active_only:
-            query = query.filter(Clinic.is_active == True)
-        return query.all()
+    def list_clinics(db: Session, principal: Principal) -> list[Clinic]:
+        """List the clinics ``principal`` may see; inactive ones need ``clinics:list:inactive``."""
+        visible = or_(Clinic.is_active == True, principal.where("clinics:list:inactive"))
+        
+        def load(session: Session) -> list[Clinic]:
+            return _detached(session, session.query(Clinic).filter(visible).all())
+        
+        return _stale.read(db, _list_key(principal), load, flight=_reads)
     
     @staticmethod
+    @db_breaker.protect
     def create_clinic(db: Session, name: str, address: str) -> Clinic:
         """Create a new clinic (admin only)."""
-        new_clinic = Clinic(name=name, address=address, is_active=True)
+        def insert(session: Session) -> Clinic:
+            new_clinic = Clinic(name=name, address=address, is_active=True)
+            session.add(new_clinic)
+            session.flush()
+            enqueue(session, WARM_CACHE, clinic_id=new_clinic.id)
+            return new_clinic
         
-        db.add(new_clinic)
-        db.commit()
-        db.refresh(new_clinic)
-        
-        return new_clinic
+        clinic = write(db, insert)
+        record("clinics", "create", clinic.id, changes(None, snapshot(clinic, AUDIT_FIELDS)))
+        return clinic
     
     @staticmethod
+    @db_breaker.protect
     def update_clinic(
         db: Session,
         clinic_id: int,
@@ -45,23 +87,43 @@ class ClinicsService:
         is_active: Optional[bool] = None,
     ) -> Clinic:
         """Update clinic information (admin only)."""
-        clinic = ClinicsService.get_clinic(db, clinic_id)
-        
-        if name:
-            clinic.name = name
-        if address:
-            clinic.address = address
-        if is_active is not None:
-            clinic.is_active = is_active
-        
-        db.commit()
-        db.refresh(clinic)
+        def update(session: Session) -> tuple[Clinic, dict]:
+            clinic = ClinicsService._load_clinic(session, clinic_id)
+            before = snapshot(clinic, AUDIT_FIELDS)
+            if name:
+                clinic.name = name
+            if address:
+                clinic.address = address
+            if is_active is not None:
+                clinic.is_active = is_active
+            enqueue(session, WARM_CACHE, clinic_id=clinic_id)
+            return clinic, changes(before, snapshot(clinic, AUDIT_FIELDS))
         
+        clinic, diff = write(db, update)
+        record("clinics", "update", clinic_id, diff)
         return clinic
     
     @staticmethod
+    @db_breaker.protect
     def delete_clinic(db: Session, clinic_id: int) -> None:
-        """Delete a clinic (admin only)."""
-        clinic = ClinicsService.get_clinic(db, clinic_id)
-        db.delete(clinic)
-        db.commit()
+        """Soft-delete a clinic (admin only); the archiver moves it out later."""
+        def delete(session: Session) -> dict:
+            clinic = ClinicsService._load_clinic(session, clinic_id)
+            soft_delete(clinic)
+            enqueue(session, WARM_CACHE)
+            return snapshot(clinic, AUDIT_FIELDS)
+        
+        before = write(db, delete)
+        # Neither the clinic nor a list still holding it may be served stale
+        _stale.invalidate(("get_clinic", clinic_id))
+        for principal in role_principals():
+            _stale.invalidate(_list_key(principal))
+        record("clinics", "delete", clinic_id, changes(before, None))
+    
+    @staticmethod
+    def _load_clinic(db: Session, clinic_id: int) -> Clinic:
+        """Load a clinic attached to ``db`` for modification."""
+        clinic = db.query(Clinic).filter(Clinic.id == clinic_id).first()
+        if not clinic:
+            raise NotFoundError(f"Clinic {clinic_id} not found")
+        return clinic
@@ -84,3 +84,75 @@ def test_list_clinics_member_active_only(client, member_token, admin_token):
     response = client.get("/clinics", headers=member_headers)
     clinic_names = [c["name"] for c in response.json["data"]]
     assert "Inactive Clinic" not in clinic_names
+
+
+def test_list_clinics_served_stale_during_outage(client, admin_token, db_outage):
+    """Test reads fall back to last-known-good data while the breaker is open."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    client.post(
+        "/clinics",
+        json={"name": "City Medical Center", "address": "123 Main St"},
+        headers=headers
+    )
+    fresh = client.get("/clinics", headers=headers)
+    assert "Warning" not in fresh.headers
+    
+    db_outage()
+    response = client.get("/clinics", headers=headers)
+    
+    assert response.status_code == 200
+    assert response.json["data"] == fresh.json["data"]
+    assert response.headers["Warning"] == '110 - "Response is Stale"'
+    assert "Age" in response.headers
+
+
+def test_deleted_clinic_not_served_stale(client, admin_token, member_token, db_outage):
+    """Test deleting a clinic drops the cached lists that still contain it."""
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    member = {"Authorization": f"Bearer {member_token}"}
+    created = client.post(
+        "/clinics",
+        json={"name": "City Medical Center", "address": "123 Main St"},
+        headers=admin
+    )
+    clinic_id = created.json["data"]["id"]
+    assert client.get("/clinics", headers=admin).json["data"]
+    assert client.get("/clinics", headers=member).json["data"]
+    
+    assert client.delete(f"/clinics/{clinic_id}", headers=admin).status_code == 200
+    db_outage()
+    
+    for headers in (admin, member):
+        assert client.get("/clinics", headers=headers).status_code == 503
+    assert client.get(f"/clinics/{clinic_id}", headers=admin).status_code == 503
+
+
+def test_writes_fail_fast_during_outage(client, admin_token, db_outage):
+    """Test writes are rejected with 503 while the breaker is open."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    db_outage()
+    
+    response = client.post(
+        "/clinics",
+        json={"name": "City Medical Center", "address": "123 Main St"},
+        headers=headers
+    )
+    
+    assert response.status_code == 503
+    assert response.json["error"] == "SERVICE_UNAVAILABLE"
+    assert "Retry-After" in response.headers
+
+
+def test_create_clinic_retry_with_idempotency_key(client, admin_token):
+    """Test a retried create returns the original clinic instead of a duplicate."""
+    headers = {"Authorization": f"Bearer {admin_token}", "Idempotency-Key": "create-city-1"}
+    payload = {"name": "City Medical Center", "address": "123 Main St"}
+    
+    first = client.post("/clinics", json=payload, headers=headers)
+    retry = client.post("/clinics", json=payload, headers=headers)
+    
+    assert retry.status_code == 201
+    assert retry.json["data"]["id"] == first.json["data"]["id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    listing = client.get("/clinics", headers={"Authorization": f"Bearer {admin_token}"})
+    assert len(listing.json["data"]) == 1
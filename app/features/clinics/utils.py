@@ -1,11 +1,12 @@
 """Clinics utility functions."""
+from app.core.policy import policy
 
 
 def can_view_clinic(user_role: str) -> bool:
     """Check if user can view clinics."""
-    return user_role in ["admin", "member"]
+    return policy.role_allows(user_role, "clinics:read")
 
 
 def can_manage_clinic(user_role: str) -> bool:
     """Check if user can manage clinics."""
-    return user_role == "admin"
+    return policy.role_allows(user_role, "clinics:update")
@@ -0,0 +1 @@
+"""Diagnostics feature module."""
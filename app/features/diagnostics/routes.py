@@ -0,0 +1,26 @@
+"""Diagnostics routes (endpoints)."""
+from flask import Blueprint, request
+
+from app.core.permissions import require_permission
+from app.features.diagnostics.service import DiagnosticsService
+from app.shared.responses import success_response
+
+diagnostics_bp = Blueprint("diagnostics", __name__, url_prefix="/diagnostics")
+
+
+@diagnostics_bp.route("/memory", methods=["GET"])
+@require_permission("ops:diagnostics")
+def memory_report():
+    """Dump the top allocation sites and session/connection counts (admin only)."""
+    limit = request.args.get("limit", type=int)
+    return success_response(data=DiagnosticsService.memory_report(limit=limit))
+
+
+@diagnostics_bp.route("/memory/baseline", methods=["POST"])
+@require_permission("ops:diagnostics")
+def memory_baseline():
+    """Take the snapshot later reports are diffed against (admin only)."""
+    return success_response(
+        data=DiagnosticsService.set_memory_baseline(),
+        message="Memory baseline recorded"
+    )
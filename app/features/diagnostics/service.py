@@ -0,0 +1,20 @@
+"""Diagnostics service (business logic)."""
+from typing import Optional
+
+from app.core.memory import diagnostics
+
+
+class DiagnosticsService:
+    """Process diagnostics for operators."""
+    
+    @staticmethod
+    def memory_report(limit: Optional[int] = None) -> dict:
+        """Top allocation sites, per-route growth and session counts."""
+        return diagnostics.report(limit=limit)
+    
+    @staticmethod
+    def set_memory_baseline() -> dict:
+        """Snapshot the heap so later reports show growth since now."""
+        if diagnostics.enabled:
+            diagnostics.set_baseline()
+        return diagnostics.report()
@@ -0,0 +1,96 @@
+"""Diagnostics feature tests."""
+import tracemalloc
+
+import pytest
+from sqlalchemy import event
+
+from app.core import memory
+from app.db import SessionLocal
+
+
+@pytest.fixture
+def app(monkeypatch, db_connection):
+    """Create a test application with memory diagnostics enabled."""
+    from app.main import create_app
+    monkeypatch.setattr(memory.config, "MEMORY_DIAGNOSTICS_ENABLED", True)
+    monkeypatch.setattr(memory, "diagnostics", memory.MemoryDiagnostics(frames=5, snapshot_every=1))
+    monkeypatch.setattr("app.features.diagnostics.service.diagnostics", memory.diagnostics)
+    app = create_app()
+    app.config['TESTING'] = True
+    
+    yield app
+    
+    event.remove(SessionLocal, "after_begin", memory._after_begin)
+    event.remove(SessionLocal, "after_transaction_end", memory._after_transaction_end)
+    tracemalloc.stop()
+
+
+def test_memory_report_admin(client, admin_token):
+    """Test admin gets allocation sites and per-route growth."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    client.get("/clinics", headers=headers)
+    
+    response = client.get("/diagnostics/memory?limit=5", headers=headers)
+    
+    assert response.status_code == 200
+    data = response.json["data"]
+    assert data["enabled"] is True
+    assert len(data["top_allocations"]) == 5
+    assert data["traced_bytes"] > 0
+    assert data["routes"]["GET /clinics"]["requests"] == 1
+    assert isinstance(data["routes"]["GET /clinics"]["last_diff"], list)
+
+
+def test_memory_report_member_forbidden(client, member_token):
+    """Test members cannot read diagnostics."""
+    headers = {"Authorization": f"Bearer {member_token}"}
+    response = client.get("/diagnostics/memory", headers=headers)
+    
+    assert response.status_code == 403
+
+
+def test_memory_baseline(client, admin_token):
+    """Test reports diff against a recorded baseline."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = client.post("/diagnostics/memory/baseline", headers=headers)
+    assert response.status_code == 200
+    
+    response = client.get("/diagnostics/memory", headers=headers)
+    
+    assert "growth_since_baseline" in response.json["data"]
+
+
+def test_session_outliving_request_is_reported(app, client):
+    """Test a session left open by a request is counted as a leak."""
+    leaked = []
+    
+    @app.route("/leaky")
+    def leaky():
+        session = SessionLocal()
+        session.connection()
+        leaked.append(session)
+        return "ok"
+    
+    client.get("/leaky")
+    
+    stats = memory.diagnostics.sessions.stats()
+    assert stats["leaked"] == 1
+    assert stats["open"][0]["route"] == "GET /leaky"
+    leaked[0].close()
+    assert memory.diagnostics.sessions.stats()["open"] == []
+
+
+def test_closed_session_is_not_a_leak(app, client):
+    """Test sessions closed inside the request are not reported."""
+    @app.route("/tidy")
+    def tidy():
+        session = SessionLocal()
+        try:
+            session.connection()
+        finally:
+            session.close()
+        return "ok"
+    
+    client.get("/tidy")
+    
+    assert memory.diagnostics.sessions.stats()["leaked"] == 0
@@ -1,6 +1,7 @@
 """Users resource (response schemas and ORM mapping)."""
 from pydantic import BaseModel
 from datetime import datetime
+from app.core.tracing import traced
 from app.features.users.schemas import CreateUserRequestSchema, UpdateUserRequestSchema
 
 # Re-export request schemas for backward compatibility
@@ -8,6 +9,7 @@ CreateUserRequest = CreateUserRequestSchema
 UpdateUserRequest = UpdateUserRequestSchema
 
 
+@traced
 class UserResponse(BaseModel):
     """Response schema for user."""
     
@@ -19,4 +21,5 @@ class UserResponse(BaseModel):
     
     class Config:
         from_attributes = True
+        defer_build = True
 
@@ -1,71 +1,119 @@
 """Users service (business logic)."""
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 
+from app.db import SessionLocal, db_breaker, write
+from app.features.audit.recorder import changes, record, snapshot
 from app.features.auth.model import User
 from app.core.auth import hash_password
-from app.core.permissions import Role
+from app.core.config import get_config
+from app.core.deadlines import check_deadline
+from app.core.permissions import Principal, Role
+from app.core.soft_delete import soft_delete
+from app.core.tracing import traced
 from app.shared.exceptions import NotFoundError, ForbiddenError
+from app.shared.resilience import StaleReader
 
+config = get_config()
 
+# Audited user fields; the password hash never goes into the audit log
+AUDIT_FIELDS = ("name", "email", "role")
+
+# Last-known-good results served while the database is failing or slow
+_stale = StaleReader(db_breaker, SessionLocal, max_entries=config.STALE_CACHE_MAX_ENTRIES)
+
+
+def _detached(db: Session, users: list[User]) -> list[User]:
+    """Detach loaded users so they outlive the session that read them."""
+    for user in users:
+        db.expunge(user)
+    return users
+
+
+@traced
 class UsersService:
     """Users management service."""
     
     @staticmethod
     def get_user(db: Session, user_id: int) -> User:
         """Get user by ID."""
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise NotFoundError(f"User {user_id} not found")
-        return user
+        def load(session: Session) -> User:
+            # The copy kept for stale reads leaves out the password hash
+            user = UsersService._load_user(session, user_id, defer(User.password, raiseload=True))
+            return _detached(session, [user])[0]
+        
+        return _stale.read(db, ("get_user", user_id), load)
     
     @staticmethod
-    def list_users(db: Session) -> list[User]:
-        """List all users (admin only)."""
-        return db.query(User).all()
+    def list_users(db: Session, principal: Principal) -> list[User]:
+        """List the users ``principal`` may read.
+        
+        Not served stale: a last-known-good copy would hold the whole table.
+        """
+        visible = principal.where("users:read", User.id)
+        return db_breaker.call(lambda: db.query(User).filter(visible).all())
     
     @staticmethod
     def create_user(db: Session, name: str, email: str, password: str, role: str = "member") -> User:
         """Create a new user (admin only)."""
-        # Check if user already exists
-        existing_user = db.query(User).filter(User.email == email).first()
+        # Check if user already exists; the breaker times the queries, not bcrypt
+        existing_user = db_breaker.call(lambda: db.query(User).filter(User.email == email).first())
         if existing_user:
             from app.shared.exceptions import ConflictError
             raise ConflictError(f"User with email {email} already exists")
         
-        # Create new user
+        # Create new user; don't start a bcrypt hash the client won't wait for
+        check_deadline()
         hashed_password = hash_password(password)
-        new_user = User(
-            name=name,
-            email=email,
-            password=hashed_password,
-            role=role,
-        )
         
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        def insert(session: Session) -> User:
+            new_user = User(
+                name=name,
+                email=email,
+                password=hashed_password,
+                role=role,
+            )
+            session.add(new_user)
+            return new_user
         
-        return new_user
+        user = db_breaker.call(write, db, insert)
+        record("users", "create", user.id, changes(None, snapshot(user, AUDIT_FIELDS)))
+        return user
     
     @staticmethod
+    @db_breaker.protect
     def update_user(db: Session, user_id: int, name: Optional[str] = None, role: Optional[str] = None) -> User:
         """Update user information (admin only)."""
-        user = UsersService.get_user(db, user_id)
-        
-        if name:
-            user.name = name
-        if role:
-            user.role = role
-        
-        db.commit()
-        db.refresh(user)
+        def update(session: Session) -> tuple[User, dict]:
+            user = UsersService._load_user(session, user_id)
+            before = snapshot(user, AUDIT_FIELDS)
+            if name:
+                user.name = name
+            if role:
+                user.role = role
+            return user, changes(before, snapshot(user, AUDIT_FIELDS))
         
+        user, diff = write(db, update)
+        record("users", "update", user_id, diff)
         return user
     
     @staticmethod
+    @db_breaker.protect
     def delete_user(db: Session, user_id: int) -> None:
-        """Delete a user (admin only)."""
-        user = UsersService.get_user(db, user_id)
-        db.delete(user)
-        db.commit()
+        """Soft-delete a user (admin only); the archiver moves it out later."""
+        def delete(session: Session) -> dict:
+            user = UsersService._load_user(session, user_id)
+            soft_delete(user)
+            return snapshot(user, AUDIT_FIELDS)
+        
+        before = write(db, delete)
+        _stale.invalidate(("get_user", user_id))
+        record("users", "delete", user_id, changes(before, None))
+    
+    @staticmethod
+    def _load_user(db: Session, user_id: int, *options) -> User:
+        """Load a user attached to ``db`` for modification."""
+        user = db.query(User).options(*options).filter(User.id == user_id).first()
+        if not user:
+            raise NotFoundError(f"User {user_id} not found")
+        return user
@@ -63,3 +63,26 @@ def test_list_users_admin(client, admin_token):
     assert response.status_code == 200
     assert response.json["success"] is True
     assert isinstance(response.json["data"], list)
+
+
+def test_list_users_requires_auth(client):
+    """Test requests without a token are rejected."""
+    response = client.get("/users")
+    
+    assert response.status_code == 401
+    assert response.json["error"] == "UNAUTHORIZED"
+
+
+def test_user_lists_not_served_stale(client, admin_token, member_user_id, db_outage):
+    """Test single users fall back to a copy without the hash, whole lists not at all."""
+    from app.features.users.service import _stale
+    
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    assert client.get("/users", headers=headers).status_code == 200
+    assert client.get(f"/users/{member_user_id}", headers=headers).status_code == 200
+    db_outage()
+    
+    assert client.get("/users", headers=headers).status_code == 503
+    response = client.get(f"/users/{member_user_id}", headers=headers)
+    assert response.status_code == 200
+    assert "password" not in _stale._entries[("get_user", member_user_id)][0].__dict__
@@ -1,11 +1,9 @@
 """Users utility functions."""
+from app.core.policy import policy
 
 
 def is_authorized_to_view_user(current_user_id: int, target_user_id: int, current_user_role: str) -> bool:
-    """Check if current user can view target user."""
-    # Admin can view all users
-    if current_user_role == "admin":
-        return True
-    
-    # Member can only view themselves
-    return current_user_id == target_user_id
+    """Check if current user can view target user (self or admin)."""
+    return policy.role_allows(
+        current_user_role, "users:read", owner_id=target_user_id, principal_id=current_user_id
+    )
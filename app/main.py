@@ -1,18 +1,32 @@
 """Main Flask application."""
-from flask import Flask, jsonify
+from flask import Flask, g, jsonify
 from flask_cors import CORS
+from sqlalchemy import exc
 
-from app.db import Base, engine
+from app.db import SessionLocal, close_request_session, get_engine
+from app.core.admission import install_admission_control
+from app.core.compression import install_compression
 from app.core.config import get_config
+from app.core.deadlines import install_deadlines
+from app.core.logs import install_logging
+from app.core.memory import install_memory_diagnostics
+from app.core.metrics import install_metrics
+from app.core.profiling import install_profiling
+from app.core.schema import SchemaError, check_schema
+from app.core.tracing import install_tracing
 from app.shared.exceptions import AppException
+from app.shared.responses import error_response
 from app.features.auth.routes import auth_bp
 from app.features.users.routes import users_bp
 from app.features.clinics.routes import clinics_bp
+from app.features.diagnostics.routes import diagnostics_bp
+from app.features.audit.routes import audit_bp
 
 
 def create_app():
     """Create and configure Flask application."""
     config = get_config()
+    engine = get_engine()
     
     app = Flask(__name__)
     app.config['DEBUG'] = config.DEBUG
@@ -27,50 +41,99 @@ def create_app():
         }
     })
     
-    # Create all database tables
-    Base.metadata.create_all(bind=engine)
-    
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(users_bp)
     app.register_blueprint(clinics_bp)
+    app.register_blueprint(diagnostics_bp)
+    app.register_blueprint(audit_bp)
     
     # Error handlers
     @app.errorhandler(AppException)
     def handle_app_exception(e):
         """Handle custom application exceptions."""
-        return jsonify({
-            "success": False,
-            "error": e.error_code,
-            "message": e.message,
-        }), e.status_code
+        details = getattr(e, "details", None)
+        return error_response(
+            e.error_code, e.message, e.status_code, details=details, headers=e.headers
+        )
     
     @app.errorhandler(404)
     def handle_not_found(e):
         """Handle 404 errors."""
-        return jsonify({
-            "success": False,
-            "error": "NOT_FOUND",
-            "message": "Resource not found",
-        }), 404
+        return error_response("NOT_FOUND", "Resource not found", 404)
     
     @app.errorhandler(500)
     def handle_server_error(e):
         """Handle 500 errors."""
-        return jsonify({
-            "success": False,
-            "error": "SERVER_ERROR",
-            "message": "Internal server error",
-        }), 500
+        return error_response("SERVER_ERROR", "Internal server error", 500)
+    
+    @app.after_request
+    def mark_stale_response(response):
+        """Flag responses served from last-known-good data during an outage."""
+        stale_age = g.get("stale_age")
+        if stale_age is not None:
+            response.headers["Age"] = str(stale_age)
+            response.headers["Warning"] = '110 - "Response is Stale"'
+        return response
     
     @app.route("/health", methods=["GET"])
     def health_check():
         """Health check endpoint."""
         return jsonify({"status": "healthy"}), 200
     
+    # Logging and tracing go first so they enclose the other request hooks
+    install_logging(app, engine)
+    if config.TRACING_ENABLED:
+        install_tracing(app, engine)
+    if config.METRICS_ENABLED:
+        install_metrics(app, engine)
+    install_profiling(app)
+    install_deadlines(app, engine)
+    app.teardown_request(close_request_session)
+    # Registered last so it runs first: later hooks see the bytes on the wire
+    if config.COMPRESSION_ENABLED:
+        install_compression(app)
+    if config.MEMORY_DIAGNOSTICS_ENABLED:
+        install_memory_diagnostics(app, engine, SessionLocal)
+    
+    # Shed overload before it reaches Flask; /health stays exempt
+    if config.ADMISSION_ENABLED:
+        install_admission_control(app)
+    
+    # Tables come from Alembic migrations; only check they have been applied
+    if config.SCHEMA_CHECK != "off":
+        try:
+            check_schema(engine, config.MIGRATIONS_DIR)
+        except SchemaError as e:
+            if config.SCHEMA_CHECK == "error":
+                raise
+            app.logger.warning(str(e))
+        except exc.OperationalError as e:
+            # Start anyway: reads can be served stale until the database is back
+            app.logger.warning("Schema check skipped, database unavailable: %s", e.orig)
+    
     return app
 
 
+def warm_up() -> None:
+    """Do the work deferred from import time: build every request and response
+    model and the password hasher.
+    
+    The pre-fork server calls this in the master so workers share the result
+    instead of each paying for it on its first requests.
+    """
+    from pydantic import BaseModel
+    from app.core.auth import warm_up_password_hashing
+    
+    pending = list(BaseModel.__subclasses__())
+    while pending:
+        model = pending.pop()
+        pending.extend(model.__subclasses__())
+        if model.__module__.startswith("app."):
+            model.model_rebuild()
+    warm_up_password_hashing()
+
+
 if __name__ == "__main__":
     app = create_app()
     app.run(debug=True, host="0.0.0.0", port=5000)
@@ -1,13 +1,19 @@
 """Shared decorators and utilities."""
 from functools import wraps
-from flask import request, jsonify
+
+from app.shared.formats import is_supported_request, make_body_response
 
 
 def validate_json(f):
-    """Decorator to ensure request has JSON content type."""
+    """Decorator to ensure the request body is JSON or MessagePack.
+    
+    Routes read the body with ``app.shared.binding.bind(Schema)``.
+    """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
+        if not is_supported_request():
+            return make_body_response(
+                {"error": "Content-Type must be application/json or application/msgpack"}, 400
+            )
         return f(*args, **kwargs)
     return decorated_function
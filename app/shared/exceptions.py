@@ -4,10 +4,17 @@
 class AppException(Exception):
     """Base application exception."""
     
-    def __init__(self, message: str, status_code: int = 400, error_code: str = None):
+    def __init__(
+        self,
+        message: str,
+        status_code: int = 400,
+        error_code: str = None,
+        headers: dict = None
+    ):
         self.message = message
         self.status_code = status_code
         self.error_code = error_code or self.__class__.__name__
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -45,3 +52,28 @@ class ConflictError(AppException):
     
     def __init__(self, message: str = "Conflict"):
         super().__init__(message, status_code=409, error_code="CONFLICT")
+
+
+class GatewayTimeoutError(AppException):
+    """Upstream work did not finish in time."""
+    
+    def __init__(self, message: str = "Request timed out"):
+        super().__init__(message, status_code=504, error_code="GATEWAY_TIMEOUT")
+
+
+class ServiceUnavailableError(AppException):
+    """A dependency is unhealthy; the client should retry later."""
+    
+    def __init__(self, message: str = "Service temporarily unavailable", retry_after: int = None):
+        headers = {"Retry-After": str(retry_after)} if retry_after else None
+        super().__init__(
+            message, status_code=503, error_code="SERVICE_UNAVAILABLE", headers=headers
+        )
+
+
+class TooManyRequestsError(AppException):
+    """Rate limit exceeded."""
+    
+    def __init__(self, message: str = "Too many requests", retry_after: int = None):
+        headers = {"Retry-After": str(retry_after)} if retry_after else None
+        super().__init__(message, status_code=429, error_code="TOO_MANY_REQUESTS", headers=headers)
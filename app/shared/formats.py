@@ -0,0 +1,107 @@
+"""Request and response body formats: JSON and MessagePack.
+
+Responses are MessagePack when the client's ``Accept`` header prefers
+``application/msgpack`` over ``application/json`` (JSON wins ties and
+``*/*``). Datetimes are encoded as native MessagePack timestamps rather than
+strings; naive datetimes are taken as UTC, which is how the models store
+them. Request bodies sent with ``Content-Type: application/msgpack`` decode to
+the same dicts ``request.get_json()`` returns, with timestamps as aware UTC
+datetimes, so the same Pydantic schemas validate either.
+"""
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Optional
+
+import msgpack
+from flask import Response, current_app, g, request
+from werkzeug.exceptions import BadRequest
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/msgpack"
+# Older clients still send the unregistered name
+MSGPACK_MIMETYPES = frozenset({MSGPACK_MIMETYPE, "application/x-msgpack"})
+
+_MISSING = object()
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return msgpack.Timestamp.from_datetime(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+def packb(value: Any) -> bytes:
+    """Encode ``value`` as MessagePack."""
+    return msgpack.packb(value, default=_default, datetime=False)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decode MessagePack ``data``; timestamps become aware UTC datetimes."""
+    return msgpack.unpackb(data, raw=False, timestamp=3)
+
+
+def is_msgpack_request() -> bool:
+    """Whether the current request's body is MessagePack."""
+    return request.mimetype in MSGPACK_MIMETYPES
+
+
+def is_supported_request() -> bool:
+    """Whether the current request's body is in a format the API reads."""
+    return request.is_json or is_msgpack_request()
+
+
+def wants_msgpack() -> bool:
+    """Whether the client prefers a MessagePack response."""
+    accept = request.accept_mimetypes
+    if not accept:
+        return False
+    best = accept.best_match((JSON_MIMETYPE, MSGPACK_MIMETYPE, "application/x-msgpack"))
+    return best in MSGPACK_MIMETYPES
+
+
+def request_data() -> Optional[Any]:
+    """The decoded request body, JSON or MessagePack; decoded once per request.
+
+    Raises ``BadRequest`` if the body is not valid in its declared format.
+    """
+    cached = g.get("request_data", _MISSING)
+    if cached is not _MISSING:
+        return cached
+    if is_msgpack_request():
+        try:
+            data = unpackb(request.get_data())
+        except (ValueError, msgpack.UnpackException) as e:
+            raise BadRequest(f"Invalid MessagePack body: {e}")
+    else:
+        data = request.get_json()
+    g.request_data = data
+    return data
+
+
+def make_body_response(
+    body: Any,
+    status_code: int = 200,
+    headers: Optional[dict] = None
+) -> Response:
+    """``body`` as JSON or MessagePack, as negotiated with the client."""
+    if wants_msgpack():
+        response = Response(packb(body), status=status_code, mimetype=MSGPACK_MIMETYPE)
+    else:
+        response = current_app.json.response(body)
+        response.status_code = status_code
+    # Caches must not serve one format to a client that asked for the other
+    response.vary.add("Accept")
+    if headers:
+        response.headers.update(headers)
+    return response
@@ -0,0 +1,150 @@
+"""Small key/value state stores with atomic read-modify-write.
+
+Both stores hold JSON-serializable values and expose the same interface, so
+callers can keep state in process memory or share it between worker
+processes through a SQLite file.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+# ``fn(current) -> new``; ``current`` is None when the key is absent or expired,
+# and returning None deletes the key.
+Updater = Callable[[Optional[Any]], Optional[Any]]
+
+
+class MemoryStore:
+    """In-process store bounded by ``max_entries`` (least recently used evicted)."""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Current value of ``key``."""
+        with self._lock:
+            return self._get(key, time.time())
+
+    def update(self, key: str, fn: Updater, ttl: Optional[float] = None) -> Optional[Any]:
+        """Atomically replace the value of ``key`` with ``fn(value)``."""
+        with self._lock:
+            now = time.time()
+            value = fn(self._get(key, now))
+            if value is None:
+                self._data.pop(key, None)
+                return None
+            self._data[key] = (value, now + ttl if ttl else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return value
+
+    def delete(self, key: str) -> None:
+        """Remove ``key``."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every key."""
+        with self._lock:
+            self._data.clear()
+
+    def _get(self, key: str, now: float) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._data[key]
+            return None
+        return value
+
+
+class SQLiteStore:
+    """Store shared by every process that opens the same SQLite file.
+
+    Updates run inside ``BEGIN IMMEDIATE`` so concurrent writers from other
+    processes serialize on the database lock. Each thread keeps its own
+    connection.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, table: str = "kv", timeout: float = 5.0):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.path = path
+        self.table = table
+        self.timeout = timeout
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """Current value of ``key``."""
+        row = self._conn().execute(
+            f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        return self._decode(row, time.time())
+
+    def update(self, key: str, fn: Updater, ttl: Optional[float] = None) -> Optional[Any]:
+        """Atomically replace the value of ``key`` with ``fn(value)``."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            value = fn(self._decode(row, now))
+            if value is None:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            else:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps(value), now + ttl if ttl else None),
+                )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def delete(self, key: str) -> None:
+        """Remove ``key``."""
+        self._conn().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove every key."""
+        self._conn().execute(f"DELETE FROM {self.table}")
+
+    def _decode(self, row, now: float) -> Optional[Any]:
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            return None
+        return json.loads(value)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
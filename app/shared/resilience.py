@@ -0,0 +1,201 @@
+"""Circuit breaker and stale-while-revalidate reads for degraded databases."""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Hashable, Optional, Tuple, Type
+
+from flask import g, has_request_context
+
+from app.shared.exceptions import ServiceUnavailableError
+
+
+class CircuitBreaker:
+    """Trip after consecutive failures or slow calls, then fail fast.
+
+    A call that raises one of ``failure_types`` or takes longer than
+    ``latency_threshold`` seconds counts as a failure. After
+    ``failure_threshold`` consecutive failures the breaker opens and rejects
+    calls for ``reset_timeout`` seconds, then lets a single probe through
+    (half-open). A successful probe closes it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        latency_threshold: Optional[float] = None,
+        reset_timeout: float = 10.0,
+        failure_types: Tuple[Type[BaseException], ...] = (Exception,),
+    ):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_types = failure_types
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Close the breaker and forget past failures."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = 0.0
+            self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Current breaker state."""
+        return self._state
+
+    def allow(self) -> bool:
+        """Return whether a call may proceed right now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            cooled_down = time.monotonic() - self._opened_at >= self.reset_timeout
+            if self._state == self.OPEN and cooled_down:
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def retry_after(self) -> int:
+        """Whole seconds until the breaker lets a probe through."""
+        remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+        return max(1, int(remaining + 0.999))
+
+    def record_success(self, latency: float = 0.0) -> None:
+        """Record a completed call, treating slow calls as failures."""
+        if self.latency_threshold is not None and latency > self.latency_threshold:
+            self.record_failure()
+            return
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a failed call and open the breaker if the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run ``fn`` through the breaker, raising 503 when it is open."""
+        if not self.allow():
+            raise ServiceUnavailableError(
+                "Database temporarily unavailable", retry_after=self.retry_after()
+            )
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except self.failure_types:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Application errors (not found, conflict) mean the database answered
+            self.record_success(time.monotonic() - started)
+            raise
+        self.record_success(time.monotonic() - started)
+        return result
+
+    def protect(self, fn: Callable) -> Callable:
+        """Decorator running every call of ``fn`` through the breaker."""
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            return self.call(fn, *args, **kwargs)
+        return wrapper
+
+
+def mark_stale(age: float) -> None:
+    """Flag the current response as served from last-known-good data."""
+    if has_request_context():
+        g.stale_age = max(getattr(g, "stale_age", 0), int(age))
+
+
+class StaleReader:
+    """Serve last-known-good read results while the database is unhealthy.
+
+    Fresh reads go through ``breaker``. When the breaker is open or the read
+    fails, the last successful result for the key is returned instead, the
+    response is marked stale, and a background revalidation is started with a
+    session from ``session_factory``. Loaders take a session and must return
+    values that stay valid after that session is closed.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, session_factory: Callable, max_entries: int = 1024):
+        self.breaker = breaker
+        self.session_factory = session_factory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._revalidating = set()
+
+    def read(self, db, key: Hashable, loader: Callable, flight=None) -> Any:
+        """Return ``loader(db)``, or the last-known-good value if the database is down.
+
+        Passing a ``SingleFlight`` as ``flight`` coalesces concurrent reads of
+        the same key into one database round trip.
+        """
+        fetch = lambda: self._fetch(db, key, loader)  # noqa: E731
+        value, age = flight.do(key, fetch) if flight is not None else fetch()
+        if age is not None:
+            mark_stale(age)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the last-known-good value for ``key``."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every last-known-good value."""
+        with self._lock:
+            self._entries.clear()
+
+    def _fetch(self, db, key: Hashable, loader: Callable) -> Tuple[Any, Optional[float]]:
+        try:
+            value = self.breaker.call(loader, db)
+        except (ServiceUnavailableError,) + tuple(self.breaker.failure_types):
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is None:
+                raise
+            self._revalidate(key, loader)
+            return entry[0], time.time() - entry[1]
+        self._store(key, value)
+        return value, None
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _revalidate(self, key: Hashable, loader: Callable) -> None:
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def run():
+            session = self.session_factory()
+            try:
+                self._store(key, self.breaker.call(loader, session))
+            except Exception:
+                pass
+            finally:
+                session.close()
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=run, name="stale-revalidate", daemon=True).start()
@@ -1,7 +1,13 @@
-"""Shared response utilities."""
-from flask import jsonify
+"""Shared response utilities.
+
+Bodies are JSON, or MessagePack for clients that ask for it (see
+``app.shared.formats``).
+"""
 from typing import Any, Dict, Optional
 
+from app.core.tracing import span
+from app.shared.formats import make_body_response
+
 
 def success_response(
     data: Any = None,
@@ -14,14 +20,16 @@ def success_response(
         "message": message,
         "data": data,
     }
-    return jsonify(response), status_code
+    with span("serialize"):
+        return make_body_response(response, status_code)
 
 
 def error_response(
     error: str,
     message: str = None,
     status_code: int = 400,
-    details: Optional[Dict] = None
+    details: Optional[Dict] = None,
+    headers: Optional[Dict] = None
 ) -> tuple:
     """Return an error response."""
     response = {
@@ -31,4 +39,4 @@ def error_response(
     }
     if details:
         response["details"] = details
-    return jsonify(response), status_code
+    return make_body_response(response, status_code, headers)
@@ -0,0 +1,60 @@
+"""Single-flight call coalescing for hot identical reads."""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.shared.exceptions import GatewayTimeoutError
+
+
+class _Call:
+    """An in-flight computation shared by every caller of the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time.
+
+    Concurrent callers of ``do`` with the same key wait for the leader's
+    computation and share its result or exception. Nothing is cached once the
+    computation finishes; the next caller starts a fresh one.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Return ``fn()``, coalescing with any in-flight call for ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+
+        wait = self.timeout if timeout is None else timeout
+        if not call.done.wait(wait):
+            raise GatewayTimeoutError(f"Timed out waiting for in-flight {key!r}")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
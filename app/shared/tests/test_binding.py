@@ -0,0 +1,58 @@
+"""Request binding tests."""
+from flask import Request
+
+from app.shared.formats import MSGPACK_MIMETYPE, packb, unpackb
+
+
+def _auth(token, **headers):
+    return dict(headers, Authorization=f"Bearer {token}")
+
+
+def test_body_is_validated_without_decoding_to_dicts(client, admin_token, monkeypatch):
+    """Test JSON bodies go from raw bytes to the schema in one pass."""
+    def get_json(self, *args, **kwargs):
+        raise AssertionError("body decoded before validation")
+
+    monkeypatch.setattr(Request, "get_json", get_json)
+    response = client.post(
+        "/clinics",
+        data=b'{"name": "Raw Clinic", "address": "1 Byte St"}',
+        headers=_auth(admin_token, **{"Content-Type": "application/json"}),
+    )
+
+    assert response.status_code == 201
+    assert response.json["data"]["name"] == "Raw Clinic"
+
+
+def test_invalid_fields_are_reported_per_field(client):
+    """Test schema violations return the validation envelope with field details."""
+    body = {"name": "", "email": "not-an-email", "password": "123"}
+    response = client.post("/auth/signup", json=body)
+
+    assert response.status_code == 400
+    body = response.json
+    assert body["success"] is False
+    assert body["error"] == "VALIDATION_ERROR"
+    assert set(body["details"]) == {"name", "email", "password"}
+
+
+def test_malformed_bodies_are_validation_errors(client, admin_token):
+    """Test broken JSON, non-object bodies and broken MessagePack get the same envelope."""
+    broken = client.post(
+        "/clinics",
+        data=b'{"name": ',
+        headers=_auth(admin_token, **{"Content-Type": "application/json"}),
+    )
+    listed = client.post("/clinics", json=["Clinic", "1 Main St"], headers=_auth(admin_token))
+    packed = client.post(
+        "/clinics",
+        data=packb(["Clinic"]),
+        headers=_auth(
+            admin_token, **{"Content-Type": MSGPACK_MIMETYPE, "Accept": MSGPACK_MIMETYPE}
+        ),
+    )
+
+    assert broken.status_code == listed.status_code == packed.status_code == 400
+    assert broken.json["error"] == listed.json["error"] == "VALIDATION_ERROR"
+    assert "body" in broken.json["details"]
+    assert unpackb(packed.data)["error"] == "VALIDATION_ERROR"
@@ -0,0 +1,65 @@
+"""MessagePack negotiation tests."""
+from datetime import datetime, timezone
+
+import msgpack
+
+from app.shared.formats import MSGPACK_MIMETYPE, packb, unpackb
+
+MSGPACK = {"Accept": MSGPACK_MIMETYPE, "Content-Type": MSGPACK_MIMETYPE}
+
+
+def _auth(token, **headers):
+    return dict(headers, Authorization=f"Bearer {token}")
+
+
+def test_datetimes_round_trip_as_timestamps():
+    """Test naive datetimes are packed as UTC timestamps and come back aware."""
+    created = datetime(2026, 1, 2, 3, 4, 5, 678000)
+    packed = packb({"created_at": created})
+
+    assert isinstance(msgpack.unpackb(packed, raw=False)["created_at"], msgpack.Timestamp)
+    assert unpackb(packed)["created_at"] == created.replace(tzinfo=timezone.utc)
+
+
+def test_msgpack_request_and_response(client, admin_token):
+    """Test a MessagePack body validates like JSON and the reply is MessagePack."""
+    response = client.post(
+        "/clinics",
+        data=packb({"name": "Binary Clinic", "address": "1 Byte St"}),
+        headers=_auth(admin_token, **MSGPACK),
+    )
+
+    assert response.status_code == 201
+    assert response.mimetype == MSGPACK_MIMETYPE
+    assert "Accept" in response.headers["Vary"]
+    body = unpackb(response.data)
+    assert body["success"] is True
+    assert body["data"]["name"] == "Binary Clinic"
+    assert isinstance(body["data"]["created_at"], datetime)
+
+    # Same resource as JSON when the client does not ask for MessagePack
+    clinic_id = body["data"]["id"]
+    as_json = client.get(f"/clinics/{clinic_id}", headers=_auth(admin_token, Accept="*/*"))
+    assert as_json.is_json and as_json.json["data"]["name"] == "Binary Clinic"
+
+
+def test_errors_follow_the_negotiated_format(client, admin_token):
+    """Test error envelopes, including app-level 404s, are MessagePack too."""
+    missing = client.get("/clinics/999999", headers=_auth(admin_token, Accept=MSGPACK_MIMETYPE))
+    unknown = client.get("/no-such-route", headers={"Accept": MSGPACK_MIMETYPE})
+
+    assert missing.status_code == 404
+    assert unpackb(missing.data)["error"] == "NOT_FOUND"
+    assert unknown.status_code == 404
+    assert unpackb(unknown.data)["success"] is False
+
+
+def test_bad_bodies_are_rejected(client, admin_token):
+    """Test unsupported content types and malformed MessagePack get 400."""
+    text_headers = _auth(admin_token, **{"Content-Type": "text/plain"})
+    plain = client.post("/clinics", data="name=x", headers=text_headers)
+    broken = client.post("/clinics", data=b"\xc1", headers=_auth(admin_token, **MSGPACK))
+
+    assert plain.status_code == 400
+    assert broken.status_code == 400
+    assert unpackb(broken.data)["error"] == "VALIDATION_ERROR"
@@ -0,0 +1,73 @@
+"""Key/value store tests."""
+import threading
+import time
+
+import pytest
+
+from app.shared.kvstore import MemoryStore, SQLiteStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Each store implementation."""
+    if request.param == "memory":
+        return MemoryStore()
+    return SQLiteStore(str(tmp_path / "kv.db"))
+
+
+def test_update_is_read_modify_write(store):
+    """Test update passes the current value and stores the result."""
+    store.update("n", lambda v: (v or 0) + 1)
+    store.update("n", lambda v: (v or 0) + 1)
+    
+    assert store.get("n") == 2
+
+
+def test_returning_none_deletes(store):
+    """Test an updater returning None removes the key."""
+    store.update("k", lambda v: {"a": 1})
+    store.update("k", lambda v: None)
+    
+    assert store.get("k") is None
+
+
+def test_ttl_expires(store):
+    """Test expired keys read as absent."""
+    store.update("k", lambda v: "x", ttl=0.01)
+    time.sleep(0.02)
+    
+    assert store.get("k") is None
+    assert store.update("k", lambda v: v) is None
+
+
+def test_concurrent_updates_are_atomic(store):
+    """Test increments from many threads are not lost."""
+    def work():
+        for _ in range(25):
+            store.update("n", lambda v: (v or 0) + 1)
+    
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert store.get("n") == 100
+
+
+def test_sqlite_store_shared_between_instances(tmp_path):
+    """Test two handles on one file (as in two workers) see the same state."""
+    path = str(tmp_path / "kv.db")
+    SQLiteStore(path).update("k", lambda v: [1, 2])
+    
+    assert SQLiteStore(path).get("k") == [1, 2]
+
+
+def test_memory_store_bounded():
+    """Test the least recently used key is evicted."""
+    store = MemoryStore(max_entries=2)
+    for key in "abc":
+        store.update(key, lambda v: 1)
+    
+    assert store.get("a") is None
+    assert store.get("c") == 1
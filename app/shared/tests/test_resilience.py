@@ -0,0 +1,105 @@
+"""Circuit breaker and stale-while-revalidate tests."""
+import time
+
+import pytest
+
+from app.shared.exceptions import NotFoundError, ServiceUnavailableError
+from app.shared.resilience import CircuitBreaker, StaleReader
+
+
+class DBDown(Exception):
+    """Stand-in for a driver-level database failure."""
+
+
+class FakeSession:
+    """Session stand-in recording whether it was closed."""
+    
+    closed = False
+    
+    def close(self):
+        self.closed = True
+
+
+def _fail():
+    raise DBDown()
+
+
+def test_breaker_opens_after_consecutive_failures():
+    """Test the breaker rejects calls once the failure threshold is hit."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, failure_types=(DBDown,))
+    
+    for _ in range(2):
+        with pytest.raises(DBDown):
+            breaker.call(_fail)
+    
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(ServiceUnavailableError) as exc_info:
+        breaker.call(lambda: "never runs")
+    assert exc_info.value.headers["Retry-After"] == "60"
+
+
+def test_breaker_counts_slow_calls_as_failures():
+    """Test calls slower than the latency threshold trip the breaker."""
+    breaker = CircuitBreaker(failure_threshold=1, latency_threshold=0.01, failure_types=(DBDown,))
+    
+    breaker.call(time.sleep, 0.02)
+    
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_breaker_ignores_application_errors():
+    """Test a not-found answer does not count against the database."""
+    breaker = CircuitBreaker(failure_threshold=1, failure_types=(DBDown,))
+    
+    with pytest.raises(NotFoundError):
+        breaker.call(lambda: (_ for _ in ()).throw(NotFoundError()))
+    
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_probe_closes_it():
+    """Test a single probe is allowed after the reset timeout."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0, failure_types=(DBDown,))
+    with pytest.raises(DBDown):
+        breaker.call(_fail)
+    
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stale_reader_serves_last_known_good():
+    """Test a failed read returns the previous result with its age."""
+    breaker = CircuitBreaker(failure_threshold=10, failure_types=(DBDown,))
+    session = FakeSession()
+    reader = StaleReader(breaker, lambda: session)
+    
+    assert reader.read(None, "clinics", lambda db: ["fresh"]) == ["fresh"]
+    assert reader.read(None, "clinics", lambda db: _fail()) == ["fresh"]
+    
+    # Background revalidation runs with its own session and closes it
+    for _ in range(100):
+        if session.closed:
+            break
+        time.sleep(0.01)
+    assert session.closed
+
+
+def test_stale_reader_without_entry_raises():
+    """Test a failure with nothing cached surfaces the error."""
+    reader = StaleReader(CircuitBreaker(failure_types=(DBDown,)), FakeSession)
+    
+    with pytest.raises(DBDown):
+        reader.read(None, "clinics", lambda db: _fail())
+
+
+def test_stale_reader_bounded():
+    """Test the oldest keys are evicted past max_entries."""
+    reader = StaleReader(CircuitBreaker(failure_types=(DBDown,)), FakeSession, max_entries=2)
+    
+    for key in ("a", "b", "c"):
+        reader.read(None, key, lambda db: key)
+    
+    with pytest.raises(DBDown):
+        reader.read(None, "a", lambda db: _fail())
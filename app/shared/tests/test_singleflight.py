@@ -0,0 +1,81 @@
+"""Single-flight coalescing tests."""
+import threading
+import time
+
+import pytest
+
+from app.shared.exceptions import GatewayTimeoutError
+from app.shared.singleflight import SingleFlight
+
+
+def _run_concurrently(n, target):
+    """Start ``n`` threads running ``target`` and wait for them."""
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_callers_share_one_computation():
+    """Test identical concurrent calls run the function once."""
+    flight = SingleFlight(timeout=5)
+    calls = []
+    results = []
+    
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "clinics"
+    
+    _run_concurrently(10, lambda: results.append(flight.do("key", compute)))
+    
+    assert len(calls) == 1
+    assert results == ["clinics"] * 10
+    assert flight.in_flight() == 0
+
+
+def test_distinct_keys_do_not_coalesce():
+    """Test different keys are computed independently."""
+    flight = SingleFlight()
+    
+    assert flight.do(("list", True), lambda: "active") == "active"
+    assert flight.do(("list", False), lambda: "all") == "all"
+
+
+def test_error_propagates_to_waiters():
+    """Test the leader's exception is raised in every waiting caller."""
+    flight = SingleFlight(timeout=5)
+    errors = []
+    
+    def compute():
+        time.sleep(0.1)
+        raise RuntimeError("database down")
+    
+    def call():
+        try:
+            flight.do("key", compute)
+        except RuntimeError as e:
+            errors.append(str(e))
+    
+    _run_concurrently(5, call)
+    
+    assert errors == ["database down"] * 5
+    assert flight.in_flight() == 0
+
+
+def test_waiter_times_out():
+    """Test a waiter gives up after its timeout."""
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do("key", release.wait))
+    leader.start()
+    
+    try:
+        while not flight.in_flight():
+            time.sleep(0.001)
+        with pytest.raises(GatewayTimeoutError):
+            flight.do("key", lambda: None, timeout=0.05)
+    finally:
+        release.set()
+        leader.join()
@@ -0,0 +1,4 @@
+"""Endpoint benchmarks: seeded datasets, timed scenarios and regression gates.
+
+Run ``python -m benchmarks --help``; see ``benchmarks/README.md``.
+"""
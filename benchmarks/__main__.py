@@ -0,0 +1,294 @@
+"""Benchmark command line.
+
+    python -m benchmarks run --size 10k --driver client \
+        --output benchmarks/results/10k-client.json
+    python -m benchmarks compare benchmarks/baselines/10k-client.json \
+        benchmarks/results/10k-client.json
+    python -m benchmarks replay --base-url http://localhost:5000 --users 8 --duration 30
+    python -m benchmarks startup --repeat 5 --import-budget-ms 800
+    python -m benchmarks sqlite --threads 16 --write-ratio 0.5
+    python -m benchmarks formats --rows 10 1000
+"""
+import argparse
+import json
+import os
+import sys
+
+from benchmarks.environment import SIZES, configure
+
+
+def run(args) -> int:
+    database_url = configure(args.size, args.database_url)
+
+    # Imported after configure(): app reads its settings at import time
+    from app.core.auth import create_access_token
+    from app.db import engine
+    from app.main import create_app
+    from benchmarks.compare import compare, format_report, load
+    from benchmarks.drivers import DRIVERS
+    from benchmarks.runner import StatementCounter, environment_info, run_scenario
+    from benchmarks.scenarios import build_scenarios
+    from benchmarks.seed import seed
+
+    seeded = seed(SIZES[args.size], force=args.reseed)
+    tokens = {
+        "admin": create_access_token({"sub": str(seeded["admin_id"]), "role": "admin"}),
+        "member": create_access_token({"sub": str(seeded["users"][0]), "role": "member"}),
+    }
+    app = create_app()
+    driver = DRIVERS[args.driver](app)
+    statements = StatementCounter(engine)
+
+    results = {}
+    try:
+        for scenario in build_scenarios(seeded):
+            if args.only and not any(scenario.name.startswith(prefix) for prefix in args.only):
+                continue
+            result = run_scenario(
+                driver, scenario, tokens, statements,
+                duration=args.duration,
+                max_requests=args.max_requests,
+                concurrency=args.concurrency,
+                alloc_requests=0 if args.no_allocations else args.alloc_requests,
+            )
+            results[scenario.name] = result
+            print(
+                f"{scenario.name:<22} {result['requests']:>6} req "
+                f"{result['throughput_rps']:>9.1f} rps "
+                f"p50 {result['p50_ms']:>9.2f} ms  p99 {result['p99_ms']:>9.2f} ms  "
+                f"sql {result['sql_per_request']:>5}  alloc {result['alloc_kib_per_request']} KiB"
+                + (f"  errors {result['errors']}" if result["errors"] else "")
+            )
+    finally:
+        driver.close()
+
+    report = {
+        "meta": dict(
+            environment_info(),
+            size=args.size,
+            rows=SIZES[args.size],
+            driver=args.driver,
+            concurrency=args.concurrency,
+            database=engine.url.get_backend_name(),
+        ),
+        "results": results,
+    }
+    output = args.output or os.path.join("benchmarks", "results", f"{args.size}-{args.driver}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"wrote {output} ({database_url})")
+
+    if args.baseline:
+        baseline = load(args.baseline)
+        if args.only:
+            # Scenarios left out on purpose are not missing
+            baseline["results"] = {
+                name: result for name, result in baseline["results"].items()
+                if any(name.startswith(prefix) for prefix in args.only)
+            }
+        changes, regressions = compare(baseline, report, args.threshold)
+        print(format_report(changes, regressions))
+        return 1 if regressions else 0
+    return 0
+
+
+def compare_command(args) -> int:
+    from benchmarks.compare import compare, format_report, load
+
+    changes, regressions = compare(load(args.baseline), load(args.current), args.threshold)
+    print(format_report(changes, regressions))
+    return 1 if regressions else 0
+
+
+def replay_command(args) -> int:
+    from benchmarks.replay import Replayer, format_report, load_collection, parse_captures
+
+    steps, variables = load_collection(args.collection)
+    if args.only:
+        steps = [step for step in steps if step.name.startswith(tuple(args.only))]
+    replayer = Replayer(
+        steps,
+        args.base_url,
+        variables=variables,
+        captures=parse_captures(args.capture or ()),
+        unique_emails=not args.no_unique_emails,
+        rest_ids=not args.no_rest_ids,
+        timeout=args.timeout,
+    )
+    replayer.run(
+        users=args.users, iterations=args.iterations, duration=args.duration, rate=args.rate
+    )
+    report = dict(
+        replayer.report(),
+        meta={
+            "base_url": args.base_url, "users": args.users,
+            "rate": args.rate, "collection": args.collection,
+        },
+    )
+    print(format_report(report))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"wrote {args.output}")
+    return 0
+
+
+def startup_command(args) -> int:
+    from benchmarks.startup import format_report, over_budget, run
+
+    report = run(repeat=args.repeat, with_serve=not args.no_serve, top=args.top)
+    print(format_report(report))
+    output = args.output or os.path.join("benchmarks", "results", "startup.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"wrote {output}")
+
+    budgets = {"import_ms": args.import_budget_ms, "ready_ms": args.ready_budget_ms}
+    failures = over_budget(report, budgets)
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}")
+    return 1 if failures else 0
+
+
+def sqlite_command(args) -> int:
+    from benchmarks.sqlite import format_report, run
+
+    report = run(
+        threads=args.threads, duration=args.duration, write_ratio=args.write_ratio, rows=args.rows
+    )
+    print(format_report(report))
+    output = args.output or os.path.join("benchmarks", "results", "sqlite.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"wrote {output}")
+    return 0
+
+
+def formats_command(args) -> int:
+    from benchmarks.formats import format_report, run
+
+    report = run(rows=args.rows, repeat=args.repeat)
+    print(format_report(report))
+    output = args.output or os.path.join("benchmarks", "results", "formats.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"wrote {output}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.split("\n")[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed a dataset and time every endpoint")
+    run_parser.add_argument("--size", choices=sorted(SIZES), default="10k", help="rows per table")
+    run_parser.add_argument("--driver", choices=("client", "server"), default="client",
+                            help="Flask test client or a real WSGI server over HTTP")
+    run_parser.add_argument("--database-url",
+                            help="database to seed (default: SQLite file per size)")
+    run_parser.add_argument("--reseed", action="store_true",
+                            help="recreate the dataset even if present")
+    run_parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    run_parser.add_argument("--max-requests", type=int, default=2000,
+                            help="request cap per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=1, help="concurrent clients")
+    run_parser.add_argument("--alloc-requests", type=int, default=5,
+                            help="requests measured under tracemalloc")
+    run_parser.add_argument("--no-allocations", action="store_true",
+                            help="skip allocation measurement")
+    run_parser.add_argument("--only", nargs="*",
+                            help="scenario name prefixes to run, e.g. clinics auth.login")
+    run_parser.add_argument("--output",
+                            help="result file (default: benchmarks/results/<size>-<driver>.json)")
+    run_parser.add_argument("--baseline",
+                            help="compare against this result and fail on regressions")
+    run_parser.add_argument("--threshold", type=float, default=0.10,
+                            help="allowed relative slowdown")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare a result against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="allowed relative slowdown")
+    compare_parser.set_defaults(handler=compare_command)
+
+    replay_parser = commands.add_parser(
+        "replay", help="replay the Postman collection against a running instance"
+    )
+    replay_parser.add_argument("--collection", default="postman_collection.json",
+                               help="Postman v2.1 collection")
+    replay_parser.add_argument("--base-url", default="http://localhost:5000",
+                               help="instance to load; replaces scheme, host and port "
+                                    "of the collection URLs")
+    replay_parser.add_argument("--users", type=int, default=1,
+                               help="virtual users (max flows in flight)")
+    replay_parser.add_argument("--rate", type=float,
+                               help="start this many flows per second (open model)")
+    replay_parser.add_argument("--iterations", type=int,
+                               help="flows per user (default 1 without --duration)")
+    replay_parser.add_argument("--duration", type=float, help="seconds to keep starting flows")
+    replay_parser.add_argument("--only", nargs="*",
+                               help="request name prefixes to replay, e.g. Login 'List All'")
+    replay_parser.add_argument("--capture", action="append",
+                               help="extra capture rule 'Request Name:var=json.path' (repeatable)")
+    replay_parser.add_argument("--no-unique-emails", action="store_true",
+                               help="send request bodies' email addresses unchanged")
+    replay_parser.add_argument("--no-rest-ids", action="store_true",
+                               help="keep the collection's literal ids instead of the ones "
+                                    "each flow created")
+    replay_parser.add_argument("--timeout", type=float, default=30.0,
+                               help="socket timeout per request")
+    replay_parser.add_argument("--output", help="write the per-request histograms as JSON")
+    replay_parser.set_defaults(handler=replay_command)
+
+    startup_parser = commands.add_parser(
+        "startup", help="time cold imports and the first served request"
+    )
+    startup_parser.add_argument("--repeat", type=int, default=5, help="cold starts per measurement")
+    startup_parser.add_argument("--no-serve", action="store_true",
+                                help="skip timing python -m app serve")
+    startup_parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    startup_parser.add_argument("--import-budget-ms", type=float,
+                                help="fail if median import time exceeds this")
+    startup_parser.add_argument("--ready-budget-ms", type=float,
+                                help="fail if median time until serve answers exceeds this")
+    startup_parser.add_argument("--output",
+                                help="result file (default: benchmarks/results/startup.json)")
+    startup_parser.set_defaults(handler=startup_command)
+
+    sqlite_parser = commands.add_parser(
+        "sqlite", help="mixed read/write load with and without the SQLite profile"
+    )
+    sqlite_parser.add_argument("--threads", type=int, default=8, help="concurrent clients")
+    sqlite_parser.add_argument("--duration", type=float, default=10.0, help="seconds per profile")
+    sqlite_parser.add_argument("--write-ratio", type=float, default=0.2,
+                               help="share of requests that write")
+    sqlite_parser.add_argument("--rows", type=int, default=1000, help="seeded clinics")
+    sqlite_parser.add_argument("--output",
+                               help="result file (default: benchmarks/results/sqlite.json)")
+    sqlite_parser.set_defaults(handler=sqlite_command)
+
+    formats_parser = commands.add_parser(
+        "formats", help="JSON vs MessagePack encode/decode cost and size"
+    )
+    formats_parser.add_argument("--rows", type=int, nargs="+", default=[1, 10, 100, 1000],
+                                help="clinics per response envelope")
+    formats_parser.add_argument("--repeat", type=int, default=200, help="timed runs per operation")
+    formats_parser.add_argument("--output",
+                                help="result file (default: benchmarks/results/formats.json)")
+    formats_parser.set_defaults(handler=formats_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
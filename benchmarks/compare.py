@@ -0,0 +1,79 @@
+"""Compare a benchmark result against a baseline."""
+import json
+from typing import List, Tuple
+
+# metric -> True if higher is better
+METRICS = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "sql_per_request": False,
+    "alloc_kib_per_request": False,
+}
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float = 0.10
+) -> Tuple[List[dict], List[dict]]:
+    """Changes per scenario and metric, and the subset that regressed beyond ``threshold``.
+
+    SQL statement counts are exact: any increase is a regression. So is a
+    baseline scenario missing from ``current``, which crashed or was renamed.
+    """
+    changes, regressions = [], []
+    for scenario, base in sorted(baseline["results"].items()):
+        cur = current["results"].get(scenario)
+        if cur is None:
+            row = {
+                "scenario": scenario, "metric": "scenario",
+                "baseline": "ran", "current": "missing", "change": float("inf"),
+            }
+            changes.append(row)
+            regressions.append(row)
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), cur.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+            if metric == "sql_per_request":
+                regressed = new > old
+            elif higher_is_better:
+                regressed = change < -threshold
+            else:
+                regressed = change > threshold
+            row = {
+                "scenario": scenario, "metric": metric,
+                "baseline": old, "current": new, "change": change,
+            }
+            changes.append(row)
+            if regressed:
+                regressions.append(row)
+        if cur.get("errors", 0) > base.get("errors", 0):
+            row = {
+                "scenario": scenario, "metric": "errors",
+                "baseline": base.get("errors", 0), "current": cur["errors"], "change": float("inf"),
+            }
+            changes.append(row)
+            regressions.append(row)
+    return changes, regressions
+
+
+def format_report(changes: List[dict], regressions: List[dict]) -> str:
+    """Table of changes, regressions marked with ``!``."""
+    regressed = {(r["scenario"], r["metric"]) for r in regressions}
+    lines = [f"{'scenario':<22} {'metric':<22} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in changes:
+        mark = " !" if (row["scenario"], row["metric"]) in regressed else ""
+        change = "n/a" if row["change"] == float("inf") else f"{row['change']:+.1%}"
+        lines.append(
+            f"{row['scenario']:<22} {row['metric']:<22} "
+            f"{row['baseline']:>12} {row['current']:>12} {change:>9}{mark}"
+        )
+    lines.append(f"{len(regressions)} regression(s)")
+    return "\n".join(lines)
@@ -0,0 +1,89 @@
+"""Ways of sending requests to the app: in-process test client or a real WSGI server."""
+import http.client
+import json
+import threading
+from typing import Optional, Tuple
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+
+class TestClientDriver:
+    """Calls the app through Flask's test client (no sockets, no HTTP parsing)."""
+
+    name = "client"
+
+    def __init__(self, app):
+        self.app = app
+
+    def connect(self) -> "_ClientConnection":
+        """A test client; use one per client thread."""
+        return _ClientConnection(self.app.test_client())
+
+    def close(self) -> None:
+        pass
+
+
+class _ClientConnection:
+    def __init__(self, client):
+        self.client = client
+
+    def request(
+        self, method: str, path: str, headers: dict, body: Optional[dict]
+    ) -> Tuple[int, bytes]:
+        response = self.client.open(path, method=method, headers=headers, json=body)
+        return response.status_code, response.get_data()
+
+    def close(self) -> None:
+        pass
+
+
+class _KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class WSGIServerDriver:
+    """Serves the app with Werkzeug's threaded WSGI server and calls it over HTTP/1.1."""
+
+    name = "server"
+
+    def __init__(self, app):
+        self.app = app
+        self.server = make_server(
+            "127.0.0.1", 0, app, threaded=True, request_handler=_KeepAliveHandler
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def connect(self) -> "_Connection":
+        """A keep-alive connection; use one per client thread."""
+        return _Connection(self.server.server_port)
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _Connection:
+    def __init__(self, port: int):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+
+    def request(
+        self, method: str, path: str, headers: dict, body: Optional[dict]
+    ) -> Tuple[int, bytes]:
+        headers = dict(headers)
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        self.conn.request(method, path, body=payload, headers=headers)
+        response = self.conn.getresponse()
+        return response.status, response.read()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+DRIVERS = {"client": TestClientDriver, "server": WSGIServerDriver}
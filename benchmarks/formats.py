@@ -0,0 +1,97 @@
+"""Encode/decode cost and payload size of response envelopes, JSON vs MessagePack.
+
+Envelopes are what ``success_response`` sends for ``GET /clinics``: a list of
+``rows`` clinics, each with a datetime. JSON goes through the Flask app's
+JSON provider (as ``jsonify`` does) and ``json.loads``; MessagePack through
+``app.shared.formats``. Each operation's time is the median of ``repeat``
+runs; sizes are given raw and gzipped.
+"""
+import gzip
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List
+
+
+def envelope(rows: int) -> dict:
+    """A ``success_response`` body listing ``rows`` clinics."""
+    created = datetime(2026, 1, 1, 12, 0, 0)
+    return {
+        "success": True,
+        "message": "Success",
+        "data": [
+            {
+                "id": i + 1,
+                "name": f"Clinic {i + 1}",
+                "address": f"{i + 1} Main Street, Springfield",
+                "is_active": i % 7 != 0,
+                "created_at": created + timedelta(minutes=i),
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def _median_us(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1e6, 2)
+
+
+def measure(rows: int, repeat: int = 200) -> Dict[str, dict]:
+    """Per-format encode/decode medians (µs) and sizes (bytes) for ``rows``."""
+    from flask import Flask
+
+    from app.shared.formats import packb, unpackb
+
+    provider = Flask(__name__).json
+    body = envelope(rows)
+    encoded_json = provider.dumps(body).encode("utf-8")
+    encoded_msgpack = packb(body)
+
+    formats = {
+        "json": (
+            lambda: provider.dumps(body).encode("utf-8"),
+            lambda: json.loads(encoded_json),
+            encoded_json,
+        ),
+        "msgpack": (lambda: packb(body), lambda: unpackb(encoded_msgpack), encoded_msgpack),
+    }
+    return {
+        name: {
+            "encode_us": _median_us(encode, repeat),
+            "decode_us": _median_us(decode, repeat),
+            "bytes": len(encoded),
+            "gzip_bytes": len(gzip.compress(encoded, mtime=0)),
+        }
+        for name, (encode, decode, encoded) in formats.items()
+    }
+
+
+def run(rows: Iterable[int] = (1, 10, 100, 1000), repeat: int = 200) -> dict:
+    """Measurements for each envelope size."""
+    return {"repeat": repeat, "results": {str(n): measure(n, repeat) for n in rows}}
+
+
+def format_report(report: dict) -> str:
+    """A table with MessagePack relative to JSON."""
+    lines: List[str] = [
+        f"{'rows':>6} {'format':<8} {'encode µs':>10} {'decode µs':>10} {'bytes':>9} {'gzip':>8}"
+    ]
+    for rows, formats in report["results"].items():
+        for name, result in formats.items():
+            lines.append(
+                f"{rows:>6} {name:<8} {result['encode_us']:>10.1f} {result['decode_us']:>10.1f} "
+                f"{result['bytes']:>9} {result['gzip_bytes']:>8}"
+            )
+        js, mp = formats["json"], formats["msgpack"]
+        lines.append(
+            f"{'':>6} {'ratio':<8} {mp['encode_us'] / js['encode_us']:>10.2f} "
+            f"{mp['decode_us'] / js['decode_us']:>10.2f} {mp['bytes'] / js['bytes']:>9.2f} "
+            f"{mp['gzip_bytes'] / js['gzip_bytes']:>8.2f}"
+        )
+    return "\n".join(lines)
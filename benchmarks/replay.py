@@ -0,0 +1,365 @@
+"""Replay the flows of a Postman collection as load against a running instance.
+
+Every virtual user walks the collection's requests in order, substituting
+``{{variables}}`` from its own scope, and captures values from responses
+for later requests:
+
+- values set by the collection's test scripts with
+  ``pm.environment.set("name", pm.response.json().a.b)`` (or
+  ``collectionVariables``/``globals``/``variables``);
+- ``--capture "Request Name:var=json.path"`` rules; by default ``Login``
+  captures ``access_token`` from ``data.access_token``;
+- with REST id chaining (on by default), ``data.id`` of a ``POST /<resource>``
+  replaces the literal id in later ``/<resource>/<id>`` URLs, so each user
+  reads, updates and deletes what it created.
+
+With unique emails (on by default) every address in a request body gets a
+per-user, per-iteration tag, so signup, login and create run again and again
+without conflicts while still matching each other within a flow.
+
+Users either loop (closed model, ``--users``) or flows start at a fixed
+arrival rate (open model, ``--rate``) with at most ``--users`` in flight.
+"""
+import bisect
+import http.client
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.runner import percentile
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_VARIABLE = re.compile(r"\{\{\s*([^{}\s]+)\s*\}\}")
+_EMAIL = re.compile(r"([A-Za-z0-9._%-]+)(\+[A-Za-z0-9-]+)?@([A-Za-z0-9.-]+\.[A-Za-z]{2,})")
+_SCRIPT_SET = re.compile(
+    r"pm\.(?:environment|collectionVariables|globals|variables)\.set\(\s*[\"']([^\"']+)[\"']\s*,"
+    r"\s*(?:pm\.response\.json\(\)|jsonData|response|res)\.([A-Za-z0-9_.\[\]]+)\s*\)"
+)
+
+DEFAULT_CAPTURES = {"Login": {"access_token": "data.access_token"}}
+
+
+@dataclass
+class Step:
+    """One request of the collection."""
+
+    name: str
+    method: str
+    url: str
+    headers: Dict[str, str]
+    body: Optional[str] = None
+    captures: Dict[str, str] = field(default_factory=dict)
+
+
+def load_collection(path: str) -> Tuple[List[Step], Dict[str, str]]:
+    """Steps in collection order and the collection's variables."""
+    with open(path) as f:
+        collection = json.load(f)
+    steps: List[Step] = []
+    _walk(collection.get("item", []), steps)
+    variables = {v["key"]: str(v.get("value", "")) for v in collection.get("variable", [])}
+    return steps, variables
+
+
+def _walk(items: Iterable[dict], steps: List[Step]) -> None:
+    for item in items:
+        if "item" in item:
+            _walk(item["item"], steps)
+            continue
+        request = item["request"]
+        url = request["url"]["raw"] if isinstance(request["url"], dict) else request["url"]
+        body = request.get("body") or {}
+        steps.append(Step(
+            name=item["name"],
+            method=request.get("method", "GET").upper(),
+            url=url,
+            headers={
+                h["key"]: h["value"] for h in request.get("header", []) if not h.get("disabled")
+            },
+            body=body.get("raw") if body.get("mode") == "raw" else None,
+            captures=_script_captures(item.get("event", [])),
+        ))
+
+
+def _script_captures(events: Iterable[dict]) -> Dict[str, str]:
+    captures = {}
+    for event in events:
+        if event.get("listen") != "test":
+            continue
+        exec_lines = event.get("script", {}).get("exec", [])
+        source = "\n".join(exec_lines) if isinstance(exec_lines, list) else str(exec_lines)
+        for name, path in _SCRIPT_SET.findall(source):
+            captures[name] = path
+    return captures
+
+
+def json_path(document, path: str):
+    """Follow ``a.b[0].c`` through decoded JSON; ``None`` if any part is missing."""
+    for part in re.findall(r"[^.\[\]]+", path):
+        if isinstance(document, list) and part.isdigit() and int(part) < len(document):
+            document = document[int(part)]
+        elif isinstance(document, dict) and part in document:
+            document = document[part]
+        else:
+            return None
+    return document
+
+
+def substitute(text: str, variables: Dict[str, str]) -> str:
+    """Replace ``{{name}}`` and Postman's ``{{$guid}}``-style dynamic variables."""
+    def value(match):
+        name = match.group(1)
+        if name == "$guid":
+            return str(uuid.uuid4())
+        if name == "$timestamp":
+            return str(int(time.time()))
+        if name == "$randomInt":
+            return str(random.randint(0, 1000))
+        return variables.get(name, match.group(0))
+    return _VARIABLE.sub(value, text)
+
+
+class Histogram:
+    """Latency histogram of one request name."""
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self.statuses: Dict[str, int] = defaultdict(int)
+
+    def record(self, latency_ms: float, status: str) -> None:
+        self.samples.append(latency_ms)
+        self.statuses[status] += 1
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        counts, start = [], 0
+        for bound in BUCKETS_MS:
+            end = bisect.bisect_right(ordered, bound)
+            counts.append({"le_ms": bound, "count": end - start})
+            start = end
+        counts.append({"le_ms": "+Inf", "count": len(ordered) - start})
+        return {
+            "requests": len(ordered),
+            "p50_ms": round(percentile(ordered, 50), 3) if ordered else None,
+            "p90_ms": round(percentile(ordered, 90), 3) if ordered else None,
+            "p99_ms": round(percentile(ordered, 99), 3) if ordered else None,
+            "max_ms": round(ordered[-1], 3) if ordered else None,
+            "statuses": dict(sorted(self.statuses.items())),
+            "histogram": counts,
+        }
+
+
+class Replayer:
+    """Runs collection flows against ``base_url`` and records latency per request name."""
+
+    def __init__(
+        self,
+        steps: List[Step],
+        base_url: str,
+        variables: Optional[Dict[str, str]] = None,
+        captures: Optional[Dict[str, Dict[str, str]]] = None,
+        unique_emails: bool = True,
+        rest_ids: bool = True,
+        timeout: float = 30.0,
+    ):
+        self.steps = steps
+        target = urlsplit(base_url)
+        self.host = target.hostname
+        self.port = target.port or (443 if target.scheme == "https" else 80)
+        self.https = target.scheme == "https"
+        self.prefix = target.path.rstrip("/")
+        self.variables = dict(variables or {})
+        self.captures = {name: dict(rules) for name, rules in (captures or {}).items()}
+        self.unique_emails = unique_emails
+        self.rest_ids = rest_ids
+        self.timeout = timeout
+        self.histograms: Dict[str, Histogram] = defaultdict(Histogram)
+        self.flows = 0
+        # Open-model arrivals that found every user busy
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def run_flow(self, conn, scope: Dict[str, str], tag: str) -> None:
+        """Send every step once, chaining variables through ``scope``."""
+        ids: Dict[str, str] = {}
+        for step in self.steps:
+            method, path, headers, body = self._render(step, scope, ids, tag)
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+                status = str(response.status)
+            except (OSError, http.client.HTTPException) as e:
+                payload, status = b"", type(e).__name__
+                conn.close()
+            latency = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.histograms[step.name].record(latency, status)
+            self._capture(step, method, path, payload, scope, ids)
+        with self._lock:
+            self.flows += 1
+
+    def _render(self, step: Step, scope: Dict[str, str], ids: Dict[str, str], tag: str):
+        variables = dict(self.variables, **scope)
+        split = urlsplit(substitute(step.url, variables))
+        path = split.path or "/"
+        if self.rest_ids:
+            path = self._chain_id(path, ids)
+        path = self.prefix + path + (f"?{split.query}" if split.query else "")
+        headers = {key: substitute(value, variables) for key, value in step.headers.items()}
+        body = substitute(step.body, variables) if step.body else None
+        if body and self.unique_emails:
+            body = _EMAIL.sub(lambda m: f"{m.group(1)}+{tag}@{m.group(3)}", body)
+        return step.method, path, headers, body.encode() if body else None
+
+    @staticmethod
+    def _chain_id(path: str, ids: Dict[str, str]) -> str:
+        parts = path.rstrip("/").split("/")
+        if len(parts) >= 3 and parts[-1].isdigit() and parts[-2] in ids:
+            parts[-1] = ids[parts[-2]]
+            return "/".join(parts)
+        return path
+
+    def _capture(self, step: Step, method: str, path: str, payload: bytes, scope, ids) -> None:
+        rules = dict(step.captures, **self.captures.get(step.name, {}))
+        if not rules and not (self.rest_ids and method == "POST"):
+            return
+        try:
+            document = json.loads(payload)
+        except ValueError:
+            return
+        for name, json_expr in rules.items():
+            value = json_path(document, json_expr)
+            if value is not None:
+                scope[name] = str(value)
+        if self.rest_ids and method == "POST":
+            created = json_path(document, "data.id")
+            resource = path[len(self.prefix):].split("?")[0].strip("/")
+            if created is not None and resource and "/" not in resource:
+                ids[resource] = str(created)
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def run(
+        self,
+        users: int = 1,
+        iterations: Optional[int] = None,
+        duration: Optional[float] = None,
+        rate: Optional[float] = None,
+    ) -> None:
+        """Replay flows until ``iterations`` per user or ``duration`` seconds are done.
+
+        Without ``rate`` each of ``users`` threads loops over the flow. With
+        ``rate`` flows start ``rate`` times a second, at most ``users`` at once;
+        arrivals that find every user busy are counted as ``dropped``.
+        """
+        if iterations is None and duration is None:
+            iterations = 1
+        stop_at = time.monotonic() + duration if duration else None
+        counter = iter(range(1 << 62))
+        counter_lock = threading.Lock()
+
+        def next_tag(user: int) -> str:
+            with counter_lock:
+                return f"u{user}i{next(counter)}r{random.randrange(1 << 20):x}"
+
+        if rate is None:
+            def virtual_user(user: int) -> None:
+                conn = self._connect()
+                done = 0
+                while (iterations is None or done < iterations) and (
+                    stop_at is None or time.monotonic() < stop_at
+                ):
+                    self.run_flow(conn, {}, next_tag(user))
+                    done += 1
+                conn.close()
+
+            threads = [threading.Thread(target=virtual_user, args=(u,)) for u in range(users)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return
+
+        self.dropped = 0
+        slots = threading.Semaphore(users)
+        total = iterations * users if iterations is not None else None
+        started, threads = 0, []
+
+        def arrival(user: int) -> None:
+            try:
+                conn = self._connect()
+                self.run_flow(conn, {}, next_tag(user))
+                conn.close()
+            finally:
+                slots.release()
+
+        next_start = time.monotonic()
+        while (total is None or started < total) and (stop_at is None or next_start < stop_at):
+            delay = next_start - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if slots.acquire(blocking=False):
+                thread = threading.Thread(target=arrival, args=(started,))
+                thread.start()
+                threads.append(thread)
+            else:
+                self.dropped += 1
+            started += 1
+            next_start += 1.0 / rate
+        for thread in threads:
+            thread.join()
+
+    def report(self) -> dict:
+        """Per-request-name histograms in collection order."""
+        names = [step.name for step in self.steps]
+        return {
+            "flows": self.flows,
+            "dropped_arrivals": self.dropped,
+            "requests": {
+                name: self.histograms[name].summary() for name in names if name in self.histograms
+            },
+        }
+
+
+def format_report(report: dict) -> str:
+    """Human-readable summary with a bar chart per request name."""
+    lines = [f"{report['flows']} flows, {report['dropped_arrivals']} dropped arrivals"]
+    for name, summary in report["requests"].items():
+        lines.append("")
+        lines.append(
+            f"{name}: {summary['requests']} req  "
+            f"p50 {summary['p50_ms']} ms  p90 {summary['p90_ms']} ms  p99 {summary['p99_ms']} ms  "
+            f"max {summary['max_ms']} ms  statuses {summary['statuses']}"
+        )
+        peak = max(bucket["count"] for bucket in summary["histogram"]) or 1
+        for bucket in summary["histogram"]:
+            if bucket["count"]:
+                bar = "#" * max(1, round(40 * bucket["count"] / peak))
+                lines.append(f"  <= {bucket['le_ms']:>6} ms {bucket['count']:>7} {bar}")
+    return "\n".join(lines)
+
+
+def parse_captures(values: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """Parse ``"Request Name:var=json.path"`` rules on top of ``DEFAULT_CAPTURES``."""
+    captures = {name: dict(rules) for name, rules in DEFAULT_CAPTURES.items()}
+    for value in values:
+        name, sep, rule = value.rpartition(":")
+        var, eq, path = rule.partition("=")
+        if not sep or not eq:
+            raise ValueError(
+                f"Invalid capture rule: {value!r} (expected 'Request Name:var=json.path')"
+            )
+        captures.setdefault(name, {})[var] = path
+    return captures
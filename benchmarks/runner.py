@@ -0,0 +1,157 @@
+"""Time scenarios and summarise latency, throughput, SQL statements and allocations."""
+import itertools
+import platform
+import subprocess
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from benchmarks.drivers import TestClientDriver
+from benchmarks.scenarios import Scenario
+
+
+class StatementCounter:
+    """Counts SQL statements executed on an engine."""
+
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_scenario(
+    driver,
+    scenario: Scenario,
+    tokens: Dict[str, str],
+    statements: StatementCounter,
+    duration: float = 5.0,
+    max_requests: int = 2000,
+    min_requests: int = 5,
+    warmup: int = 2,
+    concurrency: int = 1,
+    alloc_requests: int = 5,
+) -> dict:
+    """Run ``scenario`` for about ``duration`` seconds and summarise it.
+
+    Allocations are measured afterwards over ``alloc_requests`` sequential
+    requests through the test client, whatever the driver.
+    """
+    headers = {"Authorization": f"Bearer {tokens[scenario.role]}"} if scenario.role else {}
+    iterations = itertools.count()
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+
+    def send(conn) -> float:
+        i = next(iterations)
+        body = scenario.body(i) if scenario.body else None
+        started = time.perf_counter()
+        status, _ = conn.request(scenario.method, scenario.path(i), headers, body)
+        elapsed = time.perf_counter() - started
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+        return elapsed
+
+    conn = driver.connect()
+    for _ in range(warmup):
+        send(conn)
+    statuses.clear()
+
+    statements_before = statements.count
+    deadline = time.perf_counter() + duration
+
+    def client(conn) -> None:
+        while True:
+            with lock:
+                done = len(latencies)
+            if done >= max_requests or (done >= min_requests and time.perf_counter() >= deadline):
+                return
+            elapsed = send(conn)
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        client(conn)
+    else:
+        connections = [driver.connect() for _ in range(concurrency)]
+        threads = [threading.Thread(target=client, args=(c,)) for c in connections]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for c in connections:
+            c.close()
+    wall = time.perf_counter() - started
+    sql = (statements.count - statements_before) / len(latencies)
+
+    conn.close()
+
+    # Measured in-process so socket and server buffers don't drown the app's own allocations
+    alloc = None
+    if alloc_requests:
+        in_process = TestClientDriver(driver.app).connect()
+        alloc = measure_allocations(lambda: send(in_process), alloc_requests)
+
+    errors = sum(count for status, count in statuses.items() if status not in scenario.expect)
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "sql_per_request": round(sql, 2),
+        "alloc_kib_per_request": alloc,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "errors": errors,
+    }
+
+
+def measure_allocations(send, requests: int) -> Optional[float]:
+    """Median peak traced memory (KiB) allocated while serving one request."""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(requests):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            send()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return round(percentile(peaks, 50) / 1024, 1) if peaks else None
+
+
+def environment_info() -> dict:
+    """Where and on what the benchmark ran."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
@@ -0,0 +1,77 @@
+"""One scenario per blueprint endpoint."""
+import uuid
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from benchmarks.seed import PASSWORD, user_email
+
+
+@dataclass
+class Scenario:
+    """A request to time repeatedly; ``i`` numbers the iteration."""
+
+    name: str
+    method: str
+    path: Callable[[int], str]
+    body: Optional[Callable[[int], dict]] = None
+    role: Optional[str] = None
+    expect: Tuple[int, ...] = (200,)
+
+
+def build_scenarios(seeded: dict) -> List[Scenario]:
+    """Scenarios for every endpoint, against the rows returned by ``seed``."""
+    run = uuid.uuid4().hex[:8]
+    first_user, last_user = seeded["users"]
+    first_clinic, last_clinic = seeded["clinics"]
+    members = last_user - first_user + 1
+    clinics = last_clinic - first_clinic + 1
+
+    def member_id(i: int) -> int:
+        return first_user + i % members
+
+    def clinic_id(i: int) -> int:
+        return first_clinic + i % clinics
+
+    # Deletes remove rows from the end, away from the rows other scenarios use
+    return [
+        Scenario("health", "GET", lambda i: "/health"),
+        Scenario(
+            "auth.signup", "POST", lambda i: "/auth/signup",
+            body=lambda i: {
+                "name": "Signup", "email": f"signup-{run}-{i}@bench.example", "password": PASSWORD,
+            },
+            expect=(201,),
+        ),
+        Scenario(
+            "auth.login", "POST", lambda i: "/auth/login",
+            body=lambda i: {"email": user_email(i % members), "password": PASSWORD},
+        ),
+        Scenario(
+            "users.create", "POST", lambda i: "/users", role="admin",
+            body=lambda i: {
+                "name": "Created", "email": f"created-{run}-{i}@bench.example",
+                "password": PASSWORD, "role": "member",
+            },
+            expect=(201,),
+        ),
+        Scenario("users.list", "GET", lambda i: "/users", role="admin"),
+        Scenario("users.get", "GET", lambda i: f"/users/{member_id(i)}", role="admin"),
+        Scenario(
+            "users.update", "PATCH", lambda i: f"/users/{member_id(i)}", role="admin",
+            body=lambda i: {"name": f"Updated {i}"},
+        ),
+        Scenario(
+            "clinics.create", "POST", lambda i: "/clinics", role="admin",
+            body=lambda i: {"name": f"Clinic {run}-{i}", "address": "1 Bench Street"},
+            expect=(201,),
+        ),
+        Scenario("clinics.list", "GET", lambda i: "/clinics", role="admin"),
+        Scenario("clinics.list_active", "GET", lambda i: "/clinics", role="member"),
+        Scenario("clinics.get", "GET", lambda i: f"/clinics/{clinic_id(i)}", role="member"),
+        Scenario(
+            "clinics.update", "PATCH", lambda i: f"/clinics/{clinic_id(i)}", role="admin",
+            body=lambda i: {"address": f"{i} Updated Street"},
+        ),
+        Scenario("users.delete", "DELETE", lambda i: f"/users/{last_user - i}", role="admin"),
+        Scenario("clinics.delete", "DELETE", lambda i: f"/clinics/{last_clinic - i}", role="admin"),
+    ]
@@ -0,0 +1,171 @@
+"""Mixed read/write throughput on SQLite, before and after the SQLite profile.
+
+Each profile runs in a fresh interpreter against its own temporary database
+(the journal mode is stored in the file):
+
+- ``before``: ``SQLITE_PROFILE=false``, connections as pysqlite opens them
+  (rollback journal, ``synchronous=FULL``) and writes committed by each
+  request's own session;
+- ``after``: the profile (WAL, tuned pragmas) with the single writer.
+
+``--threads`` clients each loop for ``--duration`` seconds through the test
+client, sending ``PATCH /clinics/<id>`` with probability ``--write-ratio``
+and ``GET /clinics/<id>`` otherwise, against ``--rows`` seeded clinics.
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from benchmarks.environment import BENCH_ENV
+from benchmarks.runner import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    "before": {"SQLITE_PROFILE": "false"},
+    "after": {"SQLITE_PROFILE": "true", "SQLITE_SINGLE_WRITER": "true"},
+}
+
+# Every request reaches the database: a burst of lock errors must not open
+# the breaker and turn the rest of the run into fast 503s
+PROFILE_ENV = dict(BENCH_ENV, DB_BREAKER_FAILURE_THRESHOLD="1000000000")
+
+WORKER = """
+import json, sys
+from benchmarks.sqlite import workload
+print(json.dumps(workload(**json.loads(sys.argv[1]))))
+"""
+
+
+def seed(rows: int) -> int:
+    """Create the schema with ``rows`` clinics and an admin; returns the admin's id."""
+    from app.db import Base, SessionLocal, get_engine
+    from app.features.auth.model import User
+    from app.features.clinics.model import Clinic
+
+    Base.metadata.create_all(get_engine())
+    db = SessionLocal()
+    try:
+        admin = User(
+            name="Bench Admin", email="bench-admin@bench.example", password="-", role="admin"
+        )
+        db.add(admin)
+        db.add_all(
+            Clinic(name=f"Clinic {i}", address=f"{i} Bench St", is_active=True)
+            for i in range(rows)
+        )
+        db.commit()
+        return admin.id
+    finally:
+        db.close()
+
+
+def workload(threads: int, duration: float, write_ratio: float, rows: int) -> dict:
+    """Run the mixed load in this process; settings come from the environment."""
+    from app.core.auth import create_access_token
+    from app.main import create_app
+
+    admin_id = seed(rows)
+    app = create_app()
+    token = create_access_token({"sub": str(admin_id), "role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: Dict[str, List[float]] = {"read": [], "write": []}
+    statuses: Dict[str, int] = {}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client_loop(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        client = app.test_client()
+        local = {"read": [], "write": []}
+        local_statuses: Dict[str, int] = {}
+        while time.perf_counter() < stop_at:
+            clinic_id = rng.randint(1, rows)
+            kind = "write" if rng.random() < write_ratio else "read"
+            started = time.perf_counter()
+            if kind == "write":
+                response = client.patch(
+                    f"/clinics/{clinic_id}",
+                    json={"name": f"Clinic {clinic_id} r{rng.random():.6f}"},
+                    headers=headers,
+                )
+            else:
+                response = client.get(f"/clinics/{clinic_id}", headers=headers)
+            elapsed = time.perf_counter() - started
+            key = f"{kind} {response.status_code}"
+            local_statuses[key] = local_statuses.get(key, 0) + 1
+            if response.status_code < 400:
+                local[kind].append(elapsed)
+        with lock:
+            for kind, values in local.items():
+                latencies[kind].extend(values)
+            for key, count in local_statuses.items():
+                statuses[key] = statuses.get(key, 0) + count
+
+    workers = [threading.Thread(target=client_loop, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    result = {"seconds": round(elapsed, 3), "statuses": statuses}
+    for kind, values in latencies.items():
+        result[f"{kind}_rps"] = round(len(values) / elapsed, 1)
+        result[f"{kind}_p50_ms"] = round(percentile(values, 50) * 1000, 3) if values else None
+        result[f"{kind}_p99_ms"] = round(percentile(values, 99) * 1000, 3) if values else None
+    result["errors"] = sum(
+        count for key, count in statuses.items() if not key.split()[1].startswith("2")
+    )
+    return result
+
+
+def run_profile(profile: str, threads: int, duration: float, write_ratio: float, rows: int) -> dict:
+    """Run the workload in a fresh interpreter with ``profile``'s settings."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, **PROFILE_ENV, **PROFILES[profile])
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'mixed.db')}"
+        arguments = {
+            "threads": threads, "duration": duration, "write_ratio": write_ratio, "rows": rows,
+        }
+        result = subprocess.run(
+            [sys.executable, "-c", WORKER, json.dumps(arguments)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(
+    threads: int = 8, duration: float = 10.0, write_ratio: float = 0.2, rows: int = 1000
+) -> dict:
+    """Every profile under the same load."""
+    return {
+        "meta": {
+            "threads": threads, "duration": duration, "write_ratio": write_ratio, "rows": rows,
+        },
+        "profiles": {
+            profile: run_profile(profile, threads, duration, write_ratio, rows)
+            for profile in PROFILES
+        },
+    }
+
+
+def format_report(report: dict) -> str:
+    """One line per profile."""
+    lines = []
+    for profile, result in report["profiles"].items():
+        lines.append(
+            f"{profile:<7} reads {result['read_rps']:>8.1f}/s "
+            f"p99 {result['read_p99_ms'] or 0:>8.2f} ms  "
+            f"writes {result['write_rps']:>7.1f}/s "
+            f"p99 {result['write_p99_ms'] or 0:>8.2f} ms  "
+            f"errors {result['errors']}"
+        )
+    return "\n".join(lines)
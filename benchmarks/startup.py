@@ -0,0 +1,181 @@
+"""Cold-start benchmark: import time, app creation and time to first served request.
+
+Every sample is a fresh interpreter:
+
+- ``probe`` times ``import app.main``, ``create_app()`` and the first
+  ``GET /health`` through the test client, and records the slowest imports
+  reported by ``python -X importtime``;
+- ``serve`` times ``python -m app serve --workers 1`` from launch until
+  ``/health`` first answers over HTTP.
+
+They run against a temporary SQLite database built from the models and
+stamped with the migrations' head, so the boot-time schema check runs as it
+does in production.
+"""
+import http.client
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+application = app.main.create_app()
+created = time.perf_counter()
+status = application.test_client().get("/health").status_code
+served = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (served - created) * 1000,
+    "total_ms": (served - started) * 1000,
+    "status": status,
+}))
+"""
+
+
+def prepare_database(path: str) -> str:
+    """Create the schema in a SQLite file at ``path`` and stamp it at head."""
+    from sqlalchemy import create_engine, text
+
+    from app.core.config import get_config
+    from app.core.schema import head_revisions
+    from app.db import Base
+
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL)"
+        ))
+        conn.execute(text("DELETE FROM alembic_version"))
+        for revision in head_revisions(get_config().MIGRATIONS_DIR):
+            conn.execute(
+                text("INSERT INTO alembic_version (version_num) VALUES (:v)"), {"v": revision}
+            )
+    engine.dispose()
+    return url
+
+
+def _environment(database_url: str) -> Dict[str, str]:
+    env = dict(os.environ, DATABASE_URL=database_url, SCHEMA_CHECK="error", LOG_LEVEL="WARNING")
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def parse_importtime(stderr: str, top: int) -> List[dict]:
+    """Modules with the largest self time from ``-X importtime`` output."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    modules.sort(key=lambda m: m["self_ms"], reverse=True)
+    return modules[:top]
+
+
+def probe(database_url: str, top: int = 15) -> dict:
+    """One cold import and first request in a fresh interpreter."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, env=_environment(database_url), capture_output=True, text=True, check=True,
+    )
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["process_ms"] = (time.perf_counter() - started) * 1000
+    sample["slowest_imports"] = parse_importtime(result.stderr, top)
+    return sample
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(database_url: str, timeout: float = 30.0) -> dict:
+    """Launch ``python -m app serve`` and time it until ``/health`` answers."""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "app", "serve",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", "1",
+        ],
+        cwd=ROOT, env=_environment(database_url), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited: {process.stderr.read().decode()[-2000:]}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                conn.request("GET", "/health")
+                status = conn.getresponse().status
+                conn.close()
+                return {"ready_ms": (time.perf_counter() - started) * 1000, "status": status}
+            except OSError:
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError("server did not answer in time")
+                time.sleep(0.005)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def run(repeat: int = 5, with_serve: bool = True, top: int = 15) -> dict:
+    """Median phases over ``repeat`` cold starts of each kind."""
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = prepare_database(os.path.join(tmp, "startup.db"))
+        probes = [probe(database_url, top) for _ in range(repeat)]
+        serves = [serve(database_url) for _ in range(repeat)] if with_serve else []
+
+    report = {"samples": {"probe": probes, "serve": serves}, "median": {}}
+    for key in ("import_ms", "create_app_ms", "first_request_ms", "total_ms", "process_ms"):
+        report["median"][key] = round(statistics.median(p[key] for p in probes), 3)
+    if serves:
+        report["median"]["ready_ms"] = round(statistics.median(s["ready_ms"] for s in serves), 3)
+    # Slowest imports of the median run by import time
+    ordered = sorted(probes, key=lambda p: p["import_ms"])
+    report["slowest_imports"] = ordered[len(ordered) // 2]["slowest_imports"]
+    return report
+
+
+def over_budget(report: dict, budgets: Dict[str, Optional[float]]) -> List[str]:
+    """Phases whose median exceeds its budget in milliseconds."""
+    return [
+        f"{key} {report['median'][key]:.1f} ms > budget {budget:.1f} ms"
+        for key, budget in budgets.items()
+        if budget is not None and key in report["median"] and report["median"][key] > budget
+    ]
+
+
+def format_report(report: dict) -> str:
+    """Human-readable medians and slowest imports."""
+    lines = [f"{key:<18} {value:>9.1f} ms" for key, value in report["median"].items()]
+    lines.append("")
+    lines.append("slowest imports (self time):")
+    for module in report["slowest_imports"]:
+        lines.append(f"  {module['self_ms']:>7.1f} ms  {module['module']}")
+    return "\n".join(lines)
@@ -0,0 +1,98 @@
+"""Regression gate tests."""
+from benchmarks.compare import compare, format_report
+
+
+def _result(**scenarios):
+    return {"results": scenarios}
+
+
+def _metrics(**overrides):
+    metrics = {
+        "throughput_rps": 1000.0,
+        "p50_ms": 2.0,
+        "p99_ms": 10.0,
+        "sql_per_request": 2,
+        "alloc_kib_per_request": 40.0,
+        "errors": 0,
+    }
+    metrics.update(overrides)
+    return metrics
+
+
+def _regressed(regressions):
+    return sorted((row["scenario"], row["metric"]) for row in regressions)
+
+
+def test_changes_within_threshold_pass():
+    """Test small slowdowns and any improvement are not regressions."""
+    baseline = _result(clinics=_metrics())
+    current = _result(
+        clinics=_metrics(throughput_rps=950.0, p50_ms=2.1, p99_ms=5.0, sql_per_request=1)
+    )
+    
+    changes, regressions = compare(baseline, current, threshold=0.10)
+    
+    assert regressions == []
+    assert len(changes) == 5
+    assert "0 regression(s)" in format_report(changes, regressions)
+
+
+def test_changes_beyond_threshold_regress():
+    """Test throughput down or latency and allocations up by more than the threshold fail."""
+    baseline = _result(clinics=_metrics())
+    current = _result(
+        clinics=_metrics(throughput_rps=850.0, p99_ms=11.5, alloc_kib_per_request=48.0)
+    )
+    
+    _, regressions = compare(baseline, current, threshold=0.10)
+    
+    assert _regressed(regressions) == [
+        ("clinics", "alloc_kib_per_request"), ("clinics", "p99_ms"), ("clinics", "throughput_rps"),
+    ]
+    assert compare(baseline, current, threshold=0.20)[1] == []
+
+
+def test_any_sql_increase_regresses():
+    """Test one more statement per request fails whatever the threshold."""
+    baseline = _result(clinics=_metrics(sql_per_request=20))
+    current = _result(clinics=_metrics(sql_per_request=21))
+    
+    _, regressions = compare(baseline, current, threshold=0.50)
+    
+    assert _regressed(regressions) == [("clinics", "sql_per_request")]
+
+
+def test_more_errors_regress():
+    """Test unexpected statuses the baseline did not have fail."""
+    baseline = _result(clinics=_metrics(errors=1))
+    
+    assert compare(baseline, _result(clinics=_metrics(errors=1)))[1] == []
+    _, regressions = compare(baseline, _result(clinics=_metrics(errors=3)))
+    assert _regressed(regressions) == [("clinics", "errors")]
+
+
+def test_missing_scenario_regresses():
+    """Test a scenario that crashed or was renamed fails the gate instead of being skipped."""
+    baseline = _result(clinics=_metrics(), users=_metrics())
+    current = _result(clinics=_metrics(), **{"users.renamed": _metrics()})
+    
+    changes, regressions = compare(baseline, current)
+    
+    assert _regressed(regressions) == [("users", "scenario")]
+    report = format_report(changes, regressions)
+    assert "missing" in report
+    assert "1 regression(s)" in report
+
+
+def test_report_marks_regressions():
+    """Test regressed rows are flagged and changes are shown as percentages."""
+    baseline = _result(clinics=_metrics())
+    current = _result(clinics=_metrics(p50_ms=3.0))
+    changes, regressions = compare(baseline, current)
+    
+    lines = format_report(changes, regressions).splitlines()
+    
+    (p50,) = [line for line in lines if " p50_ms " in line]
+    assert p50.endswith("+50.0% !")
+    (p99,) = [line for line in lines if " p99_ms " in line]
+    assert p99.endswith("+0.0%")
@@ -0,0 +1,154 @@
+"""Postman collection replay tests."""
+import json
+import os
+import uuid
+
+import pytest
+
+from benchmarks.replay import Replayer, json_path, load_collection, parse_captures, substitute
+
+COLLECTION = os.path.join(os.path.dirname(__file__), "..", "..", "postman_collection.json")
+
+
+class _ClientConnection:
+    """``http.client``-style connection that sends requests to a Flask test client."""
+
+    def __init__(self, client):
+        self.client = client
+        self.sent = []
+        self._response = None
+
+    def request(self, method, path, body=None, headers=None):
+        self.sent.append((method, path, body))
+        self._response = self.client.open(path, method=method, data=body, headers=headers or {})
+
+    def getresponse(self):
+        return self
+
+    @property
+    def status(self):
+        return self._response.status_code
+
+    def read(self):
+        return self._response.get_data()
+
+    def close(self):
+        pass
+
+
+def _statuses(replayer):
+    return {name: summary["statuses"] for name, summary in replayer.report()["requests"].items()}
+
+
+def test_load_collection_parses_postman_file():
+    """Test folders are flattened into steps in order, with headers, raw bodies and variables."""
+    steps, variables = load_collection(COLLECTION)
+    
+    assert variables == {"access_token": ""}
+    assert [step.name for step in steps][:3] == ["Signup", "Login", "Create User (Admin Only)"]
+    assert len(steps) == 12
+    create_user = steps[2]
+    assert (create_user.method, create_user.url) == ("POST", "http://localhost:8000/users")
+    assert create_user.headers["Authorization"] == "Bearer {{access_token}}"
+    assert json.loads(create_user.body)["email"] == "user@example.com"
+    assert steps[3].body is None
+
+
+def test_substitute_variables():
+    """Test known variables are replaced, unknown ones kept and dynamic ones generated."""
+    variables = {"access_token": "abc", "id": "7"}
+    
+    assert substitute("Bearer {{access_token}}", variables) == "Bearer abc"
+    assert substitute("/users/{{ id }}/{{missing}}", variables) == "/users/7/{{missing}}"
+    assert uuid.UUID(substitute("{{$guid}}", variables))
+    assert json_path({"data": {"items": [{"id": 1}, {"id": 2}]}}, "data.items[1].id") == 2
+    assert json_path({"data": {}}, "data.items[0]") is None
+
+
+def test_script_and_rule_captures(tmp_path):
+    """Test pm.environment.set in test scripts and --capture rules both become captures."""
+    collection = {
+        "item": [{
+            "name": "Folder",
+            "item": [{
+                "name": "Login",
+                "request": {"method": "POST", "url": {"raw": "{{base}}/auth/login"}},
+                "event": [{"listen": "test", "script": {"exec": [
+                    "var jsonData = pm.response.json();",
+                    'pm.environment.set("token", pm.response.json().data.access_token);',
+                    "pm.collectionVariables.set('user_id', jsonData.data.user.id);",
+                ]}}],
+            }],
+        }],
+        "variable": [{"key": "base", "value": "http://localhost"}],
+    }
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps(collection))
+    
+    (login,), variables = load_collection(str(path))
+    
+    assert login.url == "{{base}}/auth/login"
+    assert login.captures == {"token": "data.access_token", "user_id": "data.user.id"}
+    assert variables == {"base": "http://localhost"}
+    captures = parse_captures(["Create Clinic (Admin Only):clinic_id=data.id"])
+    assert captures["Login"] == {"access_token": "data.access_token"}
+    assert captures["Create Clinic (Admin Only)"] == {"clinic_id": "data.id"}
+    with pytest.raises(ValueError):
+        parse_captures(["no rule here"])
+
+
+def test_replay_chains_login_token(client):
+    """Test the token captured from Login is sent by later requests, with per-flow emails."""
+    steps, variables = load_collection(COLLECTION)
+    replayer = Replayer(steps[:3], "http://localhost", variables, captures=parse_captures([]))
+    conn = _ClientConnection(client)
+    
+    scope = {}
+    replayer.run_flow(conn, scope, "t1")
+    
+    assert _statuses(replayer) == {
+        "Signup": {"201": 1}, "Login": {"200": 1}, "Create User (Admin Only)": {"201": 1},
+    }
+    assert conn.sent[2][0:2] == ("POST", "/users")
+    assert scope["access_token"].count(".") == 2
+    assert json.loads(conn.sent[0][2])["email"] == "admin+t1@example.com"
+    assert json.loads(conn.sent[1][2])["email"] == "admin+t1@example.com"
+    assert replayer.report()["flows"] == 1
+    
+    # Without the capture the collection's empty token is sent
+    uncaptured = Replayer(steps[:3], "http://localhost", variables, captures={})
+    uncaptured.run_flow(_ClientConnection(client), {}, "t2")
+    assert _statuses(uncaptured)["Create User (Admin Only)"] == {"401": 1}
+
+
+def test_replay_chains_created_ids(client, admin_token):
+    """Test ids created by POST replace the collection's literal ids in later URLs."""
+    steps, variables = load_collection(COLLECTION)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for name in ("First", "Second"):
+        client.post("/clinics", json={"name": name, "address": "1 Main St"}, headers=headers)
+    variables = dict(variables, access_token=admin_token)
+    replayer = Replayer(steps, "http://localhost", variables, captures={})
+    conn = _ClientConnection(client)
+    
+    replayer.run_flow(conn, {}, "t3")
+    
+    statuses = _statuses(replayer)
+    replayed = {
+        name: list(codes) for name, codes in statuses.items() if name not in ("Signup", "Login")
+    }
+    assert replayed == {
+        "Create User (Admin Only)": ["201"],
+        "Get User by ID": ["200"],
+        "List All Users (Admin Only)": ["200"],
+        "Update User (Admin Only)": ["200"],
+        "Delete User (Admin Only)": ["200"],
+        "Create Clinic (Admin Only)": ["201"],
+        "Get Clinic by ID": ["200"],
+        "List All Clinics": ["200"],
+        "Update Clinic (Admin Only)": ["200"],
+        "Delete Clinic (Admin Only)": ["200"],
+    }
+    paths = [path for method, path, _ in conn.sent if method != "POST"]
+    assert "/clinics/3" in paths
+    assert "/clinics/1" not in paths
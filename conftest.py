@@ -1,49 +1,175 @@
-"""Test configuration and fixtures."""
-import pytest
-from app.main import create_app
-from app.db import Base, engine, SessionLocal
-from app.core.auth import create_access_token
-from app.features.auth.model import User
-from app.core.permissions import Role
-from app.core.auth import hash_password
+"""Test configuration and fixtures.
+
+The schema is created once per test session, in a database of its own per
+process (so ``pytest -n auto`` gives every xdist worker its own database).
+Each test that uses ``app`` or ``db`` runs inside one outer transaction:
+sessions made by ``SessionLocal`` -- the request-scoped one from ``get_db``
+included -- join it through SAVEPOINTs, their commits release the
+savepoint, and the outer transaction is rolled back when the test ends.
+Tests marked ``real_db`` use the pool as the application does and have
+their tables emptied afterwards instead.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+# Settings are read when app.core.config is imported, so choose them first
+_worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+if os.environ.get("TEST_DATABASE_URL"):
+    from sqlalchemy.engine import make_url
+
+    _url = make_url(os.environ["TEST_DATABASE_URL"])
+    if os.environ.get("PYTEST_XDIST_WORKER") and _url.database:
+        _url = _url.set(database=f"{_url.database}_{_worker}")
+    os.environ["DATABASE_URL"] = _url.render_as_string(hide_password=False)
+else:
+    _tmp = tempfile.mkdtemp(prefix="backend-tests-")
+    atexit.register(shutil.rmtree, _tmp, True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, f'test-{_worker}.db')}"
+# The minimum bcrypt cost: hashes made during tests only need to verify
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# The schema comes from create_all below, not from migrations
+os.environ.setdefault("SCHEMA_CHECK", "off")
+# Writes commit on the test's own connection, inside its rolled-back
+# transaction, rather than on the SQLite writer thread's
+os.environ.setdefault("SQLITE_SINGLE_WRITER", "false")
+# Jobs only queue up; tests run them with JobRunner.run_pending()
+os.environ.setdefault("JOBS_WORKERS", "0")
+# Audit entries stay buffered until a test flushes them
+os.environ.setdefault("AUDIT_FLUSH_SECONDS", "0")
+os.environ.setdefault("AUDIT_SPILL_DIR", tempfile.mkdtemp(prefix="backend-audit-"))
+# Tests archive with Archiver.run_once()
+os.environ.setdefault("ARCHIVE_INTERVAL_SECONDS", "0")
+# The log writer runs outside pytest's capture and flushes once more at exit;
+# tests that read the log point the handler at a stream of their own
+os.environ.setdefault("LOG_FILE", os.devnull)
+
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.main import create_app  # noqa: E402
+from app.db import Base, engine, SessionLocal  # noqa: E402
+from app.core.auth import create_access_token  # noqa: E402
+from app.core.config import get_config  # noqa: E402
+from app.features.auth.model import User  # noqa: E402
+from app.core.permissions import Role  # noqa: E402, F401
+from app.core.auth import hash_password  # noqa: E402
+
+
+if engine.dialect.name == "sqlite" and not get_config().SQLITE_PROFILE:
+    # pysqlite emits BEGIN lazily and not before SAVEPOINT; let SQLAlchemy
+    # emit it so the outer transaction and its savepoints nest correctly (the
+    # SQLite profile does this itself)
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "real_db: commit through the connection pool instead of a rolled-back transaction",
+    )
+
+
+@lru_cache()
+def hashed(password: str) -> str:
+    """Hash ``password`` once per test session."""
+    return hash_password(password)
+
+
+@pytest.fixture(scope="session")
+def _schema():
+    """Create the tables once per test session."""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
 
 
 @pytest.fixture
-def app():
-    """Create test application."""
+def db_connection(request, _schema):
+    """Outer transaction every session of the test joins; rolled back afterwards."""
+    if request.node.get_closest_marker("real_db"):
+        yield None
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+        return
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    options = dict(SessionLocal.kw)
+    SessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield connection
+    finally:
+        SessionLocal.kw = options
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="session")
+def app(_schema):
+    """Test application, created once per session (per worker with ``-n``).
+    
+    Requests open their sessions from ``SessionLocal``, which ``db_connection``
+    binds to each test's own transaction, so the app itself holds no per-test
+    state.
+    """
     app = create_app()
     app.config['TESTING'] = True
-    
-    # Create tables
-    Base.metadata.create_all(bind=engine)
-    
-    yield app
-    
-    # Clean up
-    Base.metadata.drop_all(bind=engine)
+    return app
+
+
+@pytest.fixture
+def fresh_app(db_connection):
+    """Application of this test alone, for tests that add routes or change its config."""
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
 
 
 @pytest.fixture
-def client(app):
+def client(app, db_connection):
     """Create test client."""
     return app.test_client()
 
 
 @pytest.fixture
-def db():
+def db(db_connection):
     """Create test database session."""
     session = SessionLocal()
     yield session
     session.close()
 
 
+@pytest.fixture
+def db_outage():
+    """Open the database circuit breaker for the duration of a test."""
+    from app.db import db_breaker
+    
+    def trip():
+        for _ in range(db_breaker.failure_threshold):
+            db_breaker.record_failure()
+    
+    yield trip
+    db_breaker.reset()
+
+
 @pytest.fixture
 def admin_user(db):
     """Create an admin user."""
     user = User(
         name="Admin User",
         email="admin@example.com",
-        password=hash_password("admin123"),
+        password=hashed("admin123"),
         role="admin",
     )
     db.add(user)
@@ -58,7 +184,7 @@ def member_user(db):
     user = User(
         name="Member User",
         email="member@example.com",
-        password=hash_password("member123"),
+        password=hashed("member123"),
         role="member",
     )
     db.add(user)